@@ -17,7 +17,12 @@ from app.core.config import settings
 
 # Import all models so Alembic can detect them
 from app.modules.audit_logs.models import AuditLog  # noqa: F401
-from app.modules.document_versions.models import DocumentVersion  # noqa: F401
+from app.modules.audit_logs.partitions import partition_month
+from app.modules.document_versions.models import (  # noqa: F401
+    CompressionDictionary,
+    ContentBlob,
+    DocumentVersion,
+)
 from app.modules.documents.models import Document  # noqa: F401
 from app.modules.invites.models import Invite  # noqa: F401
 from app.modules.memberships.models import Membership  # noqa: F401
@@ -36,6 +41,11 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 target_metadata = SQLModel.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Leave the audit log partitions, which are managed at runtime, to themselves."""
+    return not (type_ == "table" and partition_month(name))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -46,6 +56,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +67,9 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection) -> None:
     """Run migrations with a connection."""
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
     with context.begin_transaction():
         context.run_migrations()
 
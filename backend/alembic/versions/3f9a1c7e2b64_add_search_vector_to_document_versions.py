@@ -0,0 +1,61 @@
+"""Add search_vector to document_versions
+
+Revision ID: 3f9a1c7e2b64
+Revises: cd4104f02be8
+Create Date: 2026-10-17 09:12:41.530214
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c7e2b64"
+down_revision: str | None = "cd4104f02be8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document_versions",
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+    )
+
+    # Only the current version of each document is indexed.
+    op.execute(
+        sa.text(
+            """
+            UPDATE document_versions AS v
+            SET search_vector =
+                setweight(to_tsvector(CAST(:config AS regconfig), d.title), 'A')
+                || setweight(to_tsvector(CAST(:config AS regconfig), coalesce(v.content, '')), 'B')
+            FROM documents AS d
+            WHERE d.current_version_id = v.id
+            """
+        ).bindparams(config=settings.SEARCH_TEXT_CONFIG)
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_document_versions_search_vector",
+            "document_versions",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_where=sa.text("search_vector IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_document_versions_search_vector",
+            table_name="document_versions",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("document_versions", "search_vector")
@@ -0,0 +1,47 @@
+"""Add delta storage to document_versions
+
+Existing versions become keyframes, which needs no data rewrite. Run
+``python -m app.modules.document_versions.compaction compact`` afterwards to
+convert their history into deltas.
+
+Revision ID: 7b2e5d9a4c13
+Revises: 3f9a1c7e2b64
+Create Date: 2026-10-17 14:03:27.118402
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e5d9a4c13"
+down_revision: str | None = "3f9a1c7e2b64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+version_storage = sa.Enum("keyframe", "delta", name="versionstorage")
+
+
+def upgrade() -> None:
+    version_storage.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        "document_versions",
+        sa.Column("storage", version_storage, nullable=False, server_default="keyframe"),
+    )
+    op.alter_column("document_versions", "storage", server_default=None)
+    op.add_column("document_versions", sa.Column("delta", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    # Rebuilding delta versions needs the application; refuse rather than lose history.
+    bind = op.get_bind()
+    pending = bind.scalar(sa.text("SELECT count(*) FROM document_versions WHERE content IS NULL"))
+    if pending:
+        raise RuntimeError(
+            f"{pending} versions are stored as deltas; run the compaction with "
+            "VERSION_KEYFRAME_INTERVAL=1 before downgrading"
+        )
+    op.drop_column("document_versions", "delta")
+    op.drop_column("document_versions", "storage")
+    version_storage.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,97 @@
+"""Add audit log rollups
+
+Hourly and daily counts of audit log entries per organization, action,
+resource type and user, which the audit writer keeps up to date from now
+on. The counts of the entries already in ``audit_logs`` are computed
+month by month, each month committed on its own, so no lock is held on
+``audit_logs`` beyond reading one month; months already archived are not
+counted. Entries the previous release writes while this runs are not
+counted either.
+
+Revision ID: 7d94ba289c9b
+Revises: c8e2b5f9a716
+Create Date: 2026-10-18 09:20:39.343332
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+from app.modules.audit_logs.partitions import attached_partitions, partition_bounds
+
+# revision identifiers, used by Alembic.
+revision: str = "7d94ba289c9b"
+down_revision: str | None = "c8e2b5f9a716"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+KEY = ["organization_id", "bucket", "action", "resource_type", "user_id"]
+
+# Adds up one month of ``source`` rows, timed by ``at``, into the ``table`` counts per ``unit``.
+BACKFILL = """
+INSERT INTO {table}
+    (id, created_at, updated_at, organization_id, bucket, action, resource_type, user_id, count)
+SELECT gen_random_uuid(), now(), now(), organization_id, date_trunc('{unit}', {at}, 'UTC'),
+       action, resource_type, user_id, {count}
+FROM {source}
+WHERE {at} >= '{start}' AND {at} < '{end}'
+GROUP BY organization_id, date_trunc('{unit}', {at}, 'UTC'), action, resource_type, user_id
+"""
+
+
+def _create_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("action", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column("resource_type", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(*KEY, name=f"uq_{name}_key"),
+    )
+
+
+def upgrade() -> None:
+    _create_table("audit_log_rollups_daily")
+    _create_table("audit_log_rollups_hourly")
+
+    with op.get_context().autocommit_block():
+        for month in sorted(attached_partitions(op.get_bind())):
+            start, end = partition_bounds(month)
+            op.execute(
+                BACKFILL.format(
+                    table="audit_log_rollups_hourly",
+                    unit="hour",
+                    source="audit_logs",
+                    at="created_at",
+                    count="count(*)",
+                    start=start,
+                    end=end,
+                )
+            )
+            # A month's days are made of its hours, so they add up the hourly counts.
+            op.execute(
+                BACKFILL.format(
+                    table="audit_log_rollups_daily",
+                    unit="day",
+                    source="audit_log_rollups_hourly",
+                    at="bucket",
+                    count="sum(count)",
+                    start=start,
+                    end=end,
+                )
+            )
+
+
+def downgrade() -> None:
+    op.drop_table("audit_log_rollups_hourly")
+    op.drop_table("audit_log_rollups_daily")
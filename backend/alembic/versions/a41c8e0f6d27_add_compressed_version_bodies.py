@@ -0,0 +1,77 @@
+"""Add compressed version bodies
+
+Existing rows stay uncompressed. Run
+``python -m app.modules.document_versions.compaction compact`` afterwards to
+compress large history bodies.
+
+Revision ID: a41c8e0f6d27
+Revises: 7b2e5d9a4c13
+Create Date: 2026-10-17 16:48:09.562731
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a41c8e0f6d27"
+down_revision: str | None = "7b2e5d9a4c13"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compression_dictionaries",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_compression_dictionaries_organization_id"),
+        "compression_dictionaries",
+        ["organization_id"],
+        unique=False,
+    )
+    op.add_column("document_versions", sa.Column("compressed", sa.LargeBinary(), nullable=True))
+    op.add_column(
+        "document_versions",
+        sa.Column("compression_dictionary_id", sa.Uuid(), nullable=True),
+    )
+    op.create_foreign_key(
+        "document_versions_compression_dictionary_id_fkey",
+        "document_versions",
+        "compression_dictionaries",
+        ["compression_dictionary_id"],
+        ["id"],
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    pending = bind.scalar(
+        sa.text("SELECT count(*) FROM document_versions WHERE compressed IS NOT NULL")
+    )
+    if pending:
+        raise RuntimeError(
+            f"{pending} versions are compressed; run the compaction with "
+            "VERSION_COMPRESSION_ENABLED=false before downgrading"
+        )
+    op.drop_constraint(
+        "document_versions_compression_dictionary_id_fkey",
+        "document_versions",
+        type_="foreignkey",
+    )
+    op.drop_column("document_versions", "compression_dictionary_id")
+    op.drop_column("document_versions", "compressed")
+    op.drop_index(
+        op.f("ix_compression_dictionaries_organization_id"),
+        table_name="compression_dictionaries",
+    )
+    op.drop_table("compression_dictionaries")
@@ -0,0 +1,93 @@
+"""Add keyset pagination indexes
+
+Every cursor-paginated listing filters on its tenant (and optionally a
+workspace, action or resource type) and orders by ``created_at DESC, id
+DESC``. Each gets an index with exactly those columns so pages are read in
+index order. The single-column indexes they make redundant are dropped.
+All indexes are built and dropped ``CONCURRENTLY``, so writes continue
+during the migration.
+
+Revision ID: b3e8f1a27c45
+Revises: e5a7d2c94b18
+Create Date: 2026-10-17 23:41:08.502117
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8f1a27c45"
+down_revision: str | None = "e5a7d2c94b18"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+KEYSET_INDEXES = [
+    ("documents", ["organization_id"]),
+    ("documents", ["organization_id", "workspace_id"]),
+    ("workspaces", ["organization_id"]),
+    ("invites", ["organization_id"]),
+    ("memberships", ["organization_id"]),
+    ("audit_logs", ["organization_id"]),
+    ("audit_logs", ["organization_id", "action"]),
+    ("audit_logs", ["organization_id", "resource_type"]),
+]
+
+REDUNDANT_INDEXES = [
+    ("documents", "organization_id"),
+    ("workspaces", "organization_id"),
+    ("invites", "organization_id"),
+    ("memberships", "organization_id"),
+    ("audit_logs", "organization_id"),
+    ("audit_logs", "action"),
+    ("audit_logs", "resource_type"),
+]
+
+
+def _keyset_index_name(table: str, columns: list[str]) -> str:
+    return f"ix_{table}_{'_'.join(columns)}_created_at_id"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, columns in KEYSET_INDEXES:
+            # A failed concurrent build leaves an invalid index behind; drop it
+            # so the migration can simply be rerun.
+            op.drop_index(
+                _keyset_index_name(table, columns),
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+            op.create_index(
+                _keyset_index_name(table, columns),
+                table,
+                [*columns, sa.text("created_at DESC"), sa.text("id DESC")],
+                postgresql_concurrently=True,
+            )
+        for table, column in REDUNDANT_INDEXES:
+            op.drop_index(
+                f"ix_{table}_{column}",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, column in REDUNDANT_INDEXES:
+            op.create_index(
+                f"ix_{table}_{column}",
+                table,
+                [column],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for table, columns in KEYSET_INDEXES:
+            op.drop_index(
+                _keyset_index_name(table, columns),
+                table_name=table,
+                postgresql_concurrently=True,
+            )
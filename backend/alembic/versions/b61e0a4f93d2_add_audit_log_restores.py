@@ -0,0 +1,64 @@
+"""Add audit log restores
+
+Archived months are now restored per organization, on request, in the
+background; ``audit_log_restores`` records which organization's entries
+of which month were loaded back. Months restored before this release hold
+every organization's entries, so a row is recorded for each organization
+that has entries in them, and their entries are not loaded a second time.
+
+Revision ID: b61e0a4f93d2
+Revises: 7d94ba289c9b
+Create Date: 2026-10-19 10:02:17.518230
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.modules.audit_logs.archive import restored_at
+from app.modules.audit_logs.partitions import attached_partitions
+
+# revision identifiers, used by Alembic.
+revision: str = "b61e0a4f93d2"
+down_revision: str | None = "7d94ba289c9b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_log_restores",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("restored_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "month", name="uq_audit_log_restores_month"),
+    )
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for month, name in attached_partitions(bind).items():
+        comment = bind.scalar(
+            sa.text("SELECT obj_description(to_regclass(:name), 'pg_class')"), {"name": name}
+        )
+        if (restored := restored_at(comment)) is None:
+            continue
+        bind.execute(
+            sa.text(
+                "INSERT INTO audit_log_restores "
+                "(id, created_at, updated_at, organization_id, month, restored_at) "
+                "SELECT gen_random_uuid(), now(), now(), organization_id, "
+                f"CAST(:month AS date), CAST(:restored AS timestamptz) FROM {name} "
+                "GROUP BY organization_id"
+            ),
+            {"month": month, "restored": restored},
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("audit_log_restores")
@@ -0,0 +1,188 @@
+"""Add content-addressed version blobs
+
+Versions stored as deltas or compressed get their full content back in
+``document_versions.content`` and the per-version storage columns are
+dropped. Run ``python -m app.modules.document_versions.compaction compact``
+afterwards to move history into shared blobs.
+
+Revision ID: c6d81f3e9a52
+Revises: a41c8e0f6d27
+Create Date: 2026-10-17 19:12:40.284915
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import zstandard
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.modules.document_versions.storage import apply_delta, decompress
+
+# revision identifiers, used by Alembic.
+revision: str = "c6d81f3e9a52"
+down_revision: str | None = "a41c8e0f6d27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Created by 7b2e5d9a4c13, now shared with content_blobs.
+version_storage = postgresql.ENUM("keyframe", "delta", name="versionstorage", create_type=False)
+
+
+def _decode(bind, dictionaries: dict, body, compressed, dictionary_id) -> str:
+    if body is not None:
+        return body
+    if dictionary_id is None:
+        return decompress(compressed)
+    if dictionary_id not in dictionaries:
+        data = bind.scalar(
+            sa.text("SELECT data FROM compression_dictionaries WHERE id = :id"),
+            {"id": dictionary_id},
+        )
+        dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(data)
+    return decompress(compressed, dictionaries[dictionary_id])
+
+
+def _restore_inline_contents(bind) -> None:
+    """Write the full content of every delta or compressed version back inline."""
+    dictionaries: dict = {}
+    document_ids = bind.scalars(
+        sa.text("SELECT DISTINCT document_id FROM document_versions WHERE content IS NULL")
+    ).all()
+    for document_id in document_ids:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, storage, content, delta, compressed, compression_dictionary_id "
+                "FROM document_versions WHERE document_id = :document_id "
+                "ORDER BY version_number"
+            ),
+            {"document_id": document_id},
+        ).all()
+        lines: list[str] = []
+        for row in rows:
+            if row.storage == "delta" and row.content is None:
+                delta = _decode(
+                    bind, dictionaries, row.delta, row.compressed, row.compression_dictionary_id
+                )
+                lines = apply_delta(lines, delta)
+            else:
+                content = _decode(
+                    bind, dictionaries, row.content, row.compressed, row.compression_dictionary_id
+                )
+                lines = content.splitlines(keepends=True)
+            if row.content is None:
+                bind.execute(
+                    sa.text("UPDATE document_versions SET content = :content WHERE id = :id"),
+                    {"content": "".join(lines), "id": row.id},
+                )
+
+
+def _restore_blob_contents(bind) -> None:
+    """Write the content of every version back inline from its blob."""
+    dictionaries: dict = {}
+    contents: dict = {}
+
+    def content_of(blob_id) -> str:
+        if blob_id not in contents:
+            blob = bind.execute(
+                sa.text(
+                    "SELECT storage, base_blob_id, body, compressed, compression_dictionary_id "
+                    "FROM content_blobs WHERE id = :id"
+                ),
+                {"id": blob_id},
+            ).one()
+            body = _decode(
+                bind, dictionaries, blob.body, blob.compressed, blob.compression_dictionary_id
+            )
+            if blob.storage == "delta":
+                base = content_of(blob.base_blob_id).splitlines(keepends=True)
+                body = "".join(apply_delta(base, body))
+            contents[blob_id] = body
+        return contents[blob_id]
+
+    rows = bind.execute(
+        sa.text("SELECT id, blob_id FROM document_versions WHERE content IS NULL ORDER BY blob_id")
+    ).all()
+    for row in rows:
+        bind.execute(
+            sa.text("UPDATE document_versions SET content = :content WHERE id = :id"),
+            {"content": content_of(row.blob_id), "id": row.id},
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_blobs",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("storage", version_storage, nullable=False),
+        sa.Column("base_blob_id", sa.Uuid(), nullable=True),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.Column("body", sa.Text(), nullable=True),
+        sa.Column("compressed", sa.LargeBinary(), nullable=True),
+        sa.Column("compression_dictionary_id", sa.Uuid(), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["base_blob_id"], ["content_blobs.id"]),
+        sa.ForeignKeyConstraint(["compression_dictionary_id"], ["compression_dictionaries.id"]),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "content_hash"),
+    )
+    op.create_index(
+        op.f("ix_content_blobs_base_blob_id"), "content_blobs", ["base_blob_id"], unique=False
+    )
+    op.add_column("document_versions", sa.Column("blob_id", sa.Uuid(), nullable=True))
+    op.create_index(
+        op.f("ix_document_versions_blob_id"), "document_versions", ["blob_id"], unique=False
+    )
+    op.create_foreign_key(
+        "document_versions_blob_id_fkey",
+        "document_versions",
+        "content_blobs",
+        ["blob_id"],
+        ["id"],
+    )
+
+    _restore_inline_contents(op.get_bind())
+    op.drop_constraint(
+        "document_versions_compression_dictionary_id_fkey",
+        "document_versions",
+        type_="foreignkey",
+    )
+    op.drop_column("document_versions", "compression_dictionary_id")
+    op.drop_column("document_versions", "compressed")
+    op.drop_column("document_versions", "delta")
+    op.drop_column("document_versions", "storage")
+
+
+def downgrade() -> None:
+    # Every version becomes an uncompressed keyframe again.
+    op.add_column(
+        "document_versions",
+        sa.Column("storage", version_storage, nullable=False, server_default="keyframe"),
+    )
+    op.alter_column("document_versions", "storage", server_default=None)
+    op.add_column("document_versions", sa.Column("delta", sa.Text(), nullable=True))
+    op.add_column("document_versions", sa.Column("compressed", sa.LargeBinary(), nullable=True))
+    op.add_column(
+        "document_versions",
+        sa.Column("compression_dictionary_id", sa.Uuid(), nullable=True),
+    )
+    op.create_foreign_key(
+        "document_versions_compression_dictionary_id_fkey",
+        "document_versions",
+        "compression_dictionaries",
+        ["compression_dictionary_id"],
+        ["id"],
+    )
+
+    _restore_blob_contents(op.get_bind())
+    op.drop_constraint("document_versions_blob_id_fkey", "document_versions", type_="foreignkey")
+    op.drop_index(op.f("ix_document_versions_blob_id"), table_name="document_versions")
+    op.drop_column("document_versions", "blob_id")
+    op.drop_index(op.f("ix_content_blobs_base_blob_id"), table_name="content_blobs")
+    op.drop_table("content_blobs")
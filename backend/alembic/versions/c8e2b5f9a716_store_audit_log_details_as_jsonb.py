@@ -0,0 +1,142 @@
+"""Store audit log details as JSONB
+
+``audit_logs.details`` becomes ``jsonb`` with a ``jsonb_path_ops`` GIN
+index, so listings can filter on containment (``details @> '{...}'``).
+Text that is a JSON object is kept as is; any other text is kept as
+``{"text": <original>}``.
+
+Rewriting the column in place would lock the table for the whole
+conversion, so the rows are converted into a new ``details_json`` column
+instead, in batches of ``BATCH`` rows walked in primary key order, each
+batch committed on its own. A trigger converts entries written or
+changed meanwhile. Only the final swap (drop the text column, rename the
+new one) takes an exclusive lock, and it touches no rows; the space of
+the dropped column is reclaimed as rows are rewritten or vacuumed. The
+GIN index is then built as in ``f27b6c0d8e43``: concurrently, partition
+by partition.
+
+Deploy with the code that writes ``details`` as objects; code writing
+text would fail once the columns are swapped. An interrupted upgrade can
+simply be rerun. Downgrading converts the objects back to JSON text, in place.
+
+Revision ID: c8e2b5f9a716
+Revises: f27b6c0d8e43
+Create Date: 2026-10-18 05:41:09.118274
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from uuid import UUID
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.modules.audit_logs.partitions import attached_partitions
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e2b5f9a716"
+down_revision: str | None = "f27b6c0d8e43"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH = 10_000
+INDEX = "ix_audit_logs_details"
+
+CONVERT = """
+CREATE OR REPLACE FUNCTION audit_logs_details_jsonb(details text) RETURNS jsonb
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN details IS JSON OBJECT THEN details::jsonb
+        ELSE jsonb_build_object('text', details)
+    END
+$$
+"""
+
+SYNC = """
+CREATE OR REPLACE FUNCTION audit_logs_details_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.details_json := audit_logs_details_jsonb(NEW.details);
+    RETURN NEW;
+END
+$$
+"""
+
+# Converts the next BATCH rows after (:id, :created_at) and returns the last key.
+CONVERT_BATCH = sa.text(
+    """
+    WITH batch AS (
+        SELECT id, created_at FROM audit_logs
+        WHERE (id, created_at) > (:id, :created_at)
+        ORDER BY id, created_at
+        LIMIT :batch
+    ), converted AS (
+        UPDATE audit_logs AS a SET details_json = audit_logs_details_jsonb(a.details)
+        FROM batch AS b
+        WHERE a.id = b.id AND a.created_at = b.created_at AND a.details IS NOT NULL
+    )
+    SELECT id, created_at FROM batch ORDER BY id DESC, created_at DESC LIMIT 1
+    """
+)
+
+
+def _details_type() -> str:
+    return op.get_bind().scalar(
+        sa.text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'audit_logs' AND column_name = 'details' "
+            "AND table_schema = current_schema()"
+        )
+    )
+
+
+def _convert() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS details_json jsonb")
+        op.execute(CONVERT)
+        op.execute(SYNC)
+        op.execute("DROP TRIGGER IF EXISTS audit_logs_details_sync ON audit_logs")
+        op.execute(
+            "CREATE TRIGGER audit_logs_details_sync "
+            "BEFORE INSERT OR UPDATE OF details ON audit_logs "
+            "FOR EACH ROW EXECUTE FUNCTION audit_logs_details_sync()"
+        )
+        conn = op.get_bind()
+        key = {"id": UUID(int=0), "created_at": datetime.min.replace(tzinfo=UTC)}
+        while last := conn.execute(CONVERT_BATCH, {**key, "batch": BATCH}).first():
+            key = {"id": last.id, "created_at": last.created_at}
+
+    # Back in a transaction: the swap is all or nothing.
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("DROP TRIGGER audit_logs_details_sync ON audit_logs")
+    op.execute("ALTER TABLE audit_logs DROP COLUMN details")
+    op.execute("ALTER TABLE audit_logs RENAME COLUMN details_json TO details")
+    op.execute("DROP FUNCTION audit_logs_details_sync()")
+    op.execute("DROP FUNCTION audit_logs_details_jsonb(text)")
+
+
+def upgrade() -> None:
+    if _details_type() != "jsonb":
+        _convert()
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX IF EXISTS {INDEX}")
+        op.execute(f"CREATE INDEX {INDEX} ON ONLY audit_logs USING gin (details jsonb_path_ops)")
+        for partition in attached_partitions(op.get_bind()).values():
+            index = f"{partition}_details_idx"
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY {index} ON {partition} USING gin (details jsonb_path_ops)"
+            )
+            op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {index}")
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="audit_logs")
+    op.alter_column(
+        "audit_logs",
+        "details",
+        type_=sa.Text(),
+        postgresql_using="details::text",
+        existing_nullable=True,
+    )
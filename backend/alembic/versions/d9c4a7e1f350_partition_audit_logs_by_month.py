@@ -0,0 +1,105 @@
+"""Partition audit_logs by month
+
+``audit_logs`` becomes range partitioned on ``created_at``, one partition
+per month, so expired months can be archived and dropped whole. The
+primary key becomes ``(id, created_at)``, as a partitioned table's keys
+must include the partition column. Existing entries are copied into
+partitions created for every month from the oldest entry to
+``AUDIT_PARTITION_MONTHS_AHEAD`` months ahead.
+
+The copy holds an exclusive lock on ``audit_logs``; the audit writer keeps
+retrying its batches meanwhile, so no entries are lost if the application
+keeps running. Downgrading copies the attached months back into a plain
+table; months already archived stay in their archive files.
+
+Revision ID: d9c4a7e1f350
+Revises: b3e8f1a27c45
+Create Date: 2026-10-17 23:58:12.730641
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+from app.core.config import settings
+from app.modules.audit_logs.partitions import add_months, create_partitions, month_of
+
+# revision identifiers, used by Alembic.
+revision: str = "d9c4a7e1f350"
+down_revision: str | None = "b3e8f1a27c45"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+KEYSET_INDEXES = [
+    ["organization_id"],
+    ["organization_id", "action"],
+    ["organization_id", "resource_type"],
+]
+
+
+def _create_table(name: str, primary_key: list[str], **kwargs) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("action", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column("resource_type", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("resource_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("organization_id", sa.Uuid(), nullable=False),
+        sa.Column("details", sa.Text(), nullable=True),
+        sa.Column("ip_address", sqlmodel.sql.sqltypes.AutoString(length=45), nullable=True),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint(*primary_key, name="audit_logs_pkey"),
+        **kwargs,
+    )
+
+
+def _create_indexes() -> None:
+    for columns in KEYSET_INDEXES:
+        op.create_index(
+            f"ix_audit_logs_{'_'.join(columns)}_created_at_id",
+            "audit_logs",
+            [*columns, sa.text("created_at DESC"), sa.text("id DESC")],
+        )
+    op.create_index("ix_audit_logs_user_id", "audit_logs", ["user_id"])
+
+
+def _set_aside_old_table() -> None:
+    op.rename_table("audit_logs", "audit_logs_old")
+    op.execute("ALTER TABLE audit_logs_old DROP CONSTRAINT audit_logs_pkey")
+    op.drop_index("ix_audit_logs_user_id", table_name="audit_logs_old")
+    for columns in KEYSET_INDEXES:
+        op.drop_index(
+            f"ix_audit_logs_{'_'.join(columns)}_created_at_id", table_name="audit_logs_old"
+        )
+
+
+def upgrade() -> None:
+    _set_aside_old_table()
+    _create_table("audit_logs", ["id", "created_at"], postgresql_partition_by="RANGE (created_at)")
+    _create_indexes()
+
+    now = datetime.now(UTC)
+    oldest = op.get_bind().scalar(sa.text("SELECT min(created_at) FROM audit_logs_old")) or now
+    create_partitions(
+        op.get_bind(),
+        month_of(oldest.astimezone(UTC)),
+        add_months(month_of(now), settings.AUDIT_PARTITION_MONTHS_AHEAD),
+    )
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_old")
+    op.drop_table("audit_logs_old")
+
+
+def downgrade() -> None:
+    _set_aside_old_table()
+    _create_table("audit_logs", ["id"])
+    _create_indexes()
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_old")
+    # Dropping the partitioned table drops its partitions.
+    op.drop_table("audit_logs_old")
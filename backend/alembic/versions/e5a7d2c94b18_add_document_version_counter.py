@@ -0,0 +1,75 @@
+"""Add document version counter
+
+Versions are numbered from ``documents.version_count`` and
+``(document_id, version_number)`` becomes unique. Duplicate numbers left by
+concurrent saves are renumbered in creation order first.
+
+Revision ID: e5a7d2c94b18
+Revises: c6d81f3e9a52
+Create Date: 2026-10-17 21:04:37.118520
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a7d2c94b18"
+down_revision: str | None = "c6d81f3e9a52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE document_versions AS v SET version_number = r.number
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY document_id ORDER BY version_number, created_at, id
+            ) AS number
+            FROM document_versions
+            WHERE document_id IN (
+                SELECT document_id FROM document_versions
+                GROUP BY document_id, version_number HAVING count(*) > 1
+            )
+        ) AS r
+        WHERE v.id = r.id
+        """
+    )
+    op.drop_index(op.f("ix_document_versions_document_id"), table_name="document_versions")
+    op.create_unique_constraint(
+        "document_versions_document_id_version_number_key",
+        "document_versions",
+        ["document_id", "version_number"],
+    )
+
+    op.add_column(
+        "documents",
+        sa.Column("version_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.alter_column("documents", "version_count", server_default=None)
+    op.execute(
+        """
+        UPDATE documents AS d SET version_count = v.latest
+        FROM (
+            SELECT document_id, max(version_number) AS latest
+            FROM document_versions GROUP BY document_id
+        ) AS v
+        WHERE v.document_id = d.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "version_count")
+    op.drop_constraint(
+        "document_versions_document_id_version_number_key", "document_versions", type_="unique"
+    )
+    op.create_index(
+        op.f("ix_document_versions_document_id"),
+        "document_versions",
+        ["document_id"],
+        unique=False,
+    )
@@ -0,0 +1,186 @@
+"""
+Caching primitives.
+
+``TTLCache`` is a bounded in-process LRU with per-entry expiry.
+``TwoTierCache`` puts a short-lived ``TTLCache`` in front of Redis so hot
+keys are served from process memory, warm keys from Redis, and everything
+falls back to the caller's source of truth when Redis is unavailable.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core import redis as redis_module
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache."""
+
+    local_hits: int = 0
+    remote_hits: int = 0
+    misses: int = 0
+    remote_errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.remote_hits + self.misses
+        return (self.local_hits + self.remote_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "local_hits": self.local_hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "remote_errors": self.remote_errors,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a time-to-live.
+
+    Args:
+        maxsize: Maximum number of entries; the least recently used is evicted.
+        ttl: Default time-to-live in seconds, overridable per ``set`` call.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TwoTierCache:
+    """JSON cache with an in-process tier in front of Redis.
+
+    Redis failures never propagate: they are logged, counted, and Redis is
+    skipped for ``retry_after`` seconds so a dead server does not add a
+    timeout to every lookup. Callers treat a ``None`` result as a miss and
+    load from the database.
+
+    Args:
+        namespace: Prefix for Redis keys.
+        maxsize: Capacity of the in-process tier.
+        local_ttl: Lifetime of in-process entries. Invalidations only reach
+            other workers through Redis, so this bounds cross-worker staleness.
+        remote_ttl: Lifetime of Redis entries.
+        retry_after: Seconds to bypass Redis after an error.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        maxsize: int,
+        local_ttl: float,
+        remote_ttl: int,
+        retry_after: float = 5.0,
+    ):
+        self.namespace = namespace
+        self.local = TTLCache(maxsize, local_ttl)
+        self.remote_ttl = remote_ttl
+        self.retry_after = retry_after
+        self.stats = CacheStats()
+        self._remote_down_until = 0.0
+
+    def _redis(self):
+        if redis_module.redis_client is None or time.monotonic() < self._remote_down_until:
+            return None
+        return redis_module.redis_client
+
+    def _remote_failed(self, exc: Exception) -> None:
+        self.stats.remote_errors += 1
+        self._remote_down_until = time.monotonic() + self.retry_after
+        logger.warning("Cache %s: Redis unavailable (%s), using database", self.namespace, exc)
+
+    async def get(self, key: str) -> Any | None:
+        """Return the cached value for ``key`` or ``None`` on a miss."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats.local_hits += 1
+            return value
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(f"{self.namespace}:{key}")
+            except (RedisError, OSError) as exc:
+                self._remote_failed(exc)
+            else:
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value)
+                    self.stats.remote_hits += 1
+                    return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in both tiers."""
+        self.local.set(key, value)
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(f"{self.namespace}:{key}", json.dumps(value), ex=self.remote_ttl)
+        except (RedisError, OSError) as exc:
+            self._remote_failed(exc)
+
+    async def delete(self, *keys: str) -> None:
+        """Invalidate keys in both tiers."""
+        for key in keys:
+            self.local.delete(key)
+        redis = self._redis()
+        if redis is None or not keys:
+            return
+        try:
+            await redis.delete(*(f"{self.namespace}:{key}" for key in keys))
+        except (RedisError, OSError) as exc:
+            self._remote_failed(exc)
+
+    def clear_local(self) -> None:
+        """Drop the in-process tier (Redis entries are left untouched)."""
+        self.local.clear()
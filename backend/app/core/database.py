@@ -3,7 +3,7 @@ Async database engine and session management.
 
 """
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
@@ -32,6 +32,23 @@ async def create_tables() -> None:
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run ``callback`` once the session's transaction has committed through :func:`commit`.
+
+    For cache invalidations: dropped before the commit, an entry could be
+    stored again from the old rows by a read that runs before the commit.
+    Callbacks are discarded if the transaction rolls back.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit the session, then run its :func:`after_commit` callbacks."""
+    await session.commit()
+    for callback in session.info.pop("after_commit", []):
+        await callback()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency that yields an async database session.
 
@@ -44,7 +61,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
         try:
             yield session
-            await session.commit()
+            await commit(session)
         except Exception:
+            session.info.pop("after_commit", None)
             await session.rollback()
             raise
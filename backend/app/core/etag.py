@@ -0,0 +1,93 @@
+"""
+Entity tags for conditional GETs.
+
+Routes send a strong ``ETag`` built with :func:`make_etag` and answer a
+matching ``If-None-Match`` with a bodyless 304. They also remember the
+ETag in ``validator_cache`` under a key naming the resource, so a repeat
+request can get its 304 from :func:`cached_not_modified` before the row is
+loaded. Services that change a resource must :func:`forget_etags` its keys,
+passing their session: the keys are dropped again once it commits, as a
+read racing the write may have stored the old ETag meanwhile. As with the
+auth cache, other workers may still answer with the old ETag for up to
+``ETAG_CACHE_LOCAL_TTL_SECONDS`` after that.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.core.database import after_commit
+from app.core.metrics import register_metrics
+
+validator_cache = TwoTierCache(
+    "etag",
+    maxsize=settings.ETAG_CACHE_MAX_ENTRIES,
+    local_ttl=settings.ETAG_CACHE_LOCAL_TTL_SECONDS,
+    remote_ttl=settings.ETAG_CACHE_TTL_SECONDS,
+)
+register_metrics("etag_cache", validator_cache.stats.as_dict)
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_key(*parts: object) -> str:
+    """Build a ``validator_cache`` key, skipping ``None`` parts."""
+    return ":".join(str(part) for part in parts if part is not None)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str | None = None) -> Response:
+    """A 304 response for ``etag``; nothing is serialized."""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+async def cached_not_modified(
+    request: Request, key: str, cache_control: str | None = None
+) -> Response | None:
+    """Answer 304 from the ETag remembered under ``key``, or return ``None``.
+
+    Only conditional requests consult the cache.
+    """
+    if "if-none-match" not in request.headers:
+        return None
+    etag = await validator_cache.get(key)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return None
+
+
+async def remember_etag(key: str, etag: str) -> None:
+    """Store the current ETag of the resource named by ``key``."""
+    await validator_cache.set(key, etag)
+
+
+async def forget_etags(*keys: str, db: AsyncSession | None = None) -> None:
+    """Drop remembered ETags after their resources changed or were deleted.
+
+    With ``db``, drop them again once its transaction commits.
+    """
+    await validator_cache.delete(*keys)
+    if db is not None:
+        after_commit(db, lambda: validator_cache.delete(*keys))
@@ -52,6 +52,13 @@ class ConflictException(AppException):
         super().__init__(detail=detail, status_code=409)
 
 
+class TooManyRequestsException(AppException):
+    """Server is saturated, retry later (429)."""
+
+    def __init__(self, detail: str = "Too many requests, please retry shortly"):
+        super().__init__(detail=detail, status_code=429)
+
+
 # ── Exception Handlers ───────────────────────────────────
 
 
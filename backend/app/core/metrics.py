@@ -0,0 +1,46 @@
+"""
+In-process metrics registry.
+
+Components register a provider returning a flat mapping of counters and
+gauges; ``metrics_snapshot`` collects them for the ``/metrics`` endpoint.
+The endpoint is internal: it requires ``METRICS_TOKEN`` as a bearer token
+or, if none is configured, is only served with ``DEBUG`` on.
+"""
+
+import hmac
+from collections.abc import Callable
+
+from fastapi import Header
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundException, UnauthorizedException
+
+MetricsProvider = Callable[[], dict[str, float]]
+
+_providers: dict[str, MetricsProvider] = {}
+
+
+def register_metrics(name: str, provider: MetricsProvider) -> None:
+    """Register (or replace) a named metrics provider."""
+    _providers[name] = provider
+
+
+def metrics_snapshot() -> dict[str, dict[str, float]]:
+    """Collect the current values from every registered provider."""
+    return {name: provider() for name, provider in _providers.items()}
+
+
+def require_metrics_access(authorization: str | None = Header(None)) -> None:
+    """Dependency: check that the request may read ``/metrics``.
+
+    Raises:
+        NotFoundException: If no ``METRICS_TOKEN`` is configured and ``DEBUG`` is off.
+        UnauthorizedException: If the bearer token is not ``METRICS_TOKEN``.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise NotFoundException("Not Found")
+        return
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        raise UnauthorizedException("Invalid metrics token")
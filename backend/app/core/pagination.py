@@ -0,0 +1,197 @@
+"""
+Keyset pagination.
+
+:func:`paginate` pages through a ``select`` ordered by a unique key, such as
+``created_at DESC, id DESC``. Each page is one query that continues after
+(or, going back, before) the key of the row it was reached from. It does
+not use ``OFFSET``, so a deep page costs as much as the first one, given an
+index matching the ordering (see ``keyset_index``).
+
+Cursors are the key values of a boundary row plus the direction, as
+base64 JSON signed with an HMAC of ``SECRET_KEY``. Clients cannot forge or
+edit them, and a cursor from one listing is rejected by a listing with
+another ordering.
+
+Rows are fetched through the session's connection (Core). No ORM objects
+are built or added to the identity map; each row is validated straight
+into the response schema.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+
+from fastapi import Query
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, and_, literal, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+
+T = TypeVar("T", bound=BaseModel)
+
+_SIGNING_KEY = hashlib.sha256(f"keyset-cursor:{settings.SECRET_KEY}".encode()).digest()
+
+
+class KeysetParams(BaseModel):
+    """Query parameters of a keyset-paginated listing."""
+
+    cursor: str | None = Query(None, description="`next_page` or `previous_page` of a page")
+    size: int = Query(50, ge=1, le=100, description="Page size")
+
+
+class KeysetPage(BaseModel, Generic[T]):
+    """A page of a keyset-paginated listing.
+
+    Pass ``next_page`` or ``previous_page`` back as ``cursor`` to move by
+    one page; each is ``None`` when there is nothing in that direction.
+    """
+
+    items: list[T]
+    previous_page: str | None = None
+    next_page: str | None = None
+
+
+def _sort_key(clause: ColumnElement) -> tuple[ColumnElement, bool]:
+    """Split an ``order_by`` clause into its column and whether it is descending."""
+    modifier = getattr(clause, "modifier", None)
+    if modifier is operators.desc_op:
+        return clause.element, True
+    if modifier is operators.asc_op:
+        return clause.element, False
+    return clause, False
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def _from_json(column: ColumnElement, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _signature(payload: bytes) -> str:
+    digest = hmac.new(_SIGNING_KEY, payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def _scope(keys: Sequence[tuple[ColumnElement, bool]]) -> str:
+    """Name the ordering a cursor belongs to."""
+    return ",".join(f"{column}{' desc' if descending else ''}" for column, descending in keys)
+
+
+def encode_cursor(
+    keys: Sequence[tuple[ColumnElement, bool]], values: Sequence[Any], backwards: bool
+) -> str:
+    """Encode and sign the key ``values`` of a boundary row."""
+    payload = json.dumps(
+        [_scope(keys), list(values), backwards], default=_json_default, separators=(",", ":")
+    ).encode()
+    return f"{base64.urlsafe_b64encode(payload).decode().rstrip('=')}.{_signature(payload)}"
+
+
+def decode_cursor(
+    keys: Sequence[tuple[ColumnElement, bool]], cursor: str
+) -> tuple[list[Any], bool]:
+    """Verify a cursor and return its key values and direction.
+
+    Raises:
+        BadRequestException: If the cursor is malformed, was tampered with,
+            or belongs to a listing with another ordering.
+    """
+    try:
+        encoded, signature = cursor.split(".")
+        payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+        if not hmac.compare_digest(signature, _signature(payload)):
+            raise ValueError("bad signature")
+        scope, values, backwards = json.loads(payload)
+        if scope != _scope(keys) or len(values) != len(keys):
+            raise ValueError("cursor of another listing")
+        return [
+            _from_json(column, value) for (column, _), value in zip(keys, values, strict=True)
+        ], bool(backwards)
+    except (ValueError, TypeError) as exc:
+        raise BadRequestException("Invalid cursor") from exc
+
+
+def _after(keys: Sequence[tuple[ColumnElement, bool]], values: Sequence[Any]) -> ColumnElement:
+    """Build the predicate for rows that sort after ``values``."""
+    bound = [
+        literal(value, type_=column.type) for (column, _), value in zip(keys, values, strict=True)
+    ]
+    if len({descending for _, descending in keys}) == 1:
+        # A single row comparison, which an index on the key can seek to.
+        columns = tuple_(*(column for column, _ in keys))
+        return columns < tuple_(*bound) if keys[0][1] else columns > tuple_(*bound)
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [keys[j][0] == bound[j] for j in range(i)]
+        beyond = column < bound[i] if descending else column > bound[i]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order_by: Sequence[ColumnElement],
+    params: KeysetParams,
+    schema: type[T],
+) -> KeysetPage[T]:
+    """Fetch one page of ``query`` in the order of ``order_by``.
+
+    ``order_by`` must identify rows uniquely (end it with the primary key)
+    and its columns must be non-null and selected by ``query``, whose own
+    ordering is replaced.
+
+    Raises:
+        BadRequestException: If ``params.cursor`` is invalid.
+    """
+    keys = [_sort_key(clause) for clause in order_by]
+    values, backwards = decode_cursor(keys, params.cursor) if params.cursor else (None, False)
+
+    # Going back, the query runs in reverse order and the page is flipped after.
+    fetch_keys = [(column, descending != backwards) for column, descending in keys]
+    query = query.order_by(None).order_by(
+        *(column.desc() if descending else column.asc() for column, descending in fetch_keys)
+    )
+    if values is not None:
+        query = query.where(_after(fetch_keys, values))
+    connection = await db.connection()
+    rows = (await connection.execute(query.limit(params.size + 1))).all()
+
+    more = len(rows) > params.size
+    rows = rows[: params.size]
+    if backwards:
+        rows.reverse()
+    items = [schema.model_validate(row) for row in rows]
+    if not rows:
+        return KeysetPage[schema](items=items)
+
+    def key_of(row) -> list[Any]:
+        return [row._mapping[column] for column, _ in keys]
+
+    first, last = key_of(rows[0]), key_of(rows[-1])
+    has_previous = more if backwards else values is not None
+    has_next = values is not None if backwards else more
+    return KeysetPage[schema](
+        items=items,
+        previous_page=encode_cursor(keys, first, backwards=True) if has_previous else None,
+        next_page=encode_cursor(keys, last, backwards=False) if has_next else None,
+    )
@@ -16,6 +16,8 @@ async def init_redis() -> Redis:
         settings.REDIS_URL,
         encoding="utf-8",
         decode_responses=True,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
     )
     return redis_client
 
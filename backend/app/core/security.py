@@ -4,13 +4,23 @@ Security utilities.
 JWT token creation/verification and password hashing.
 """
 
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.exceptions import TooManyRequestsException
+from app.core.metrics import register_metrics
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -28,6 +38,90 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHashPool:
+    """Runs bcrypt work off the event loop in a bounded worker pool.
+
+    At most ``workers`` hashes run at once and at most ``queue_size`` more
+    wait for a worker. Anything beyond that is rejected immediately with a
+    429 instead of queueing unboundedly during a login storm.
+
+    Args:
+        workers: Number of threads or processes.
+        queue_size: Number of calls allowed to wait for a free worker.
+        kind: ``"thread"`` (bcrypt releases the GIL) or ``"process"``.
+    """
+
+    def __init__(self, workers: int, queue_size: int, kind: str = "thread"):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.kind = kind
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool.
+
+        Raises:
+            TooManyRequestsException: If the pool and its queue are full.
+        """
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise TooManyRequestsException("Authentication service is busy, please retry shortly")
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the workers (a new pool is created lazily on next use)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_EXECUTOR,
+)
+register_metrics("password_hash_pool", password_hash_pool.metrics)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the worker pool without blocking the event loop."""
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the worker pool without blocking the event loop."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 # ── JWT Tokens ───────────────────────────────────────────
 
 
@@ -67,3 +161,69 @@ def decode_token(token: str) -> dict:
         return payload
     except JWTError:
         raise
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified token claims, keyed by the token's SHA-256 digest.
+
+    Entries live exactly as long as the token: the TTL is derived from the
+    ``exp`` claim and ``exp`` is re-checked against the wall clock on every
+    hit. Only tokens that passed signature verification are stored.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize, ttl=0)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        """Return a copy of the cached claims, or ``None`` if absent or expired."""
+        key = self._key(token)
+        claims = self._cache.get(key)
+        if claims is not None and claims["exp"] <= time.time():
+            self._cache.delete(key)
+            claims = None
+        if claims is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        """Cache verified claims until the token's ``exp``."""
+        exp = claims.get("exp")
+        if isinstance(exp, int | float):
+            self._cache.set(self._key(token), dict(claims), ttl=exp - time.time())
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def metrics(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+verified_token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+register_metrics("token_cache", verified_token_cache.metrics)
+
+
+def decode_token_cached(token: str) -> dict:
+    """Decode a JWT, skipping signature verification for recently verified tokens.
+
+    Raises:
+        JWTError: If the token is invalid or expired.
+    """
+    claims = verified_token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        verified_token_cache.put(token, claims)
+    return claims
@@ -5,43 +5,77 @@ Provides reusable FastAPI dependencies for authentication,
 tenant context resolution, and role-based access control.
 """
 
+from dataclasses import dataclass
 from uuid import UUID
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
-from sqlalchemy import select
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.exceptions import ForbiddenException, UnauthorizedException
-from app.core.security import decode_token
+from app.core.security import decode_token_cached
+from app.modules.auth.cache import (
+    cache_membership,
+    cache_user,
+    get_cached_membership,
+    get_cached_user,
+)
 from app.modules.memberships.models import Membership, RoleEnum
 from app.modules.users.models import User
 
 bearer_scheme = HTTPBearer()
 
 
-async def get_current_user(
+@dataclass(frozen=True)
+class TenantContext:
+    """The authenticated user and their membership in the requested organization.
+
+    Attributes:
+        user: The authenticated, active user.
+        membership: The user's membership in the organization from the path.
+    """
+
+    user: User
+    membership: Membership
+
+    @property
+    def org_id(self) -> UUID:
+        return self.membership.organization_id
+
+    @property
+    def role(self) -> RoleEnum:
+        return self.membership.role
+
+
+def get_token_user_id(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Dependency: extract and validate the current user from the JWT token.
+) -> UUID:
+    """Dependency: validate the bearer access token and return its subject.
+
+    Verified tokens are cached until they expire, so repeat requests with
+    the same token skip JWT parsing and signature verification. The subject
+    is also kept on ``request.state.user_id`` for the audit hook.
 
     Raises:
-        UnauthorizedException: If the token is invalid or user does not exist.
+        UnauthorizedException: If the token is invalid, expired or not an access token.
     """
     try:
-        payload = decode_token(credentials.credentials)
+        payload = decode_token_cached(credentials.credentials)
         user_id = payload.get("sub")
         token_type = payload.get("type")
         if user_id is None or token_type != "access":
             raise UnauthorizedException("Invalid token")
-    except JWTError:
+        request.state.user_id = UUID(user_id)
+        return request.state.user_id
+    except (JWTError, ValueError):
         raise UnauthorizedException("Invalid or expired token") from None
 
-    result = await db.execute(select(User).where(User.id == UUID(user_id)))
-    user = result.scalar_one_or_none()
+
+def _ensure_active(user: User | None) -> User:
     if user is None:
         raise UnauthorizedException("User not found")
     if not user.is_active:
@@ -49,62 +83,146 @@ async def get_current_user(
     return user
 
 
-async def get_current_org_id(
+async def get_current_user(
+    user_id: UUID = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Dependency: extract and validate the current user from the JWT token.
+
+    The user is served from the auth cache when possible.
+
+    Raises:
+        UnauthorizedException: If the token is invalid or user does not exist.
+    """
+    user = await get_cached_user(user_id)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await cache_user(user)
+    return _ensure_active(user)
+
+
+async def lookup_tenant(
+    db: AsyncSession, user_id: UUID, org_id: UUID
+) -> tuple[User | None, Membership | None]:
+    """Load a user and their membership in an organization, either ``None`` if missing.
+
+    Both come from the auth cache or, on a miss, from a single joined query.
+    """
+    user = await get_cached_user(user_id)
+    membership = await get_cached_membership(user_id, org_id) if user else None
+    if user is None or membership is None:
+        result = await db.execute(
+            select(User, Membership)
+            .outerjoin(
+                Membership,
+                and_(Membership.user_id == User.id, Membership.organization_id == org_id),
+            )
+            .where(User.id == user_id)
+        )
+        user, membership = result.one_or_none() or (None, None)
+        if user is not None:
+            await cache_user(user)
+        if membership is not None:
+            await cache_membership(membership)
+    return user, membership
+
+
+async def has_role(db: AsyncSession, user_id: UUID, org_id: UUID, *allowed_roles: RoleEnum) -> bool:
+    """Whether a user is still active and holds one of the allowed roles in an organization.
+
+    For responses that outlive the request's checks, such as streams,
+    to check access again while they run.
+    """
+    user, membership = await lookup_tenant(db, user_id, org_id)
+    return (
+        user is not None
+        and user.is_active
+        and membership is not None
+        and membership.role in allowed_roles
+    )
+
+
+async def get_tenant_context(
     org_id: UUID,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    user_id: UUID = Depends(get_token_user_id),
     db: AsyncSession = Depends(get_db),
-) -> UUID:
-    """Dependency: resolve and validate organization context.
+) -> TenantContext:
+    """Dependency: resolve the current user and their organization membership.
 
-    Ensures the current user is a member of the specified organization.
+    User, membership and role come from the auth cache or, on a miss, from
+    a single joined query. The result is memoized on ``request.state`` (on
+    top of FastAPI's per-request dependency cache), so ``get_current_org_id``,
+    ``get_tenant_user`` and every ``require_role`` checker on a route share
+    one lookup.
 
     Args:
         org_id: Organization ID from path parameter.
 
     Raises:
-        ForbiddenException: If user is not a member of the organization.
+        UnauthorizedException: If the user does not exist or is deactivated.
+        ForbiddenException: If the user is not a member of the organization.
     """
-    result = await db.execute(
-        select(Membership).where(
-            Membership.user_id == current_user.id,
-            Membership.organization_id == org_id,
-        )
-    )
-    membership = result.scalar_one_or_none()
+    cached: TenantContext | None = getattr(request.state, "tenant_context", None)
+    if cached is not None and cached.user.id == user_id and cached.org_id == org_id:
+        return cached
+
+    user, membership = await lookup_tenant(db, user_id, org_id)
+    _ensure_active(user)
     if membership is None:
         raise ForbiddenException("You are not a member of this organization")
-    return org_id
+
+    context = TenantContext(user=user, membership=membership)
+    request.state.tenant_context = context
+    return context
+
+
+async def get_current_org_id(
+    tenant: TenantContext = Depends(get_tenant_context),
+) -> UUID:
+    """Dependency: resolve and validate organization context.
+
+    Ensures the current user is a member of the specified organization.
+
+    Raises:
+        ForbiddenException: If user is not a member of the organization.
+    """
+    return tenant.org_id
+
+
+async def get_tenant_user(
+    tenant: TenantContext = Depends(get_tenant_context),
+) -> User:
+    """Dependency: the current user of an org-scoped route.
+
+    Use instead of ``get_current_user`` on routes under ``/organizations/{org_id}``
+    so the user comes from the tenant lookup rather than a separate query.
+    """
+    return tenant.user
 
 
 def require_role(*allowed_roles: RoleEnum):
     """Factory dependency: check that the current user has one of the allowed roles.
 
+    The role is read from the request's ``TenantContext``, so the check
+    costs no additional query.
+
     Usage::
 
         @router.post("/admin-only")
         async def admin_endpoint(
-            org_id: UUID,
-            user: User = Depends(get_current_user),
+            org_id: UUID = Depends(get_current_org_id),
             _: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
         ):
             ...
     """
 
-    async def role_checker(
-        org_id: UUID,
-        current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_db),
-    ) -> None:
-        result = await db.execute(
-            select(Membership).where(
-                Membership.user_id == current_user.id,
-                Membership.organization_id == org_id,
-            )
-        )
-        membership = result.scalar_one_or_none()
-        if membership is None or membership.role not in allowed_roles:
+    async def role_checker(tenant: TenantContext = Depends(get_tenant_context)) -> None:
+        if tenant.role not in allowed_roles:
             raise ForbiddenException(
-                f"Role '{membership.role if membership else 'none'}' is not allowed. "
+                f"Role '{tenant.role}' is not allowed. "
                 f"Required: {', '.join(r.value for r in allowed_roles)}"
             )
 
@@ -7,16 +7,24 @@ middleware, exception handlers, and lifecycle events.
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi_pagination import add_pagination
 
 from app.api.router import api_router
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, engine
 from app.core.exceptions import register_exception_handlers
 from app.core.logging import setup_logging
+from app.core.metrics import metrics_snapshot, require_metrics_access
 from app.core.redis import close_redis, init_redis
+from app.core.security import password_hash_pool
 from app.middleware import register_middleware
+from app.modules.audit_logs.archive import audit_archive
+from app.modules.audit_logs.retention import audit_retention
+from app.modules.audit_logs.stream import audit_stream
+from app.modules.audit_logs.writer import audit_writer
+from app.modules.drafts.flusher import draft_flusher
+from app.modules.search.backends import search_backend
 
 
 @asynccontextmanager
@@ -26,8 +34,19 @@ async def lifespan(app: FastAPI):
     setup_logging()
     await init_redis()
     await create_tables()
+    await search_backend.ensure_schema(engine)
+    draft_flusher.start()
+    audit_writer.start()
+    audit_retention.start()
+    audit_stream.start()
     yield
     # Shutdown
+    await audit_stream.stop()
+    await draft_flusher.stop()
+    await audit_writer.stop()
+    await audit_retention.stop()
+    await audit_archive.stop()
+    password_hash_pool.shutdown()
     await close_redis()
 
 
@@ -57,6 +76,15 @@ def create_app() -> FastAPI:
         """Health check endpoint."""
         return {"status": "healthy", "app": settings.APP_NAME}
 
+    @app.get("/metrics", tags=["Health"], dependencies=[Depends(require_metrics_access)])
+    async def metrics():
+        """In-process counters (cache hit rates, queue depths) for this worker (internal).
+
+        Requires the ``METRICS_TOKEN`` bearer token; without one configured,
+        only served in debug mode.
+        """
+        return metrics_snapshot()
+
     add_pagination(app)
 
     return app
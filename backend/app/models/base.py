@@ -8,7 +8,7 @@ id, created_at, and updated_at fields.
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index, text
 from sqlmodel import Field, SQLModel
 
 
@@ -35,3 +35,19 @@ class BaseDBModel(SQLModel):
         sa_column_kwargs={"onupdate": lambda: datetime.now(UTC)},
         nullable=False,
     )
+
+
+def keyset_index(table: str, *columns: str, name: str | None = None) -> Index:
+    """Index for listings filtered on ``columns`` and ordered newest first.
+
+    Matches ``WHERE <columns> = ... ORDER BY created_at DESC, id DESC``, the
+    ordering of the cursor-paginated list endpoints, so a page is read off
+    the index in order instead of sorting the tenant's rows. Pass ``name``
+    when the generated one would exceed PostgreSQL's 63 characters.
+    """
+    return Index(
+        name or f"ix_{table}_{'_'.join(columns)}_created_at_id",
+        *columns,
+        text("created_at DESC"),
+        text("id DESC"),
+    )
@@ -0,0 +1,290 @@
+"""
+Archives of audit log months (PostgreSQL).
+
+Retention writes each expired month to ``AUDIT_ARCHIVE_DIR`` as
+``audit_logs_YYYY_MM.jsonl.gz``: one JSON object per entry, in
+``created_at`` order, gzip-compressed. The file is written under a
+temporary name and renamed, so an archive that exists is complete.
+
+Archived months can be read again, one organization at a time. An owner
+or admin asks for the months a time range reaches into (see
+``AuditLogService.request_restore``), which are recorded as pending
+``AuditRestore`` rows and restored in the background once that request
+has committed. :meth:`AuditArchive.restore` loads the organization's
+entries of a month back into the month's partition, attaching it again if
+it was dropped, and marks the partition as restored; from then on every
+query, cursor pagination included, sees those entries as if they had never
+left. Listings and exports never restore anything themselves. The
+maintenance job drops restored months again
+``AUDIT_ARCHIVE_RESTORE_TTL_SECONDS`` after they were last restored to,
+without archiving them a second time.
+
+Restores and the maintenance job take the same advisory lock, so a month
+is never restored while it is being archived or dropped. Restores only try
+it: while the maintenance job holds it, they wait
+``AUDIT_ARCHIVE_RESTORE_RETRY_SECONDS`` and try again.
+"""
+
+import asyncio
+import gzip
+import json
+from datetime import UTC, date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any
+from uuid import UUID
+
+from sqlalchemy import column, insert, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.modules.audit_logs.models import AuditLog, AuditRestore
+from app.modules.audit_logs.partitions import (
+    TABLE,
+    attached_partitions,
+    month_of,
+    partition_bounds,
+    partition_month,
+    partition_name,
+)
+
+logger = get_logger(__name__)
+
+# Advisory lock held by the maintenance job and by restores.
+MAINTENANCE_LOCK = 0x61756469746C6F67  # "auditlog"
+
+# Comment marking a restored partition, followed by when it was restored.
+RESTORED = "restored at "
+
+COLUMNS = [c.name for c in AuditLog.__table__.columns]
+_BATCH = 5000
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def _details_from_text(details: str) -> dict:
+    # Archives written while details were text; converted as the migration to JSONB does.
+    try:
+        parsed = json.loads(details)
+    except ValueError:
+        parsed = None
+    return parsed if isinstance(parsed, dict) else {"text": details}
+
+
+def _decode(entry: dict) -> dict:
+    for name in ("id", "resource_id", "user_id", "organization_id"):
+        entry[name] = UUID(entry[name])
+    for name in ("created_at", "updated_at"):
+        entry[name] = datetime.fromisoformat(entry[name])
+    if isinstance(entry["details"], str):
+        entry["details"] = _details_from_text(entry["details"])
+    return entry
+
+
+def _read_lines(file: IO[str], count: int) -> list[str]:
+    return list(islice(file, count))
+
+
+class AuditArchive:
+    """Writes expired audit log months to files and restores them for organizations.
+
+    Args:
+        directory: Where the monthly archive files are kept.
+        engine: Engine of the database holding ``audit_logs``.
+    """
+
+    def __init__(self, directory: Path, engine: AsyncEngine):
+        self.directory = directory
+        self.engine = engine
+        self.restored = 0
+        self.failures = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    def path(self, month: date) -> Path:
+        return self.directory / f"{partition_name(month)}.jsonl.gz"
+
+    def archived_months(self) -> list[date]:
+        """Months with a complete archive file, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        months = (
+            partition_month(path.name.removesuffix(".jsonl.gz"))
+            for path in self.directory.iterdir()
+        )
+        return sorted(month for month in months if month)
+
+    async def write(self, name: str, month: date) -> int:
+        """Write the entries of the detached partition ``name`` to ``month``'s archive.
+
+        Returns the number of entries written.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(month)
+        partial = path.with_name(f"{path.name}.partial")
+        written = 0
+        file = await asyncio.to_thread(gzip.open, partial, "wt", encoding="utf-8")
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.stream(
+                    text(f"SELECT {', '.join(COLUMNS)} FROM {name} ORDER BY created_at, id")
+                )
+                async for rows in result.mappings().partitions(_BATCH):
+                    lines = "".join(f"{json.dumps(dict(row), default=_encode)}\n" for row in rows)
+                    await asyncio.to_thread(file.write, lines)
+                    written += len(rows)
+        finally:
+            await asyncio.to_thread(file.close)
+        await asyncio.to_thread(partial.replace, path)
+        return written
+
+    async def restore(self, month: date, org_id: UUID) -> bool | None:
+        """Load the organization's entries of ``month`` back into ``audit_logs``.
+
+        Returns ``False`` if they are loaded already, and ``None`` without
+        waiting if the maintenance job holds the lock.
+        """
+        name = partition_name(month)
+        target = table(name, *(column(c.name, c.type) for c in AuditLog.__table__.columns))
+        now = datetime.now(UTC)
+        async with self.engine.begin() as conn:
+            if not await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK}
+            ):
+                return None
+            attached = month in await conn.run_sync(attached_partitions)
+            restored = await conn.scalar(
+                select(AuditRestore.restored_at).where(
+                    AuditRestore.organization_id == org_id, AuditRestore.month == month
+                )
+            )
+            if attached and restored is not None:
+                return False
+            comment = await conn.scalar(
+                text("SELECT obj_description(to_regclass(:name), 'pg_class')"), {"name": name}
+            )
+            # A live month's entries never left; a restored one holds other organizations'.
+            live = attached and restored_at(comment) is None
+            if not attached:
+                # A table left detached by an interrupted retention run is in the archive.
+                await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                await conn.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+            if not live:
+                await self._load(conn, target, month, org_id)
+            if not attached:
+                await self._attach(conn, month)
+            if not live:
+                await conn.execute(
+                    text(f"COMMENT ON TABLE {name} IS '{RESTORED}{now.isoformat()}'")
+                )
+            await conn.execute(
+                pg_insert(AuditRestore)
+                .values(organization_id=org_id, month=month, restored_at=now)
+                .on_conflict_do_update(
+                    constraint="uq_audit_log_restores_month",
+                    set_={"restored_at": now, "updated_at": now},
+                )
+            )
+        return True
+
+    async def _load(self, conn: AsyncConnection, target, month: date, org_id: UUID) -> None:
+        org = str(org_id)
+        file = await asyncio.to_thread(gzip.open, self.path(month), "rt", encoding="utf-8")
+        try:
+            while lines := await asyncio.to_thread(_read_lines, file, _BATCH):
+                entries = [
+                    _decode(entry)
+                    for line in lines
+                    if (entry := json.loads(line))["organization_id"] == org
+                ]
+                if entries:
+                    await conn.execute(insert(target), entries)
+        finally:
+            await asyncio.to_thread(file.close)
+
+    @staticmethod
+    async def _attach(conn: AsyncConnection, month: date) -> None:
+        name = partition_name(month)
+        start, end = partition_bounds(month)
+        # The constraint lets ATTACH skip scanning the rows for the bounds.
+        await conn.execute(
+            text(
+                f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds "
+                f"CHECK (created_at >= '{start}' AND created_at < '{end}')"
+            )
+        )
+        await conn.execute(
+            text(
+                f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+        await conn.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+
+    def months_in(self, since: datetime, until: datetime | None) -> list[date]:
+        """The archived months that ``[since, until)`` (aware datetimes) reaches into."""
+        if self.engine.dialect.name != "postgresql":
+            return []
+        first = month_of(since.astimezone(UTC))
+        last = month_of((until - timedelta(microseconds=1)).astimezone(UTC)) if until else None
+        return [
+            month
+            for month in self.archived_months()
+            if month >= first and (last is None or month <= last)
+        ]
+
+    def schedule(self, org_id: UUID, months: list[date]) -> None:
+        """Restore ``months`` for the organization in the background."""
+        task = asyncio.create_task(self._restore_all(org_id, months))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _restore_all(self, org_id: UUID, months: list[date]) -> None:
+        for month in months:
+            try:
+                while (restored := await self.restore(month, org_id)) is None:
+                    await asyncio.sleep(settings.AUDIT_ARCHIVE_RESTORE_RETRY_SECONDS)
+            except Exception:
+                self.failures += 1
+                logger.exception("Could not restore audit logs of %s", f"{month:%Y-%m}")
+                continue
+            self.restored += restored
+
+    async def join(self) -> None:
+        """Wait for the scheduled restores."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def stop(self) -> None:
+        """Cancel the scheduled restores; they stay pending and are scheduled again on request."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "archived_months": len(self.archived_months()),
+            "restores_pending": len(self._tasks),
+            "restored": self.restored,
+            "failures": self.failures,
+        }
+
+
+def restored_at(comment: str | None) -> datetime | None:
+    """When the partition with table comment ``comment`` was restored, if it was."""
+    if comment and comment.startswith(RESTORED):
+        return datetime.fromisoformat(comment.removeprefix(RESTORED))
+    return None
+
+
+audit_archive = AuditArchive(Path(settings.AUDIT_ARCHIVE_DIR), engine)
+register_metrics("audit_archive", audit_archive.metrics)
@@ -0,0 +1,91 @@
+"""
+Streaming export of audit logs.
+
+An export reads the organization's entries, oldest first, through a
+server-side cursor and encodes them as NDJSON or CSV
+``AUDIT_EXPORT_BATCH_SIZE`` rows at a time, optionally through a streaming
+gzip compressor. Only one batch is held in memory whatever the size of
+the export, and the response is sent while the rows are still being read.
+"""
+
+import csv
+import enum
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.core.config import settings
+
+
+class ExportFormat(enum.StrEnum):
+    """File formats of an audit log export."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {ExportFormat.ndjson: "application/x-ndjson", ExportFormat.csv: "text/csv"}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _ndjson(columns: Sequence[str], rows: Sequence[Row]) -> str:
+    return "".join(
+        f"{json.dumps(dict(zip(columns, row, strict=True)), default=_encode)}\n" for row in rows
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _csv(rows: Sequence[Row]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def encode_export(
+    result: AsyncResult, fmt: ExportFormat, *, compress: bool = False
+) -> AsyncIterator[bytes]:
+    """Encode a streamed result as ``fmt``, batch by batch, closing it when done."""
+    columns = list(result.keys())
+    compressor = (
+        zlib.compressobj(settings.AUDIT_EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if compress
+        else None
+    )
+
+    def chunk(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    try:
+        if fmt is ExportFormat.csv:
+            yield chunk(",".join(columns) + "\n")
+        async for rows in result.partitions(settings.AUDIT_EXPORT_BATCH_SIZE):
+            data = chunk(_ndjson(columns, rows) if fmt is ExportFormat.ndjson else _csv(rows))
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+    finally:
+        await result.close()
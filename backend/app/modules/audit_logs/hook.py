@@ -0,0 +1,162 @@
+"""
+Declarative audit logging of mutating routes.
+
+Mark an endpoint with :func:`audited` and give its router
+``route_class=AuditedRoute``::
+
+    router = APIRouter(prefix="/organizations/{org_id}/documents", route_class=AuditedRoute)
+
+    @router.patch("/{document_id}", response_model=DocumentRead)
+    @audited("document.updated", "document", resource_id="document_id")
+    async def update_document(...): ...
+
+Once such a route has both built a 2xx response and committed its
+``get_db`` session, in whichever order FastAPI runs the two, an entry is
+queued on the audit writer: the commit is observed with
+:func:`~app.core.database.after_commit`, so the hook does not rely on
+when dependencies are torn down. A request that fails, or whose commit
+fails, is not logged.
+Queuing is an in-memory append; the insert happens later in the writer's
+batch, so the hook adds no database work to the request.
+
+The resource id and the organization id are read from the path parameter
+of that name or, failing that, from the JSON response (``id`` of a created
+resource, ``organization_id`` of a membership). ``details`` names response
+fields copied into the entry's details, e.g. ``details=("role",)`` records
+a member's new role. The user comes from the
+request's tenant context or, on routes outside an organization, from the
+access token; the IP address is the client address of the connection.
+"""
+
+import json
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends, Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import after_commit, get_db
+from app.core.logging import get_logger
+from app.modules.audit_logs.writer import audit_writer
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AuditSpec:
+    """What an audited route records.
+
+    Attributes:
+        action: Action to record (e.g. "document.updated").
+        resource_type: Type of the affected resource (e.g. "document").
+        resource_id: Path parameter, or else response field, with the resource id.
+        org_id: Path parameter, or else response field, with the organization id.
+        details: Response fields recorded in the entry's details.
+    """
+
+    action: str
+    resource_type: str
+    resource_id: str = "id"
+    org_id: str = "org_id"
+    details: tuple[str, ...] = ()
+
+
+def audited(
+    action: str,
+    resource_type: str,
+    *,
+    resource_id: str = "id",
+    org_id: str = "org_id",
+    details: tuple[str, ...] = (),
+) -> Callable:
+    """Mark an endpoint to be audit logged; see the module docstring."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__audit__ = AuditSpec(action, resource_type, resource_id, org_id, details)
+        return endpoint
+
+    return decorator
+
+
+class AuditedRoute(APIRoute):
+    """Route class that audit logs successful requests to :func:`audited` endpoints."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        self.audit: AuditSpec | None = getattr(endpoint, "__audit__", None)
+        if self.audit is not None:
+            kwargs["dependencies"] = [
+                Depends(_auditor(self.audit)),
+                *(kwargs.get("dependencies") or []),
+            ]
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        spec = self.audit
+        if spec is None:
+            return handler
+
+        async def audited_handler(request: Request) -> Response:
+            response = await handler(request)
+            request.state.audit_response = response
+            _record_once(request, spec)
+            return response
+
+        return audited_handler
+
+
+def _auditor(spec: AuditSpec) -> Callable[..., Coroutine[Any, Any, None]]:
+    async def audit(request: Request, db: AsyncSession = Depends(get_db)) -> None:
+        async def committed() -> None:
+            request.state.audit_committed = True
+            _record_once(request, spec)
+
+        # Dropped if the endpoint or the commit fails, which skips the entry.
+        after_commit(db, committed)
+
+    return audit
+
+
+def _record_once(request: Request, spec: AuditSpec) -> None:
+    response: Response | None = getattr(request.state, "audit_response", None)
+    if (
+        response is None
+        or not getattr(request.state, "audit_committed", False)
+        or getattr(request.state, "audited", False)
+    ):
+        return
+    request.state.audited = True
+    if 200 <= response.status_code < 300:
+        try:
+            _record(request, spec, response)
+        except Exception:
+            logger.exception("Could not audit %s", spec.action)
+
+
+def _record(request: Request, spec: AuditSpec, response: Response) -> None:
+    values: dict[str, Any] = dict(request.path_params)
+    body: dict[str, Any] = {}
+    if (spec.details or not {spec.resource_id, spec.org_id} <= values.keys()) and response.body:
+        parsed = json.loads(response.body)
+        body = parsed if isinstance(parsed, dict) else {}
+        values = body | values
+
+    tenant = getattr(request.state, "tenant_context", None)
+    user_id = tenant.user.id if tenant is not None else getattr(request.state, "user_id", None)
+    resource_id, org_id = values.get(spec.resource_id), values.get(spec.org_id)
+    if user_id is None or resource_id is None or org_id is None:
+        logger.warning("Not auditing %s: user, resource or organization unknown", spec.action)
+        return
+
+    audit_writer.enqueue(
+        action=spec.action,
+        resource_type=spec.resource_type,
+        resource_id=UUID(str(resource_id)),
+        user_id=user_id,
+        organization_id=UUID(str(org_id)),
+        details={name: body[name] for name in spec.details if name in body} or None,
+        ip_address=request.client.host[:45] if request.client else None,
+    )
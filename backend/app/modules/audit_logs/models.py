@@ -1,14 +1,21 @@
+from datetime import UTC, date, datetime
+from typing import Any
 from uuid import UUID
 
-from sqlmodel import Column, Field, Text
+from sqlalchemy import JSON, BigInteger, DateTime, Index, UniqueConstraint, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Column, Field
 
-from app.models.base import BaseDBModel
+from app.models.base import BaseDBModel, keyset_index
+from app.modules.audit_logs.partitions import create_current_partitions
 
 
 class AuditLog(BaseDBModel, table=True):
     """Immutable audit trail entry.
 
-    Records who did what, when, and where within the system.
+    Records who did what, when, and where within the system. On PostgreSQL
+    the table is partitioned by month of ``created_at``, which is therefore
+    part of the primary key (see :mod:`app.modules.audit_logs.partitions`).
 
     Attributes:
         action: Action performed (e.g. "document.created", "member.removed").
@@ -16,16 +23,117 @@ class AuditLog(BaseDBModel, table=True):
         resource_id: ID of the affected resource.
         user_id: FK to the user who performed the action.
         organization_id: FK to the organization (tenant scope).
-        details: Optional JSON string with additional context.
+        details: Optional JSON object with additional context (e.g. the new role
+            of a member). JSONB on PostgreSQL, with a ``jsonb_path_ops`` GIN
+            index for containment filters; plain JSON on SQLite.
         ip_address: Optional IP address of the request.
     """
 
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        keyset_index("audit_logs", "organization_id"),
+        keyset_index("audit_logs", "organization_id", "action"),
+        keyset_index("audit_logs", "organization_id", "resource_type"),
+        keyset_index(
+            "audit_logs",
+            "organization_id",
+            "resource_type",
+            "resource_id",
+            name="ix_audit_logs_resource_created_at_id",
+        ),
+        Index(
+            "ix_audit_logs_details",
+            "details",
+            postgresql_using="gin",
+            postgresql_ops={"details": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    action: str = Field(max_length=100, nullable=False, index=True)
-    resource_type: str = Field(max_length=50, nullable=False, index=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_type=DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+    )
+
+    action: str = Field(max_length=100, nullable=False)
+    resource_type: str = Field(max_length=50, nullable=False)
     resource_id: UUID = Field(nullable=False)
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
-    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
-    details: str | None = Field(default=None, sa_column=Column(Text))
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
+    details: dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSONB().with_variant(JSON(), "sqlite"))
+    )
     ip_address: str | None = Field(default=None, max_length=45)
+
+
+class AuditRollup(BaseDBModel):
+    """Number of audit log entries in one time bucket, per action, resource type and user.
+
+    Kept up to date by the audit writer as it inserts entries (see
+    :mod:`app.modules.audit_logs.rollups`), so activity charts read a few
+    rows per bucket instead of aggregating ``audit_logs``.
+
+    Attributes:
+        organization_id: FK to the organization (tenant scope).
+        bucket: Start of the hour or day (UTC).
+        action: Action of the entries (e.g. "document.created").
+        resource_type: Type of resource of the entries.
+        user_id: FK to the user who performed the actions.
+        count: Number of entries.
+    """
+
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
+    bucket: datetime = Field(sa_type=DateTime(timezone=True), nullable=False)
+    action: str = Field(max_length=100, nullable=False)
+    resource_type: str = Field(max_length=50, nullable=False)
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
+    count: int = Field(default=0, sa_type=BigInteger, nullable=False)
+
+
+# Unique key of a rollup row; its index also serves the stats queries.
+ROLLUP_KEY = ("organization_id", "bucket", "action", "resource_type", "user_id")
+
+
+class AuditRollupHourly(AuditRollup, table=True):
+    """Audit log entries per hour."""
+
+    __tablename__ = "audit_log_rollups_hourly"
+    __table_args__ = (UniqueConstraint(*ROLLUP_KEY, name="uq_audit_log_rollups_hourly_key"),)
+
+
+class AuditRollupDaily(AuditRollup, table=True):
+    """Audit log entries per day."""
+
+    __tablename__ = "audit_log_rollups_daily"
+    __table_args__ = (UniqueConstraint(*ROLLUP_KEY, name="uq_audit_log_rollups_daily_key"),)
+
+
+class AuditRestore(BaseDBModel, table=True):
+    """An archived month of audit logs restored for one organization.
+
+    Only the organization's entries are loaded back into the month's
+    partition (see :mod:`app.modules.audit_logs.archive`). The row is
+    deleted when the maintenance job drops the restored month again.
+
+    Attributes:
+        organization_id: FK to the organization (tenant scope).
+        month: First day of the month.
+        restored_at: When the entries were loaded, ``None`` while pending.
+    """
+
+    __tablename__ = "audit_log_restores"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "month", name="uq_audit_log_restores_month"),
+    )
+
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
+    month: date = Field(nullable=False)
+    restored_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+
+
+@event.listens_for(AuditLog.__table__, "after_create")
+def _create_partitions(target, connection, **kwargs) -> None:
+    if connection.dialect.name == "postgresql":
+        create_current_partitions(connection)
@@ -0,0 +1,95 @@
+"""
+Monthly partitions of ``audit_logs`` (PostgreSQL).
+
+On PostgreSQL ``audit_logs`` is range partitioned on ``created_at``, one
+partition per calendar month (UTC) named ``audit_logs_YYYY_MM``. A month is
+detached, archived and dropped as a whole once it falls out of retention
+(see :mod:`app.modules.audit_logs.retention`), instead of deleting rows.
+
+There is no default partition, because ``DETACH PARTITION ... CONCURRENTLY``
+is not allowed on a table that has one. Partitions from the previous month
+to ``AUDIT_PARTITION_MONTHS_AHEAD`` months ahead are created with the table
+and kept ahead by the maintenance job, so entries always find theirs.
+
+These helpers take a synchronous connection; call them with
+``await conn.run_sync(...)``.
+"""
+
+import re
+from datetime import UTC, date, datetime
+
+from sqlalchemy import Connection, text
+
+from app.core.config import settings
+
+TABLE = "audit_logs"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_(\d{{4}})_(\d{{2}})$")
+
+
+def month_of(moment: date) -> date:
+    """First day of the month ``moment`` (a date or UTC datetime) falls in."""
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """The month of a partition name, or ``None`` for other tables."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def partition_bounds(month: date) -> tuple[str, str]:
+    """``created_at`` bounds of a month's partition, as UTC timestamp literals."""
+    return f"{month} 00:00:00+00", f"{add_months(month, 1)} 00:00:00+00"
+
+
+def attached_partitions(connection: Connection) -> dict[date, str]:
+    """Partitions currently attached to ``audit_logs``, by month."""
+    names = connection.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) AND NOT i.inhdetachpending"
+        ),
+        {"table": TABLE},
+    )
+    return {month: name for name in names if (month := partition_month(name))}
+
+
+def create_partitions(connection: Connection, first: date, last: date) -> list[str]:
+    """Create the missing partitions for the months ``first`` to ``last``.
+
+    Returns the names of the partitions created.
+    """
+    existing = attached_partitions(connection)
+    created = []
+    month = month_of(first)
+    while month <= last:
+        if month not in existing:
+            start, end = partition_bounds(month)
+            connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            )
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def create_current_partitions(connection: Connection, now: datetime | None = None) -> list[str]:
+    """Create the partitions from last month to ``AUDIT_PARTITION_MONTHS_AHEAD`` ahead."""
+    this_month = month_of(now or datetime.now(UTC))
+    return create_partitions(
+        connection,
+        add_months(this_month, -1),
+        add_months(this_month, settings.AUDIT_PARTITION_MONTHS_AHEAD),
+    )
@@ -1,9 +1,99 @@
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import BigInteger, Boolean, and_, cast, func, literal, select, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
-from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.models import AuditLog, AuditRestore
+from app.modules.audit_logs.rollups import ROLLUPS, Granularity, StatsGroup
+
+# Order of audit log listings, newest first.
+AUDIT_LOG_ORDER = (AuditLog.created_at.desc(), AuditLog.id.desc())
+
+# Columns of an export, in file order.
+EXPORT_COLUMNS = (
+    AuditLog.id,
+    AuditLog.created_at,
+    AuditLog.action,
+    AuditLog.resource_type,
+    AuditLog.resource_id,
+    AuditLog.user_id,
+    AuditLog.organization_id,
+    AuditLog.ip_address,
+    AuditLog.details,
+)
+
+
+class details_contain(FunctionElement):
+    """``AuditLog.details`` contains the JSON object ``value``.
+
+    ``details @> value`` on PostgreSQL, served by ``ix_audit_logs_details``.
+    Elsewhere (SQLite) each top-level key of ``value`` is compared with
+    ``json_extract``, nested objects and arrays by their JSON text; as with
+    ``@>``, a ``None`` value only matches a key that is present and null.
+    Keys must be identifiers, as they are spliced into JSON paths.
+    """
+
+    type = Boolean()
+    # Not cached: the SQLite form is built from the filter's keys and values,
+    # which a cached statement would reuse for the next filter.
+    inherit_cache = False
+
+    def __init__(self, value: dict[str, Any]):
+        if not all(key.isidentifier() for key in value):
+            raise ValueError("details keys must be identifiers")
+        super().__init__(AuditLog.details, literal(value, AuditLog.details.type))
+
+
+@compiles(details_contain, "postgresql")
+def _details_contain_postgresql(element, compiler, **kw) -> str:
+    column, value = element.clauses
+    return f"{compiler.process(column, **kw)} @> {compiler.process(value, **kw)}"
+
+
+@compiles(details_contain)
+def _details_contain(element, compiler, **kw) -> str:
+    column, value = element.clauses
+    conditions = []
+    for key, item in value.value.items():
+        path = f'$."{key}"'
+        if item is None:
+            # json_extract is NULL for a missing key too; json_type tells them apart.
+            conditions.append(func.json_type(column, path) == "null")
+        elif isinstance(item, dict | list):
+            conditions.append(func.json_extract(column, path) == func.json(json.dumps(item)))
+        else:
+            conditions.append(func.json_extract(column, path) == item)
+    return compiler.process(and_(true(), *conditions), **kw)
+
+
+def _filter_org_logs(
+    query,
+    org_id: UUID,
+    action: str | None,
+    resource_type: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    details: dict[str, Any] | None = None,
+):
+    query = query.where(AuditLog.organization_id == org_id)
+    if details:
+        query = query.where(details_contain(details))
+    if action:
+        query = query.where(AuditLog.action == action)
+    if resource_type:
+        query = query.where(AuditLog.resource_type == resource_type)
+    if since:
+        query = query.where(AuditLog.created_at >= since)
+    if until:
+        query = query.where(AuditLog.created_at < until)
+    return query
 
 
 class AuditLogRepository:
@@ -45,28 +135,101 @@ class AuditLogRepository:
         org_id: UUID,
         action: str | None = None,
         resource_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        details: dict[str, Any] | None = None,
     ):
         """Build a query for organization audit logs (for pagination)."""
-        query = select(AuditLog).where(AuditLog.organization_id == org_id)
+        query = _filter_org_logs(
+            select(AuditLog), org_id, action, resource_type, since, until, details
+        )
+        return query.order_by(*AUDIT_LOG_ORDER)
 
-        if action:
-            query = query.where(AuditLog.action == action)
-        if resource_type:
-            query = query.where(AuditLog.resource_type == resource_type)
+    def get_org_logs_export_query(
+        self,
+        org_id: UUID,
+        action: str | None = None,
+        resource_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        details: dict[str, Any] | None = None,
+    ):
+        """Build a query for exporting organization audit logs, oldest first, as plain rows."""
+        query = _filter_org_logs(
+            select(*EXPORT_COLUMNS), org_id, action, resource_type, since, until, details
+        )
+        return query.order_by(AuditLog.created_at, AuditLog.id)
 
-        return query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+    async def get_created_at(self, org_id: UUID, log_id: UUID) -> datetime | None:
+        """Get when an organization's audit log entry was created, if it exists."""
+        return await self.db.scalar(
+            select(AuditLog.created_at).where(
+                AuditLog.id == log_id, AuditLog.organization_id == org_id
+            )
+        )
 
-    async def list_by_resource(
-        self, resource_type: str, resource_id: UUID, org_id: UUID
-    ) -> list[AuditLog]:
-        """List all audit logs for a specific resource."""
+    async def list_since(self, org_id: UUID, since: datetime, limit: int) -> list[AuditLog]:
+        """List up to ``limit`` audit logs created at or after ``since``, oldest first."""
+        result = await self.db.execute(
+            select(AuditLog)
+            .where(AuditLog.organization_id == org_id, AuditLog.created_at >= since)
+            .order_by(AuditLog.created_at, AuditLog.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def list_restores(self, org_id: UUID) -> list[AuditRestore]:
+        """List the archived months restored, or pending, for an organization, oldest first."""
         result = await self.db.execute(
+            select(AuditRestore)
+            .where(AuditRestore.organization_id == org_id)
+            .order_by(AuditRestore.month)
+        )
+        return list(result.scalars().all())
+
+    async def add_restores(self, org_id: UUID, months: Sequence[date]) -> None:
+        """Record pending restores of ``months`` for an organization (PostgreSQL only)."""
+        await self.db.execute(
+            pg_insert(AuditRestore)
+            .values(
+                [AuditRestore(organization_id=org_id, month=month).model_dump() for month in months]
+            )
+            .on_conflict_do_nothing(constraint="uq_audit_log_restores_month")
+        )
+
+    def get_resource_logs_query(self, org_id: UUID, resource_type: str, resource_id: UUID):
+        """Build a query for the audit history of one resource (for pagination)."""
+        return (
             select(AuditLog)
             .where(
+                AuditLog.organization_id == org_id,
                 AuditLog.resource_type == resource_type,
                 AuditLog.resource_id == resource_id,
-                AuditLog.organization_id == org_id,
             )
-            .order_by(AuditLog.created_at.desc())
+            .order_by(*AUDIT_LOG_ORDER)
         )
-        return list(result.scalars().all())
+
+    def get_stats_query(
+        self,
+        org_id: UUID,
+        granularity: Granularity,
+        since: datetime,
+        until: datetime,
+        group_by: Sequence[StatsGroup] = (),
+        action: str | None = None,
+        resource_type: str | None = None,
+        user_id: UUID | None = None,
+    ):
+        """Build a query for entry counts per bucket in ``[since, until)`` from the rollups."""
+        rollup = ROLLUPS[granularity].__table__.c
+        groups = [rollup.bucket, *(rollup[group] for group in group_by)]
+        query = select(*groups, cast(func.sum(rollup.count), BigInteger).label("count")).where(
+            rollup.organization_id == org_id, rollup.bucket >= since, rollup.bucket < until
+        )
+        if action:
+            query = query.where(rollup.action == action)
+        if resource_type:
+            query = query.where(rollup.resource_type == resource_type)
+        if user_id:
+            query = query.where(rollup.user_id == user_id)
+        return query.group_by(*groups).order_by(*groups)
@@ -0,0 +1,187 @@
+"""
+Background maintenance of audit log partitions (PostgreSQL).
+
+Every ``AUDIT_MAINTENANCE_INTERVAL_SECONDS``, and once at startup, one
+worker (the one that gets the advisory lock) does the following:
+
+1. Creates the partitions up to ``AUDIT_PARTITION_MONTHS_AHEAD`` months
+   ahead.
+2. Detaches the months older than ``AUDIT_RETENTION_MONTHS``, and the
+   restored months ``AUDIT_ARCHIVE_RESTORE_TTL_SECONDS`` after their last
+   restore. Detaching is ``DETACH PARTITION ... CONCURRENTLY``, so the writer and
+   readers are not blocked.
+3. Writes each detached month to its archive (see
+   :mod:`app.modules.audit_logs.archive`) and drops it. Restored months
+   are archived already and are only dropped, with their ``AuditRestore``
+   rows.
+4. Deletes the hourly rollups older than
+   ``AUDIT_ROLLUP_HOURLY_RETENTION_DAYS`` (see
+   :mod:`app.modules.audit_logs.rollups`).
+
+Every step is picked up again from the catalog on the next run. A detach
+that was interrupted is finalized, and a detached month that was not yet
+dropped is archived again, so a crash or restart never loses a month.
+"""
+
+import asyncio
+from contextlib import suppress
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.modules.audit_logs.archive import (
+    MAINTENANCE_LOCK,
+    AuditArchive,
+    audit_archive,
+    restored_at,
+)
+from app.modules.audit_logs.models import AuditRestore, AuditRollupHourly
+from app.modules.audit_logs.partitions import (
+    TABLE,
+    add_months,
+    create_current_partitions,
+    month_of,
+    partition_month,
+)
+
+logger = get_logger(__name__)
+
+
+class AuditRetention:
+    """Keeps audit log partitions ahead and archives expired months.
+
+    Args:
+        engine: Engine of the database holding ``audit_logs``.
+        archive: Where expired months are written.
+    """
+
+    def __init__(self, engine: AsyncEngine, archive: AuditArchive):
+        self.engine = engine
+        self.archive = archive
+        self.partitions_created = 0
+        self.months_archived = 0
+        self.entries_archived = 0
+        self.months_dropped = 0
+        self.rollups_pruned = 0
+        self.failures = 0
+        self._task: asyncio.Task | None = None
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "partitions_created": self.partitions_created,
+            "months_archived": self.months_archived,
+            "entries_archived": self.entries_archived,
+            "months_dropped": self.months_dropped,
+            "rollups_pruned": self.rollups_pruned,
+            "failures": self.failures,
+        }
+
+    async def run_once(self, now: datetime | None = None) -> bool:
+        """Run one maintenance pass.
+
+        Returns ``False`` if it was skipped: not PostgreSQL, or another
+        worker holds the lock.
+        """
+        if self.engine.dialect.name != "postgresql":
+            return False
+        now = now or datetime.now(UTC)
+        async with self.engine.connect() as conn:
+            # DETACH ... CONCURRENTLY cannot run in a transaction block.
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            lock = {"key": MAINTENANCE_LOCK}
+            if not await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), lock):
+                return False
+            try:
+                await self._maintain(conn, now)
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock)
+        return True
+
+    async def _maintain(self, conn: AsyncConnection, now: datetime) -> None:
+        created = await conn.run_sync(create_current_partitions, now)
+        self.partitions_created += len(created)
+
+        partitions = await conn.execute(
+            text(
+                "SELECT c.relname, i.inhdetachpending, obj_description(c.oid, 'pg_class') "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": TABLE},
+        )
+        for name, pending, comment in partitions.all():
+            month = partition_month(name)
+            if pending:
+                await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name} FINALIZE"))
+            elif month and self._expired(month, restored_at(comment), now):
+                await conn.execute(
+                    text(f"ALTER TABLE {TABLE} DETACH PARTITION {name} CONCURRENTLY")
+                )
+
+        detached = await conn.execute(
+            text(
+                "SELECT c.relname, obj_description(c.oid, 'pg_class') FROM pg_class c "
+                "WHERE c.relkind = 'r' AND NOT c.relispartition "
+                "AND c.relnamespace = current_schema()::regnamespace"
+            )
+        )
+        for name, comment in detached.all():
+            month = partition_month(name)
+            if month is None:
+                continue
+            if restored_at(comment) is None:
+                self.entries_archived += await self.archive.write(name, month)
+                self.months_archived += 1
+                logger.info(
+                    "Archived audit logs of %s to %s", f"{month:%Y-%m}", self.archive.path(month)
+                )
+            await conn.execute(text(f"DROP TABLE {name}"))
+            await conn.execute(delete(AuditRestore).where(AuditRestore.month == month))
+            self.months_dropped += 1
+
+        if keep := settings.AUDIT_ROLLUP_HOURLY_RETENTION_DAYS:
+            result = await conn.execute(
+                delete(AuditRollupHourly).where(
+                    AuditRollupHourly.bucket < now - timedelta(days=keep)
+                )
+            )
+            self.rollups_pruned += result.rowcount
+
+    @staticmethod
+    def _expired(month: date, restored: datetime | None, now: datetime) -> bool:
+        if restored is not None:
+            return now - restored >= timedelta(seconds=settings.AUDIT_ARCHIVE_RESTORE_TTL_SECONDS)
+        keep = settings.AUDIT_RETENTION_MONTHS
+        return keep > 0 and month < add_months(month_of(now), -keep)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.failures += 1
+                logger.exception("Audit log maintenance failed")
+            await asyncio.sleep(settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        """Start maintaining in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task. An interrupted pass is completed by the next one."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+audit_retention = AuditRetention(engine, audit_archive)
+register_metrics("audit_retention", audit_retention.metrics)
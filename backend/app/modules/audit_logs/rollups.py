@@ -0,0 +1,106 @@
+"""
+Hourly and daily rollups of audit log entries.
+
+``audit_log_rollups_hourly`` and ``audit_log_rollups_daily`` count the
+entries per organization, bucket (UTC), action, resource type and user.
+The audit writer adds each batch to them in the transaction that inserts
+it: the batch is counted in memory and every count is added with one
+``INSERT ... ON CONFLICT DO UPDATE``, so a batch is counted exactly once
+even when it is retried, and the rows of a busy organization are updated
+once per batch rather than once per entry. Rows are upserted in key
+order, so workers flushing at the same time never deadlock.
+
+``GET .../audit-logs/stats`` reads only these tables. Months restored
+from the archive are not counted again. Hourly rows older than
+``AUDIT_ROLLUP_HOURLY_RETENTION_DAYS`` are deleted by the maintenance job;
+daily rows are kept, so activity charts outlive the archived entries.
+"""
+
+import enum
+from collections import Counter
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.audit_logs.models import (
+    ROLLUP_KEY,
+    AuditRollup,
+    AuditRollupDaily,
+    AuditRollupHourly,
+)
+
+
+class Granularity(enum.StrEnum):
+    """Bucket size of audit log rollups."""
+
+    hour = "hour"
+    day = "day"
+
+
+class StatsGroup(enum.StrEnum):
+    """Dimensions audit activity stats can be grouped by, besides the bucket."""
+
+    action = "action"
+    resource_type = "resource_type"
+    user_id = "user_id"
+
+
+ROLLUPS: dict[Granularity, type[AuditRollup]] = {
+    Granularity.hour: AuditRollupHourly,
+    Granularity.day: AuditRollupDaily,
+}
+
+STEPS = {Granularity.hour: timedelta(hours=1), Granularity.day: timedelta(days=1)}
+
+# Range of stats requested without ``since``.
+DEFAULT_RANGES = {Granularity.hour: timedelta(days=2), Granularity.day: timedelta(days=30)}
+
+
+def bucket_of(at: datetime, granularity: Granularity) -> datetime:
+    """Start of the UTC hour or day that ``at`` falls in."""
+    at = at.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0) if granularity is Granularity.day else at
+
+
+def count_entries(entries: Iterable[dict], granularity: Granularity) -> list[dict]:
+    """Rollup rows counting ``entries`` (audit log rows), in key order."""
+    counts = Counter(
+        (
+            entry["organization_id"],
+            bucket_of(entry["created_at"], granularity),
+            entry["action"],
+            entry["resource_type"],
+            entry["user_id"],
+        )
+        for entry in entries
+    )
+    now = datetime.now(UTC)
+    return [
+        {
+            "id": uuid4(),
+            **dict(zip(ROLLUP_KEY, key, strict=True)),
+            "count": count,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for key, count in sorted(counts.items(), key=lambda item: tuple(map(str, item[0])))
+    ]
+
+
+async def add_to_rollups(session: AsyncSession, entries: list[dict]) -> None:
+    """Add ``entries`` to the hourly and daily counts, in ``session``'s transaction."""
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    for granularity, model in ROLLUPS.items():
+        table = model.__table__
+        stmt = dialect.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                "count": table.c.count + stmt.excluded.count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await session.execute(stmt, count_entries(entries, granularity))
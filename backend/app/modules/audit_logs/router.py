@@ -1,19 +1,40 @@
+import json
+from functools import partial
+from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import get_current_org_id, require_role
+from app.core.exceptions import BadRequestException
+from app.core.pagination import KeysetPage, KeysetParams
+from app.dependencies import (
+    TenantContext,
+    get_current_org_id,
+    get_tenant_context,
+    has_role,
+    require_role,
+)
+from app.modules.audit_logs.export import MEDIA_TYPES, ExportFormat
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.audit_logs.repository import AuditLogRepository
-from app.modules.audit_logs.schemas import AuditLogRead
+from app.modules.audit_logs.rollups import Granularity, StatsGroup
+from app.modules.audit_logs.schemas import (
+    AuditLogRead,
+    AuditRestoreCreate,
+    AuditRestoreRead,
+    AuditStats,
+    UTCDatetime,
+)
 from app.modules.audit_logs.service import AuditLogService
 from app.modules.memberships.models import RoleEnum
 
 router = APIRouter(
     prefix="/organizations/{org_id}/audit-logs",
     tags=["Audit Logs"],
+    route_class=AuditedRoute,
 )
 
 
@@ -21,14 +42,184 @@ def _get_service(db: AsyncSession = Depends(get_db)) -> AuditLogService:
     return AuditLogService(AuditLogRepository(db), db)
 
 
-@router.get("", response_model=CursorPage[AuditLogRead])
+def _details_filter(
+    details: str | None = Query(
+        None, description="Only entries whose details contain this JSON object"
+    ),
+) -> dict[str, Any] | None:
+    if details is None:
+        return None
+    try:
+        value = json.loads(details)
+    except ValueError:
+        value = None
+    if not isinstance(value, dict):
+        raise BadRequestException("details must be a JSON object")
+    if not all(key.isidentifier() for key in value):
+        raise BadRequestException("details keys must be identifiers")
+    return value
+
+
+@router.get("", response_model=KeysetPage[AuditLogRead])
 async def list_audit_logs(
-    params: CursorParams = Depends(),
+    params: KeysetParams = Depends(),
+    org_id: UUID = Depends(get_current_org_id),
+    action: str | None = Query(None, description="Filter by action"),
+    resource_type: str | None = Query(None, description="Filter by resource type"),
+    since: UTCDatetime | None = Query(None, description="Only entries at or after this time"),
+    until: UTCDatetime | None = Query(None, description="Only entries before this time"),
+    details: dict[str, Any] | None = Depends(_details_filter),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """List audit logs for the organization (owner/admin only).
+
+    ``details`` filters on the entries' details by containment, e.g.
+    ``details={"role": "admin"}`` for members made admins. Entries older than
+    the retention period are archived, and only listed once restored with
+    ``POST .../restores``.
+    """
+    return await service.list_logs(
+        org_id,
+        params,
+        action=action,
+        resource_type=resource_type,
+        since=since,
+        until=until,
+        details=details,
+    )
+
+
+@router.get("/stats", response_model=AuditStats)
+async def get_audit_stats(
     org_id: UUID = Depends(get_current_org_id),
+    granularity: Granularity = Query(Granularity.day, description="Bucket size"),
+    since: UTCDatetime | None = Query(
+        None, description="First bucket (default: 30 days or 2 days ago)"
+    ),
+    until: UTCDatetime | None = Query(
+        None, description="Only buckets before this time (default: now)"
+    ),
+    group_by: list[StatsGroup] = Query([], description="Count per action, resource type or user"),
     action: str | None = Query(None, description="Filter by action"),
     resource_type: str | None = Query(None, description="Filter by resource type"),
+    user_id: UUID | None = Query(None, description="Filter by user"),
     _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
     service: AuditLogService = Depends(_get_service),
 ):
-    """List audit logs for the organization (owner/admin only)."""
-    return await service.list_logs(org_id, params, action=action, resource_type=resource_type)
+    """Count audit log entries per hour or day, e.g. actions per day per user (owner/admin only).
+
+    Served from incrementally maintained rollups, so charts over months of
+    activity never aggregate the audit log itself.
+    """
+    return await service.get_stats(
+        org_id,
+        granularity,
+        since=since,
+        until=until,
+        group_by=group_by,
+        action=action,
+        resource_type=resource_type,
+        user_id=user_id,
+    )
+
+
+@router.get("/restores", response_model=list[AuditRestoreRead])
+async def list_audit_restores(
+    org_id: UUID = Depends(get_current_org_id),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """List the archived months restored or being restored (owner/admin only)."""
+    return await service.list_restores(org_id)
+
+
+@router.post("/restores", response_model=list[AuditRestoreRead], status_code=202)
+@audited("audit_log.restored", "organization", resource_id="org_id")
+async def restore_audit_logs(
+    data: AuditRestoreCreate,
+    org_id: UUID = Depends(get_current_org_id),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """Restore the archived months a time range reaches into (owner/admin only).
+
+    Only the organization's entries are restored, in the background, and
+    for ``AUDIT_ARCHIVE_RESTORE_TTL_SECONDS``; a month's ``restored_at`` is
+    set once its entries can be listed and exported.
+    """
+    return await service.request_restore(org_id, data.since, data.until)
+
+
+@router.get("/resources/{resource_type}/{resource_id}", response_model=KeysetPage[AuditLogRead])
+async def get_resource_history(
+    resource_type: str,
+    resource_id: UUID,
+    params: KeysetParams = Depends(),
+    org_id: UUID = Depends(get_current_org_id),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """List the audit history of one resource, e.g. who changed a document (owner/admin only)."""
+    return await service.get_resource_history(org_id, resource_type, resource_id, params)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_audit_logs(
+    org_id: UUID = Depends(get_current_org_id),
+    last_event_id: UUID | None = Header(None, description="Resume after this entry"),
+    tenant: TenantContext = Depends(get_tenant_context),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """Stream new audit log entries as Server-Sent Events (owner/admin only).
+
+    Each ``audit`` event carries an entry, with its id as the event id;
+    browsers' ``EventSource`` reconnects by itself and resumes from the
+    last id it got. The stream ends once the user is no longer an owner or
+    admin of the organization. See ``AuditLogService.stream_logs``.
+    """
+    has_access = partial(
+        has_role, service.db, tenant.user.id, org_id, RoleEnum.owner, RoleEnum.admin
+    )
+    return StreamingResponse(
+        service.stream_logs(org_id, last_event_id, has_access),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_audit_logs(
+    org_id: UUID = Depends(get_current_org_id),
+    format: ExportFormat = Query(ExportFormat.ndjson, description="File format"),
+    gzip: bool = Query(False, description="Compress the file with gzip"),
+    action: str | None = Query(None, description="Filter by action"),
+    resource_type: str | None = Query(None, description="Filter by resource type"),
+    since: UTCDatetime | None = Query(None, description="Only entries at or after this time"),
+    until: UTCDatetime | None = Query(None, description="Only entries before this time"),
+    details: dict[str, Any] | None = Depends(_details_filter),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
+    service: AuditLogService = Depends(_get_service),
+):
+    """Download all matching audit logs, oldest first, as NDJSON or CSV (owner/admin only).
+
+    The file is streamed while it is read from the database, so exports of
+    any size use constant memory.
+    """
+    stream = await service.export_logs(
+        org_id,
+        format,
+        compress=gzip,
+        action=action,
+        resource_type=resource_type,
+        since=since,
+        until=until,
+        details=details,
+    )
+    filename = f"audit-logs-{org_id}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream,
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
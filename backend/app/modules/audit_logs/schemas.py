@@ -1,8 +1,17 @@
-from datetime import datetime
-from typing import Annotated
+from datetime import UTC, date, datetime
+from typing import Annotated, Any
 from uuid import UUID
 
-from pydantic import BaseModel, StringConstraints
+from pydantic import AfterValidator, BaseModel, StringConstraints
+
+
+def _as_utc(at: datetime) -> datetime:
+    return at.replace(tzinfo=UTC) if at.tzinfo is None else at
+
+
+# A time filter: without an offset, read as UTC rather than compared with
+# aware datetimes (a TypeError) or taken as the server's local time.
+UTCDatetime = Annotated[datetime, AfterValidator(_as_utc)]
 
 
 class AuditLogCreate(BaseModel):
@@ -13,7 +22,7 @@ class AuditLogCreate(BaseModel):
         str, StringConstraints(strip_whitespace=True, min_length=1, max_length=50)
     ]
     resource_id: UUID
-    details: str | None = None
+    details: dict[str, Any] | None = None
     ip_address: Annotated[str, StringConstraints(max_length=45)] | None = None
 
 
@@ -26,8 +35,47 @@ class AuditLogRead(BaseModel):
     resource_id: UUID
     user_id: UUID
     organization_id: UUID
-    details: str | None
+    details: dict[str, Any] | None
     ip_address: str | None
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class AuditStatsBucket(BaseModel):
+    """Number of audit log entries in one bucket.
+
+    ``action``, ``resource_type`` and ``user_id`` are set when the stats are
+    grouped by them, ``None`` otherwise.
+    """
+
+    bucket: datetime
+    action: str | None = None
+    resource_type: str | None = None
+    user_id: UUID | None = None
+    count: int
+
+
+class AuditStats(BaseModel):
+    """Schema for audit activity stats responses."""
+
+    granularity: str
+    since: datetime
+    until: datetime
+    items: list[AuditStatsBucket]
+
+
+class AuditRestoreCreate(BaseModel):
+    """Schema for restoring the archived months a time range reaches into."""
+
+    since: UTCDatetime
+    until: UTCDatetime | None = None
+
+
+class AuditRestoreRead(BaseModel):
+    """Schema for restored months; ``restored_at`` is ``None`` while pending."""
+
+    month: date
+    restored_at: datetime | None
+
+    model_config = {"from_attributes": True}
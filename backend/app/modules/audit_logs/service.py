@@ -1,11 +1,32 @@
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
-from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
-
-from app.modules.audit_logs.models import AuditLog
-from app.modules.audit_logs.repository import AuditLogRepository
-from app.modules.audit_logs.schemas import AuditLogCreate
+from app.core.config import settings
+from app.core.database import after_commit
+from app.core.exceptions import BadRequestException
+from app.core.pagination import KeysetPage, KeysetParams, paginate
+from app.modules.audit_logs.archive import AuditArchive, audit_archive
+from app.modules.audit_logs.export import ExportFormat, encode_export
+from app.modules.audit_logs.repository import AUDIT_LOG_ORDER, AuditLogRepository
+from app.modules.audit_logs.rollups import (
+    DEFAULT_RANGES,
+    STEPS,
+    Granularity,
+    StatsGroup,
+    bucket_of,
+)
+from app.modules.audit_logs.schemas import (
+    AuditLogCreate,
+    AuditLogRead,
+    AuditRestoreRead,
+    AuditStats,
+    AuditStatsBucket,
+)
+from app.modules.audit_logs.stream import AuditStream, audit_stream, event_id, format_event
+from app.modules.audit_logs.writer import AuditWriter, audit_writer
 
 
 class AuditLogService:
@@ -14,13 +35,28 @@ class AuditLogService:
     Audit logs are append-only — they cannot be updated or deleted.
     """
 
-    def __init__(self, repo: AuditLogRepository, db):
+    def __init__(
+        self,
+        repo: AuditLogRepository,
+        db,
+        writer: AuditWriter = audit_writer,
+        archive: AuditArchive = audit_archive,
+        stream: AuditStream = audit_stream,
+    ):
         self.repo = repo
         self.db = db
+        self.writer = writer
+        self.archive = archive
+        self.stream = stream
 
-    async def log_action(self, org_id: UUID, user_id: UUID, data: AuditLogCreate) -> AuditLog:
-        """Record an audit log entry."""
-        log = AuditLog(
+    def log_action(self, org_id: UUID, user_id: UUID, data: AuditLogCreate) -> UUID | None:
+        """Record an audit log entry and return its id.
+
+        The entry is queued for the background writer and not yet in the
+        database when this returns; see :mod:`app.modules.audit_logs.writer`.
+        Returns ``None`` if the queue is full and the entry was dropped.
+        """
+        return self.writer.enqueue(
             action=data.action,
             resource_type=data.resource_type,
             resource_id=data.resource_id,
@@ -29,22 +65,228 @@ class AuditLogService:
             details=data.details,
             ip_address=data.ip_address,
         )
-        return await self.repo.create(log)
 
     async def list_logs(
         self,
         org_id: UUID,
-        params: CursorParams,
+        params: KeysetParams,
         *,
         action: str | None = None,
         resource_type: str | None = None,
-    ):
-        """List audit logs for an organization with optional filters (cursor-paginated)."""
-        query = self.repo.get_org_logs_query(org_id, action=action, resource_type=resource_type)
-        return await paginate(self.db, query, params)
+        since: datetime | None = None,
+        until: datetime | None = None,
+        details: dict[str, Any] | None = None,
+    ) -> KeysetPage[AuditLogRead]:
+        """List audit logs for an organization with optional filters (keyset-paginated).
+
+        Entries from ``since`` (inclusive) to ``until`` (exclusive) whose
+        ``details`` contain the ``details`` object, if given. Entries of
+        archived months are only included once :meth:`request_restore` has
+        restored them.
+        """
+        query = self.repo.get_org_logs_query(
+            org_id,
+            action=action,
+            resource_type=resource_type,
+            since=since,
+            until=until,
+            details=details,
+        )
+        return await paginate(self.db, query, AUDIT_LOG_ORDER, params, AuditLogRead)
+
+    async def export_logs(
+        self,
+        org_id: UUID,
+        fmt: ExportFormat,
+        *,
+        compress: bool = False,
+        action: str | None = None,
+        resource_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        details: dict[str, Any] | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Export an organization's audit logs, oldest first, as a stream of ``fmt`` bytes.
+
+        The query runs before this returns, so its errors are raised here;
+        the rows are then read through a server-side cursor as the stream is
+        consumed. As for :meth:`list_logs`, archived months must be restored
+        first.
+        """
+        query = self.repo.get_org_logs_export_query(
+            org_id,
+            action=action,
+            resource_type=resource_type,
+            since=since,
+            until=until,
+            details=details,
+        )
+        result = await self.db.stream(
+            query, execution_options={"yield_per": settings.AUDIT_EXPORT_BATCH_SIZE}
+        )
+        return encode_export(result, fmt, compress=compress)
+
+    async def request_restore(
+        self, org_id: UUID, since: datetime, until: datetime | None = None
+    ) -> list[AuditRestoreRead]:
+        """Restore the organization's entries of the archived months ``[since, until)`` covers.
+
+        The months not restored yet are recorded as pending and restored in
+        the background once the transaction commits; see
+        :mod:`app.modules.audit_logs.archive`. Returns the months in range.
+
+        Raises:
+            BadRequestException: If more than ``AUDIT_ARCHIVE_RESTORE_MAX_MONTHS``
+                months would have to be restored.
+        """
+        months = self.archive.months_in(since, until)
+        if not months:
+            return []
+        restored = {
+            restore.month
+            for restore in await self.repo.list_restores(org_id)
+            if restore.restored_at
+        }
+        pending = [month for month in months if month not in restored]
+        if len(pending) > settings.AUDIT_ARCHIVE_RESTORE_MAX_MONTHS:
+            raise BadRequestException(
+                f"The range reaches into {len(pending)} archived months; at most "
+                f"{settings.AUDIT_ARCHIVE_RESTORE_MAX_MONTHS} can be restored at once"
+            )
+        if pending:
+            await self.repo.add_restores(org_id, pending)
+
+            async def schedule() -> None:
+                self.archive.schedule(org_id, pending)
+
+            after_commit(self.db, schedule)
+        return [
+            AuditRestoreRead.model_validate(restore)
+            for restore in await self.repo.list_restores(org_id)
+            if restore.month in months
+        ]
+
+    async def list_restores(self, org_id: UUID) -> list[AuditRestoreRead]:
+        """List the archived months restored, or being restored, for an organization."""
+        return [
+            AuditRestoreRead.model_validate(restore)
+            for restore in await self.repo.list_restores(org_id)
+        ]
 
     async def get_resource_history(
-        self, resource_type: str, resource_id: UUID, org_id: UUID
-    ) -> list[AuditLog]:
-        """Get the full audit history for a specific resource."""
-        return await self.repo.list_by_resource(resource_type, resource_id, org_id)
+        self, org_id: UUID, resource_type: str, resource_id: UUID, params: KeysetParams
+    ) -> KeysetPage[AuditLogRead]:
+        """Get the audit history of a specific resource, newest first (keyset-paginated)."""
+        query = self.repo.get_resource_logs_query(org_id, resource_type, resource_id)
+        return await paginate(self.db, query, AUDIT_LOG_ORDER, params, AuditLogRead)
+
+    async def get_stats(
+        self,
+        org_id: UUID,
+        granularity: Granularity,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        group_by: Sequence[StatsGroup] = (),
+        action: str | None = None,
+        resource_type: str | None = None,
+        user_id: UUID | None = None,
+    ) -> AuditStats:
+        """Count an organization's entries per hour or day, optionally grouped and filtered.
+
+        Reads the rollups only (see :mod:`app.modules.audit_logs.rollups`).
+        ``since`` is rounded down to its bucket and defaults to a range of
+        ``DEFAULT_RANGES`` before ``until``, which defaults to now. Buckets
+        without entries are left out.
+        """
+        until = until or datetime.now(UTC)
+        since = bucket_of(since or until - DEFAULT_RANGES[granularity], granularity)
+        if since >= until:
+            raise BadRequestException("since must be before until")
+        if (until - since) / STEPS[granularity] > settings.AUDIT_STATS_MAX_BUCKETS:
+            raise BadRequestException(
+                f"At most {settings.AUDIT_STATS_MAX_BUCKETS} {granularity}s per request"
+            )
+        query = self.repo.get_stats_query(
+            org_id,
+            granularity,
+            since,
+            until,
+            group_by=group_by,
+            action=action,
+            resource_type=resource_type,
+            user_id=user_id,
+        )
+        rows = (await self.db.execute(query)).mappings()
+        return AuditStats(
+            granularity=granularity,
+            since=since,
+            until=until,
+            items=[AuditStatsBucket(**row) for row in rows],
+        )
+
+    async def stream_logs(
+        self,
+        org_id: UUID,
+        last_event_id: UUID | None = None,
+        has_access: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream an organization's new audit log entries as Server-Sent Events.
+
+        With ``last_event_id``, the entries written since that one are
+        replayed first, looking back ``AUDIT_STREAM_REPLAY_GRACE_SECONDS``
+        for entries of batches committed late; an entry may therefore be
+        sent twice, and clients should skip ids they have seen. More than
+        ``AUDIT_STREAM_REPLAY_MAX`` missed entries are not replayed; a
+        ``reset`` event tells the client to reload the listing instead.
+
+        The stream ends when the client falls behind or the subscription
+        is interrupted, and the client reconnects; see
+        :mod:`app.modules.audit_logs.stream`. It also ends, before sending
+        any further entry, once ``has_access`` returns false: it is called
+        every ``AUDIT_STREAM_ACCESS_CHECK_SECONDS`` (checked at least every
+        ``AUDIT_STREAM_KEEPALIVE_SECONDS``), so a member removed or demoted
+        stops receiving entries, and the reconnection is refused.
+        """
+        async with self.stream.listen(org_id) as listener:
+            yield "retry: 3000\n\n"
+            replayed: set[str] = set()
+            since = last_event_id and await self.repo.get_created_at(org_id, last_event_id)
+            if since:
+                grace = timedelta(seconds=settings.AUDIT_STREAM_REPLAY_GRACE_SECONDS)
+                limit = settings.AUDIT_STREAM_REPLAY_MAX
+                logs = await self.repo.list_since(org_id, since - grace, limit + 1)
+                if len(logs) > limit:
+                    yield "event: reset\ndata: {}\n\n"
+                else:
+                    for log in logs:
+                        if log.id != last_event_id:
+                            replayed.add(str(log.id))
+                            yield format_event(AuditLogRead.model_validate(log))
+            # Hand the connection back to the pool: the stream may stay open for hours.
+            await self.db.commit()
+
+            checked = time.monotonic()
+
+            async def access_lost() -> bool:
+                nonlocal checked
+                if has_access is None or (
+                    time.monotonic() - checked < settings.AUDIT_STREAM_ACCESS_CHECK_SECONDS
+                ):
+                    return False
+                allowed = await has_access()
+                await self.db.commit()
+                checked = time.monotonic()
+                return not allowed
+
+            while not listener.closed:
+                if not await listener.wait(settings.AUDIT_STREAM_KEEPALIVE_SECONDS):
+                    if await access_lost():
+                        return
+                    yield ": keepalive\n\n"
+                while listener.entries:
+                    if await access_lost():
+                        return
+                    event = listener.entries.popleft()
+                    if event_id(event) not in replayed:
+                        yield event
@@ -0,0 +1,202 @@
+"""
+Live stream of audit log entries (Server-Sent Events).
+
+Once a batch is committed, the audit writer publishes each entry to the
+Redis channel ``audit:<organization id>`` with one pipelined round trip,
+already formatted as a Server-Sent Event whose id is the entry's id.
+Each worker holds a single pattern subscription to those channels,
+whatever its number of streams, and hands each entry to the local streams
+of that organization. An idle stream costs its worker a buffer and a
+sleeping task: no Redis connection and, once it has been authorized and
+replayed (see ``AuditLogService.stream_logs``), no database connection.
+
+A stream's buffer holds at most ``AUDIT_STREAM_BUFFER_SIZE`` entries. A
+client that falls further behind is disconnected rather than buffered
+for; so is every stream of a worker whose subscription to Redis was
+interrupted, as entries may have been missed meanwhile. Either way the
+client reconnects with the ``Last-Event-ID`` it got to, and the entries
+it missed are replayed from ``audit_logs``.
+
+Publishing is best effort: entries are in the database whether or not
+Redis took them, and if publishing fails they only miss the live stream.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.core import redis as redis_module
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.modules.audit_logs.schemas import AuditLogRead
+
+logger = get_logger(__name__)
+
+CHANNEL_PREFIX = "audit:"
+
+
+def format_event(entry: AuditLogRead) -> str:
+    """An entry as a Server-Sent Event."""
+    return f"id: {entry.id}\nevent: audit\ndata: {entry.model_dump_json()}\n\n"
+
+
+def event_id(event: str) -> str:
+    """The id of an event made by :func:`format_event`."""
+    return event[4 : event.index("\n")]
+
+
+class AuditListener:
+    """Entries for one stream, waiting to be sent.
+
+    ``closed`` is set once the stream must end: its buffer overflowed or
+    the subscription was interrupted.
+    """
+
+    def __init__(self):
+        self.entries: deque[str] = deque()
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, entry: str) -> bool:
+        """Buffer an entry; return ``False`` if the buffer was full and the stream closed."""
+        if self.closed:
+            return False
+        if len(self.entries) >= settings.AUDIT_STREAM_BUFFER_SIZE:
+            self.close()
+            return False
+        self.entries.append(entry)
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        self.entries.clear()
+        self.closed = True
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` for an entry or the end; return whether either happened."""
+        # Not ``wait_for``, which would start a task per wait and stream.
+        with suppress(TimeoutError):
+            async with asyncio.timeout(timeout):
+                await self._ready.wait()
+        self._ready.clear()
+        return bool(self.entries) or self.closed
+
+
+class AuditStream:
+    """Publishes written audit log entries and fans them out to this worker's streams."""
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.publish_failures = 0
+        self.failures = 0
+        self._listeners: dict[UUID, set[AuditListener]] = {}
+        self._task: asyncio.Task | None = None
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "streams": sum(len(listeners) for listeners in self._listeners.values()),
+            "organizations": len(self._listeners),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "publish_failures": self.publish_failures,
+            "failures": self.failures,
+        }
+
+    async def publish(self, entries: list[dict]) -> None:
+        """Publish committed entries (audit log rows) to their organizations' channels."""
+        redis = redis_module.redis_client
+        if redis is None or not entries:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for entry in entries:
+                    pipe.publish(
+                        f"{CHANNEL_PREFIX}{entry['organization_id']}",
+                        format_event(AuditLogRead.model_validate(entry)),
+                    )
+                await pipe.execute()
+        except RedisError:
+            self.publish_failures += 1
+            logger.exception("Could not publish %d audit log entries", len(entries))
+            return
+        self.published += len(entries)
+
+    @asynccontextmanager
+    async def listen(self, org_id: UUID) -> AsyncIterator[AuditListener]:
+        """Receive the organization's entries, as events, while the context is open."""
+        listener = AuditListener()
+        self._listeners.setdefault(org_id, set()).add(listener)
+        try:
+            yield listener
+        finally:
+            listeners = self._listeners[org_id]
+            listeners.discard(listener)
+            if not listeners:
+                del self._listeners[org_id]
+
+    def dispatch(self, channel: str, data: str) -> None:
+        """Hand an entry published on ``channel`` to the organization's streams."""
+        with suppress(ValueError):
+            org_id = UUID(channel.removeprefix(CHANNEL_PREFIX))
+            for listener in self._listeners.get(org_id, ()):
+                if listener.closed:
+                    continue
+                if listener.push(data):
+                    self.delivered += 1
+                else:
+                    self.overflows += 1
+
+    def _close_all(self) -> None:
+        for listeners in self._listeners.values():
+            for listener in listeners:
+                listener.close()
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = redis_module.get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                # Streams that started before the subscription may have missed entries.
+                self._close_all()
+                while True:
+                    # Within the client's socket timeout, which applies to pub/sub reads too.
+                    message = await pubsub.get_message(
+                        timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS / 2
+                    )
+                    if message is not None:
+                        self.dispatch(message["channel"], message["data"])
+            except (RedisError, OSError):
+                self.failures += 1
+                logger.exception("Audit stream subscription lost, resubscribing")
+                self._close_all()
+                await asyncio.sleep(1)
+            finally:
+                with suppress(RedisError, OSError):
+                    await pubsub.aclose()
+
+    def start(self) -> None:
+        """Start receiving published entries in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop receiving and end this worker's streams."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._close_all()
+
+
+audit_stream = AuditStream()
+register_metrics("audit_stream", audit_stream.metrics)
@@ -0,0 +1,236 @@
+"""
+Background writer of audit log entries.
+
+``AuditLogService.log_action`` only queues the entry here and returns; the
+request never waits on the database for it. The writer inserts queued
+entries in batches, one ``INSERT`` executed for ``AUDIT_BATCH_SIZE`` rows
+at a time (the statement is compiled once and asyncpg pipelines the rows;
+a literal multi-row ``VALUES`` would be recompiled for every batch), as
+soon as that many are queued or ``AUDIT_FLUSH_INTERVAL_SECONDS`` after the
+last flush, whichever comes first. Each entry gets its id and
+``created_at`` when it is queued, so listings order it by when the action
+happened, not when it was written. Entries are queued as plain rows;
+building ``AuditLog`` instances would cost the caller more than the queue.
+The same transaction adds the batch to the activity rollups (see
+:mod:`app.modules.audit_logs.rollups`); once it is committed, the batch is
+published to the live streams (see :mod:`app.modules.audit_logs.stream`).
+
+The queue is per worker and in memory. It holds at most
+``AUDIT_QUEUE_MAX_SIZE`` entries; beyond that new entries are dropped and
+counted rather than letting a database outage exhaust memory. A batch that
+fails to insert goes back to the head of the queue and is retried on the
+next flush. After ``AUDIT_WRITE_MAX_ATTEMPTS`` failures in a row it is
+written row by row, so that one bad row (a foreign key violation, a value
+too long, details that cannot be serialized) cannot hold up every entry
+behind it. A row that fails on its own while the database still answers
+is logged in full and counted as dead-lettered, whatever the error; if
+the database does not answer (it is down), the remaining rows are queued
+again and the batch gets ``AUDIT_WRITE_MAX_ATTEMPTS`` more attempts.
+
+On shutdown the lifespan hook stops the writer, which flushes whatever is
+still queued; only entries that still cannot be written then are lost,
+and are logged as such.
+"""
+
+import asyncio
+import json
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.rollups import add_to_rollups
+from app.modules.audit_logs.stream import audit_stream
+
+logger = get_logger(__name__)
+
+
+class AuditWriter:
+    """Queues audit log entries and inserts them in batches.
+
+    Args:
+        session_factory: Opens the database session for each batch.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self.session_factory = session_factory
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self._attempts = 0
+        self._queue: deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "queue_depth": len(self._queue),
+            "queue_capacity": settings.AUDIT_QUEUE_MAX_SIZE,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def enqueue(
+        self,
+        *,
+        action: str,
+        resource_type: str,
+        resource_id: UUID,
+        user_id: UUID,
+        organization_id: UUID,
+        details: dict[str, Any] | None = None,
+        ip_address: str | None = None,
+    ) -> UUID | None:
+        """Queue an entry for the next batch without waiting for the database.
+
+        Returns the id the entry will have, or ``None`` if the queue is full
+        and the entry was dropped.
+        """
+        if len(self._queue) >= settings.AUDIT_QUEUE_MAX_SIZE:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Audit queue full, %d entries dropped so far", self.dropped)
+            return None
+        log_id, now = uuid4(), datetime.now(UTC)
+        self._queue.append(
+            {
+                "id": log_id,
+                "action": action,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "user_id": user_id,
+                "organization_id": organization_id,
+                "details": details,
+                "ip_address": ip_address,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        self.enqueued += 1
+        if len(self._queue) >= settings.AUDIT_BATCH_SIZE:
+            self._wakeup.set()
+        return log_id
+
+    async def flush(self) -> int:
+        """Insert everything queued so far, one batch at a time.
+
+        Stops at the first batch that fails, leaving it queued. Returns the
+        number of entries written.
+        """
+        written = 0
+        async with self._lock:
+            while self._queue:
+                size = min(len(self._queue), settings.AUDIT_BATCH_SIZE)
+                batch = [self._queue.popleft() for _ in range(size)]
+                if not await self._write(batch):
+                    break
+                written += len(batch)
+        return written
+
+    async def _write(self, batch: list[dict]) -> bool:
+        try:
+            await self._insert(batch)
+        except Exception:
+            self.failures += 1
+            self._attempts += 1
+            logger.exception("Could not write %d audit log entries", len(batch))
+            if self._attempts < settings.AUDIT_WRITE_MAX_ATTEMPTS:
+                self._queue.extendleft(reversed(batch))
+                return False
+            return await self._write_rows(batch)
+        self._attempts = 0
+        self.batches += 1
+        await self._written(batch)
+        return True
+
+    async def _write_rows(self, batch: list[dict]) -> bool:
+        """Write a batch that keeps failing one row at a time, setting aside the rows rejected."""
+        for i, entry in enumerate(batch):
+            try:
+                await self._insert([entry])
+            except Exception as exc:
+                if not await self._reachable():
+                    logger.exception("Could not write audit log entries one by one")
+                    self._attempts = 0
+                    self._queue.extendleft(reversed(batch[i:]))
+                    return False
+                self.dead_lettered += 1
+                logger.error(
+                    "Dead-lettered audit log entry %s (%r)",
+                    json.dumps(entry, default=str),
+                    exc,
+                )
+                continue
+            await self._written([entry])
+        self._attempts = 0
+        return True
+
+    async def _reachable(self) -> bool:
+        try:
+            async with self.session_factory() as session:
+                await session.execute(select(1))
+        except Exception:
+            return False
+        return True
+
+    async def _insert(self, entries: list[dict]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(AuditLog.__table__), entries)
+            await add_to_rollups(session, entries)
+            await session.commit()
+
+    async def _written(self, entries: list[dict]) -> None:
+        self.written += len(entries)
+        await audit_stream.publish(entries)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+                )
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write the entries still queued."""
+        if self._task is not None:
+            # Let a flush in progress finish rather than cancelling it mid-batch.
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._queue:
+            logger.error("Lost %d audit log entries at shutdown", len(self._queue))
+            self.dropped += len(self._queue)
+            self._queue.clear()
+
+
+audit_writer = AuditWriter(async_session_factory)
+register_metrics("audit_writer", audit_writer.metrics)
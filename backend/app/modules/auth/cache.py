@@ -0,0 +1,92 @@
+"""
+Auth lookup cache.
+
+Caches the user row (by user id) and membership row (by user and org)
+that every authenticated request needs, so ``get_current_user`` and
+``get_tenant_context`` can usually skip the database. Services that change
+these rows must call the matching ``invalidate_*`` function with their
+session: the entry is dropped again once the session commits, as a
+request racing the change may have cached the old row meanwhile (and kept
+a removed or demoted member's access for ``AUTH_CACHE_TTL_SECONDS``).
+
+Only positive lookups are cached; the password hash is never cached.
+"""
+
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.core.database import after_commit
+from app.core.metrics import register_metrics
+from app.modules.memberships.models import Membership
+from app.modules.users.models import User
+
+auth_cache = TwoTierCache(
+    "auth",
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    local_ttl=settings.AUTH_CACHE_LOCAL_TTL_SECONDS,
+    remote_ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+register_metrics("auth_cache", auth_cache.stats.as_dict)
+
+
+def _user_key(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
+def _membership_key(user_id: UUID, org_id: UUID) -> str:
+    return f"membership:{user_id}:{org_id}"
+
+
+async def get_cached_user(user_id: UUID) -> User | None:
+    """Return a detached ``User`` from the cache, or ``None`` on a miss.
+
+    The returned user has a blank ``hashed_password``; it is meant for
+    authorization decisions, not for credential checks or persistence.
+    """
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    data = await auth_cache.get(_user_key(user_id))
+    return User.model_validate(data, update={"hashed_password": ""}) if data else None
+
+
+async def cache_user(user: User) -> None:
+    """Store a user in the cache (without its password hash)."""
+    if settings.AUTH_CACHE_ENABLED:
+        data = user.model_dump(mode="json", exclude={"hashed_password"})
+        await auth_cache.set(_user_key(user.id), data)
+
+
+async def get_cached_membership(user_id: UUID, org_id: UUID) -> Membership | None:
+    """Return a detached ``Membership`` from the cache, or ``None`` on a miss."""
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    data = await auth_cache.get(_membership_key(user_id, org_id))
+    return Membership.model_validate(data) if data else None
+
+
+async def cache_membership(membership: Membership) -> None:
+    """Store a membership in the cache."""
+    if settings.AUTH_CACHE_ENABLED:
+        key = _membership_key(membership.user_id, membership.organization_id)
+        await auth_cache.set(key, membership.model_dump(mode="json"))
+
+
+async def _invalidate(key: str, db: AsyncSession | None) -> None:
+    await auth_cache.delete(key)
+    if db is not None:
+        after_commit(db, lambda: auth_cache.delete(key))
+
+
+async def invalidate_user(user_id: UUID, db: AsyncSession | None = None) -> None:
+    """Drop a cached user after it has been modified, and again once ``db`` commits."""
+    await _invalidate(_user_key(user_id), db)
+
+
+async def invalidate_membership(
+    user_id: UUID, org_id: UUID, db: AsyncSession | None = None
+) -> None:
+    """Drop a cached membership after it changed or was removed, and again once ``db`` commits."""
+    await _invalidate(_membership_key(user_id, org_id), db)
@@ -11,8 +11,8 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
 from app.modules.auth.schemas import LoginRequest, RegisterRequest, TokenResponse
 from app.modules.users.models import User
@@ -37,7 +37,7 @@ class AuthService:
 
         user = User(
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password_async(data.password),
             full_name=data.full_name,
         )
         user = await self.user_repo.create(user)
@@ -54,7 +54,7 @@ class AuthService:
             UnauthorizedException: If credentials are invalid.
         """
         user = await self.user_repo.get_by_email(data.email)
-        if not user or not verify_password(data.password, user.hashed_password):
+        if not user or not await verify_password_async(data.password, user.hashed_password):
             raise UnauthorizedException("Invalid email or password")
         if not user.is_active:
             raise UnauthorizedException("Account is deactivated")
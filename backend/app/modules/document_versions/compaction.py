@@ -0,0 +1,135 @@
+"""
+Maintenance commands for version storage.
+
+``compact`` rewrites stored history into the current layout. Versions
+written before blob storage existed keep their full content inline, which
+is valid but large; this moves them into shared, delta-compressed blobs
+(and recompresses blobs written with another compression setting or
+dictionary) one document per transaction, so it can run against a live
+database.
+
+``train-dictionary`` trains a zstd dictionary on an organization's current
+documents. New writes use it immediately; run ``compact`` afterwards to
+recompress existing history with it::
+
+    python -m app.modules.document_versions.compaction compact
+    python -m app.modules.document_versions.compaction train-dictionary <org_id>
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+import zstandard
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.api.router  # noqa: F401  (registers every table the models reference)
+from app.core.database import async_session_factory
+from app.core.logging import get_logger, setup_logging
+from app.modules.document_versions.models import CompressionDictionary, DocumentVersion
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.models import Document
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.backends import search_backend
+from app.modules.search.repository import SearchRepository
+
+logger = get_logger(__name__)
+
+DICTIONARY_SIZE = 112_640  # zstd's default dictionary size
+
+
+def _service(db: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(db),
+        DocumentRepository(db),
+        SearchRepository(db, search_backend),
+        db,
+    )
+
+
+async def compact_all(*, batch_size: int = 200) -> int:
+    """Compact every document, committing after each one."""
+    total = 0
+    after: UUID | None = None
+    while True:
+        async with async_session_factory() as db:
+            query = (
+                select(Document.id, Document.organization_id)
+                .order_by(Document.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                query = query.where(Document.id > after)
+            documents = (await db.execute(query)).all()
+        if not documents:
+            return total
+
+        for document_id, org_id in documents:
+            async with async_session_factory() as db:
+                changed = await _service(db).compact_document(
+                    document_id, org_id, batch_size=batch_size
+                )
+                await db.commit()
+            if changed:
+                logger.info("Compacted %d rows of document %s", changed, document_id)
+            total += changed
+        after = documents[-1].id
+
+
+async def train_dictionary(
+    db: AsyncSession, org_id: UUID, *, size: int = DICTIONARY_SIZE, samples: int = 2000
+) -> CompressionDictionary:
+    """Train and store a dictionary from an organization's current documents.
+
+    Raises:
+        zstandard.ZstdError: If there is too little content to train on.
+    """
+    result = await db.scalars(
+        select(DocumentVersion.content)
+        .join(Document, Document.current_version_id == DocumentVersion.id)
+        .where(Document.organization_id == org_id, DocumentVersion.content.is_not(None))
+        .order_by(Document.updated_at.desc())
+        .limit(samples)
+    )
+    contents = [content.encode() for content in result.all() if content]
+    trained = zstandard.train_dictionary(size, contents)
+    return await DocumentVersionRepository(db).create_dictionary(
+        CompressionDictionary(
+            organization_id=org_id,
+            data=trained.as_bytes(),
+            sample_count=len(contents),
+        )
+    )
+
+
+async def _train(org_id: UUID, size: int, samples: int) -> None:
+    async with async_session_factory() as db:
+        dictionary = await train_dictionary(db, org_id, size=size, samples=samples)
+        await db.commit()
+    logger.info(
+        "Trained dictionary %s on %d documents (%d bytes)",
+        dictionary.id,
+        dictionary.sample_count,
+        len(dictionary.data),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact = commands.add_parser("compact", help="rewrite history into the current layout")
+    compact.add_argument("--batch-size", type=int, default=200)
+    train = commands.add_parser("train-dictionary", help="train a dictionary for an org")
+    train.add_argument("org_id", type=UUID)
+    train.add_argument("--size", type=int, default=DICTIONARY_SIZE)
+    train.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.command == "compact":
+        total = asyncio.run(compact_all(batch_size=args.batch_size))
+        logger.info("Compaction finished: %d rows rewritten", total)
+    else:
+        asyncio.run(_train(args.org_id, args.size, args.samples))
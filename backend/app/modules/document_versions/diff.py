@@ -0,0 +1,299 @@
+"""
+Line and word diffs between versions.
+
+Lines (or words) are interned to integers first, so the diff compares ints
+instead of strings. Lines that occur on one side only cannot match and are
+set aside (as in git's xdiff), which leaves little to search for typical
+edits. The rest is diffed with Myers' O(ND) algorithm in its linear-space
+form: the middle snake of each region is found by searching from both ends
+at once, and the two halves are diffed recursively. Regions that need more
+than ``max_cost`` search steps are reported as a plain replacement instead,
+which bounds the cost of diffing unrelated texts. Without that cutoff the
+diff is minimal.
+
+A diff is a list of hunks. Each hunk gives the 1-based first line and the
+line count on either side and a list of ``[tag, text]`` ops, where the tag
+is ``" "`` (unchanged), ``"-"`` (removed) or ``"+"`` (added): the old text
+of the hunk is the concatenation of its ``" "`` and ``"-"`` ops, the new
+text that of its ``" "`` and ``"+"`` ops. With ``words=True``, changed
+lines are diffed word by word, so a one-word edit is an op of a word
+rather than of whole lines. Changes of more than ``WORD_DIFF_MAX_LINES``
+lines on either side are rewrites rather than edits and stay line ops.
+"""
+
+import re
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.core.metrics import register_metrics
+
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]+")
+WORD_DIFF_MAX_LINES = 32
+
+
+def _intern(a: list[str], b: list[str]) -> tuple[list[int], list[int]]:
+    ids: dict[str, int] = {}
+    return (
+        [ids.setdefault(item, len(ids)) for item in a],
+        [ids.setdefault(item, len(ids)) for item in b],
+    )
+
+
+def _middle_snake(a: list[int], b: list[int], max_cost: int) -> tuple[int, int] | None:
+    """Find a point the shortest edit script of ``a`` to ``b`` passes through.
+
+    Returns ``None`` if that takes more than ``max_cost`` steps from either end.
+    """
+    n, m = len(a), len(b)
+    max_d = min((n + m + 1) // 2, max_cost)
+    offset = max_d + 1
+    forward = [-1] * (2 * offset + 1)
+    backward = [-1] * (2 * offset + 1)
+    forward[offset + 1] = backward[offset + 1] = 0
+    delta = n - m
+    odd = delta % 2 != 0
+    # Diagonals that ran off the grid are skipped from then on.
+    f_start = f_end = b_start = b_end = 0
+    for d in range(max_d + 1):
+        for k in range(-d + f_start, d + 1 - f_end, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if x > n:
+                f_end += 2
+            elif y > m:
+                f_start += 2
+            elif odd:
+                reverse_k = offset + delta - k
+                if (
+                    0 <= reverse_k < len(backward)
+                    and backward[reverse_k] != -1
+                    and x >= n - backward[reverse_k]
+                ):
+                    return x, y
+        for k in range(-d + b_start, d + 1 - b_end, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[n - x - 1] == b[m - y - 1]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if x > n:
+                b_end += 2
+            elif y > m:
+                b_start += 2
+            elif not odd:
+                forward_k = offset + delta - k
+                if 0 <= forward_k < len(forward) and forward[forward_k] != -1:
+                    fx = forward[forward_k]
+                    if fx >= n - x:
+                        return fx, fx - (forward_k - offset)
+    return None
+
+
+def _emit(runs: list[list], tag: str, count: int) -> None:
+    """Append a run, merging with the last one and keeping deletions first."""
+    if not count:
+        return
+    if tag == "-" and runs and runs[-1][0] == "+":
+        if len(runs) > 1 and runs[-2][0] == "-":
+            runs[-2][1] += count
+        else:
+            runs.insert(len(runs) - 1, ["-", count])
+    elif runs and runs[-1][0] == tag:
+        runs[-1][1] += count
+    else:
+        runs.append([tag, count])
+
+
+def _shortest_edit(a: list[int], b: list[int], max_cost: int) -> list[list]:
+    runs: list[list] = []
+    # Explicit stack of regions to diff, processed left to right.
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        start = a_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        _emit(runs, "=", a_lo - start)
+        suffix = 0
+        while (
+            a_lo < a_hi - suffix
+            and b_lo < b_hi - suffix
+            and a[a_hi - suffix - 1] == b[b_hi - suffix - 1]
+        ):
+            suffix += 1
+        a_hi -= suffix
+        b_hi -= suffix
+
+        split = None
+        if a_lo < a_hi and b_lo < b_hi:
+            split = _middle_snake(a[a_lo:a_hi], b[b_lo:b_hi], max_cost)
+        if split is None:
+            _emit(runs, "-", a_hi - a_lo)
+            _emit(runs, "+", b_hi - b_lo)
+            _emit(runs, "=", suffix)
+        else:
+            x, y = split
+            if suffix:
+                stack.append((a_hi, a_hi + suffix, b_hi, b_hi + suffix))
+            stack.append((a_lo + x, a_hi, b_lo + y, b_hi))
+            stack.append((a_lo, a_lo + x, b_lo, b_lo + y))
+    return runs
+
+
+def myers(a: list[int], b: list[int], *, max_cost: int = 1024) -> list[tuple[str, int]]:
+    """Return the edit script of ``a`` to ``b`` as ``(tag, count)`` runs.
+
+    Tags are ``"="``, ``"-"`` and ``"+"``; adjacent runs never share a tag
+    and a ``"-"`` run always precedes an adjacent ``"+"`` run.
+    """
+    common = set(a).intersection(b)
+    a_kept = [i for i, item in enumerate(a) if item in common]
+    b_kept = [j for j, item in enumerate(b) if item in common]
+    if len(a_kept) == len(a) and len(b_kept) == len(b):
+        return [(tag, count) for tag, count in _shortest_edit(a, b, max_cost)]
+
+    # Diff the items both sides share, then put the others back in as changes.
+    runs: list[list] = []
+    i = j = kept_i = kept_j = 0
+    shared = _shortest_edit([a[k] for k in a_kept], [b[k] for k in b_kept], max_cost)
+    for tag, count in shared:
+        if tag == "-":
+            kept_i += count
+        elif tag == "+":
+            kept_j += count
+        else:
+            for _ in range(count):
+                _emit(runs, "-", a_kept[kept_i] - i)
+                _emit(runs, "+", b_kept[kept_j] - j)
+                _emit(runs, "=", 1)
+                i, j = a_kept[kept_i] + 1, b_kept[kept_j] + 1
+                kept_i += 1
+                kept_j += 1
+    _emit(runs, "-", len(a) - i)
+    _emit(runs, "+", len(b) - j)
+    return [(tag, count) for tag, count in runs]
+
+
+def _add_op(ops: list[list[str]], tag: str, text: str) -> None:
+    if not text:
+        return
+    if ops and ops[-1][0] == tag:
+        ops[-1][1] += text
+    else:
+        ops.append([tag, text])
+
+
+def _words(old: str, new: str, max_cost: int) -> list[list[str]]:
+    old_tokens, new_tokens = _TOKEN.findall(old), _TOKEN.findall(new)
+    ops: list[list[str]] = []
+    i = j = 0
+    for tag, count in myers(*_intern(old_tokens, new_tokens), max_cost=max_cost):
+        if tag == "=":
+            text = "".join(old_tokens[i : i + count])
+            i += count
+            j += count
+        elif tag == "-":
+            text = "".join(old_tokens[i : i + count])
+            i += count
+        else:
+            text = "".join(new_tokens[j : j + count])
+            j += count
+        ops.append([" " if tag == "=" else tag, text])
+    return ops
+
+
+def diff(
+    old: str, new: str, *, context: int = 3, words: bool = False, max_cost: int = 1024
+) -> dict:
+    """Diff two texts into hunks with ``context`` unchanged lines around changes.
+
+    Returns ``{"additions": int, "deletions": int, "hunks": [...]}``, counting
+    added and removed lines; see the module docstring for the hunk format.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    runs = myers(*_intern(old_lines, new_lines), max_cost=max_cost)
+
+    # Changes as (old_start, old_stop, new_start, new_stop), 0-based.
+    changes: list[tuple[int, int, int, int]] = []
+    i = j = 0
+    for tag, count in runs:
+        if tag == "=":
+            i += count
+            j += count
+            continue
+        if changes and (changes[-1][1], changes[-1][3]) == (i, j):
+            i1, _, j1, _ = changes.pop()
+        else:
+            i1, j1 = i, j
+        if tag == "-":
+            i += count
+        else:
+            j += count
+        changes.append((i1, i, j1, j))
+
+    hunks = []
+    additions = deletions = 0
+    group: list[tuple[int, int, int, int]] = []
+    for index, change in enumerate(changes):
+        group.append(change)
+        following = changes[index + 1] if index + 1 < len(changes) else None
+        if following and following[0] - change[1] <= 2 * context:
+            continue
+
+        first, last = group[0], group[-1]
+        old_start = max(0, first[0] - context)
+        new_start = first[2] - (first[0] - old_start)
+        old_stop = min(len(old_lines), last[1] + context)
+        new_stop = last[3] + (old_stop - last[1])
+        ops: list[list[str]] = []
+
+        position = old_start
+        for i1, i2, j1, j2 in group:
+            _add_op(ops, " ", "".join(old_lines[position:i1]))
+            removed, added = "".join(old_lines[i1:i2]), "".join(new_lines[j1:j2])
+            deletions += i2 - i1
+            additions += j2 - j1
+            if words and removed and added and max(i2 - i1, j2 - j1) <= WORD_DIFF_MAX_LINES:
+                for tag, text in _words(removed, added, max_cost):
+                    _add_op(ops, tag, text)
+            else:
+                _add_op(ops, "-", removed)
+                _add_op(ops, "+", added)
+            position = i2
+        _add_op(ops, " ", "".join(old_lines[position:old_stop]))
+
+        hunks.append(
+            {
+                "old_start": old_start + 1,
+                "old_lines": old_stop - old_start,
+                "new_start": new_start + 1,
+                "new_lines": new_stop - new_start,
+                "ops": ops,
+            }
+        )
+        group = []
+    return {"additions": additions, "deletions": deletions, "hunks": hunks}
+
+
+# Diff results by organization, version pair and options. Versions are
+# immutable, so entries never go stale.
+diff_cache = TwoTierCache(
+    "version_diff",
+    maxsize=settings.VERSION_DIFF_CACHE_MAX_ENTRIES,
+    local_ttl=settings.VERSION_DIFF_CACHE_TTL_SECONDS,
+    remote_ttl=settings.VERSION_DIFF_CACHE_TTL_SECONDS,
+)
+register_metrics("version_diff_cache", diff_cache.stats.as_dict)
@@ -1,30 +1,118 @@
 from uuid import UUID
 
-from sqlmodel import Column, Field, Text
+from sqlalchemy import Index, LargeBinary, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Column, Enum, Field, Text
 
 from app.models.base import BaseDBModel
+from app.modules.document_versions.storage import VersionStorage
 
 
 class DocumentVersion(BaseDBModel, table=True):
     """Immutable snapshot of a document at a point in time.
 
     Every time a document is updated, a version record is created to
-    maintain a full audit trail of changes.
+    maintain a full audit trail of changes. The content itself lives in a
+    shared, content-addressed :class:`ContentBlob`.
 
     Attributes:
         document_id: FK to the parent document.
-        version_number: Sequential version number.
+        version_number: Sequential version number, unique per document.
         title: Title at this version.
-        content: Content at this version.
+        content: Copy of the full content, kept only for the document's
+            latest version (which search indexes) and for versions written
+            before blob storage; ``None`` otherwise.
+        blob_id: FK to the blob holding the content.
         created_by: FK to the user who created this version.
         organization_id: FK to the org (denormalized for query efficiency).
+
+    The table also carries ``search_vector``, a PostgreSQL ``tsvector`` of the
+    document title and this version's content. It is only populated for the
+    document's current version and is maintained by the search module, so it
+    is deliberately left unmapped on the model.
     """
 
     __tablename__ = "document_versions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "version_number"),
+        Column("search_vector", TSVECTOR().with_variant(Text(), "sqlite"), nullable=True),
+        Index(
+            "ix_document_versions_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("search_vector IS NOT NULL"),
+        ).ddl_if(dialect="postgresql"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
-    document_id: UUID = Field(foreign_key="documents.id", nullable=False, index=True)
+    # Indexed by the unique constraint on (document_id, version_number).
+    document_id: UUID = Field(foreign_key="documents.id", nullable=False)
     version_number: int = Field(nullable=False)
     title: str = Field(max_length=500, nullable=False)
-    content: str = Field(default="", sa_column=Column(Text))
+    content: str | None = Field(default=None, sa_column=Column(Text))
+    blob_id: UUID | None = Field(
+        default=None, foreign_key="content_blobs.id", nullable=True, index=True
+    )
     created_by: UUID = Field(foreign_key="users.id", nullable=False)
     organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+
+
+class ContentBlob(BaseDBModel, table=True):
+    """Content shared by every version of an organization with the same text.
+
+    Blobs are keyed by the SHA-256 of their content within an organization
+    and stored as a keyframe (the full content) or as a line delta against
+    a base blob; see :mod:`app.modules.document_versions.storage`.
+
+    Attributes:
+        organization_id: FK to the owning org. Blobs are never shared
+            across organizations.
+        content_hash: Hex SHA-256 of the UTF-8 content.
+        size: Length of the content in characters.
+        storage: Whether ``body`` is the content or a delta.
+        base_blob_id: FK to the blob a delta applies to.
+        depth: Number of deltas between this blob and its keyframe.
+        body: The content or the delta, unless it is stored compressed.
+        compressed: The zstd-compressed body when it is large.
+        compression_dictionary_id: FK to the dictionary ``compressed`` uses.
+        ref_count: Versions referencing the blob plus deltas based on it;
+            the blob is deleted when it drops to zero.
+    """
+
+    __tablename__ = "content_blobs"
+    __table_args__ = (UniqueConstraint("organization_id", "content_hash"),)
+
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
+    content_hash: str = Field(max_length=64, nullable=False)
+    size: int = Field(nullable=False)
+    storage: VersionStorage = Field(sa_column=Column(Enum(VersionStorage), nullable=False))
+    base_blob_id: UUID | None = Field(
+        default=None, foreign_key="content_blobs.id", nullable=True, index=True
+    )
+    depth: int = Field(default=0, nullable=False)
+    body: str | None = Field(default=None, sa_column=Column(Text))
+    compressed: bytes | None = Field(default=None, sa_column=Column(LargeBinary))
+    compression_dictionary_id: UUID | None = Field(
+        default=None, foreign_key="compression_dictionaries.id", nullable=True
+    )
+    ref_count: int = Field(default=1, nullable=False)
+
+
+class CompressionDictionary(BaseDBModel, table=True):
+    """A zstd dictionary trained on an organization's documents.
+
+    Dictionaries are immutable: retraining adds a new one, which is used for
+    new writes while existing versions keep pointing at the one they were
+    compressed with.
+
+    Attributes:
+        organization_id: FK to the org whose documents it was trained on.
+        data: The serialized dictionary.
+        sample_count: Number of documents it was trained on.
+    """
+
+    __tablename__ = "compression_dictionaries"
+
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    sample_count: int = Field(nullable=False)
@@ -1,9 +1,29 @@
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 from uuid import UUID
 
-from sqlalchemy import func, select
+import zstandard
+from sqlalchemy import Row, case, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from app.modules.document_versions.models import DocumentVersion
+from app.core.config import settings
+from app.modules.document_versions.models import (
+    CompressionDictionary,
+    ContentBlob,
+    DocumentVersion,
+)
+from app.modules.document_versions.storage import VersionStorage, dictionary_cache
+
+# Blob bodies are only read through get_blob_chains / get_blob_body, never
+# when loading whole rows.
+_without_blob_body = defer(ContentBlob.body), defer(ContentBlob.compressed)
+
+# Order of version listings, newest first. Version numbers are unique per
+# document, so no tiebreaker is needed and the (document_id, version_number)
+# index yields the order.
+VERSION_ORDER = (DocumentVersion.version_number.desc(),)
 
 
 class DocumentVersionRepository:
@@ -22,6 +42,16 @@ class DocumentVersionRepository:
         )
         return result.scalar_one_or_none()
 
+    async def exists(self, version_id: UUID, org_id: UUID) -> bool:
+        """Whether a version exists, without loading it."""
+        result = await self.db.execute(
+            select(DocumentVersion.id).where(
+                DocumentVersion.id == version_id,
+                DocumentVersion.organization_id == org_id,
+            )
+        )
+        return result.first() is not None
+
     async def list_by_document(self, document_id: UUID, org_id: UUID) -> list[DocumentVersion]:
         """List all versions of a document, ordered by version number desc."""
         result = await self.db.execute(
@@ -35,24 +65,271 @@ class DocumentVersionRepository:
         return list(result.scalars().all())
 
     def get_document_versions_query(self, document_id: UUID, org_id: UUID):
-        """Build a query for document versions (for pagination)."""
+        """Build a query for version summaries of a document (for pagination).
+
+        Selects only the columns of :class:`DocumentVersionSummary`; the
+        content length and hash come from the blob, or from the inline
+        content of versions written before blob storage (which have no hash).
+        """
         return (
-            select(DocumentVersion)
+            select(
+                DocumentVersion.id,
+                DocumentVersion.version_number,
+                DocumentVersion.title,
+                func.coalesce(ContentBlob.size, func.length(DocumentVersion.content)).label(
+                    "content_length"
+                ),
+                ContentBlob.content_hash,
+                DocumentVersion.created_by,
+                DocumentVersion.created_at,
+            )
+            .outerjoin(ContentBlob, ContentBlob.id == DocumentVersion.blob_id)
             .where(
                 DocumentVersion.document_id == document_id,
                 DocumentVersion.organization_id == org_id,
             )
-            .order_by(DocumentVersion.version_number.desc(), DocumentVersion.id.desc())
+            .order_by(*VERSION_ORDER)
+        )
+
+    async def get_latest(self, document_id: UUID) -> DocumentVersion | None:
+        """Get the version with the highest version number for a document."""
+        result = await self.db.execute(
+            select(DocumentVersion)
+            .where(DocumentVersion.document_id == document_id)
+            .order_by(DocumentVersion.version_number.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_blob(self, blob_id: UUID) -> ContentBlob | None:
+        """Fetch a content blob by ID."""
+        result = await self.db.execute(
+            select(ContentBlob).options(*_without_blob_body).where(ContentBlob.id == blob_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_blob_by_hash(self, org_id: UUID, content_hash: str) -> ContentBlob | None:
+        """Fetch an organization's blob for the content with the given hash."""
+        result = await self.db.execute(
+            select(ContentBlob)
+            .options(*_without_blob_body)
+            .where(
+                ContentBlob.organization_id == org_id,
+                ContentBlob.content_hash == content_hash,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_blob_chains(self, blob_ids: Iterable[UUID]) -> list[Row]:
+        """Fetch what is needed to rebuild the content of several blobs.
+
+        Returns ``(id, storage, base_blob_id, depth, body, compressed,
+        compression_dictionary_id)`` rows for the blobs and every blob their
+        deltas are based on, each once, ordered by depth. Keyframe bodies
+        are not included; see :meth:`get_blob_body`.
+        """
+        chain = (
+            select(ContentBlob.id, ContentBlob.base_blob_id)
+            .where(ContentBlob.id.in_(list(blob_ids)))
+            .cte("chain", recursive=True)
+        )
+        chain = chain.union(
+            select(ContentBlob.id, ContentBlob.base_blob_id).join(
+                chain, ContentBlob.id == chain.c.base_blob_id
+            )
+        )
+        is_delta = ContentBlob.storage == VersionStorage.delta
+        result = await self.db.execute(
+            select(
+                ContentBlob.id,
+                ContentBlob.storage,
+                ContentBlob.base_blob_id,
+                ContentBlob.depth,
+                case((is_delta, ContentBlob.body)).label("body"),
+                case((is_delta, ContentBlob.compressed)).label("compressed"),
+                ContentBlob.compression_dictionary_id,
+            )
+            .join(chain, chain.c.id == ContentBlob.id)
+            .order_by(ContentBlob.depth)
+        )
+        return list(result.all())
+
+    async def get_blob_body(self, blob_id: UUID) -> Row | None:
+        """Fetch ``(body, compressed, compression_dictionary_id)`` of a blob."""
+        result = await self.db.execute(
+            select(
+                ContentBlob.body,
+                ContentBlob.compressed,
+                ContentBlob.compression_dictionary_id,
+            ).where(ContentBlob.id == blob_id)
+        )
+        return result.one_or_none()
+
+    async def create_blob(self, blob: ContentBlob) -> ContentBlob | None:
+        """Persist a new content blob.
+
+        Returns ``None`` if a concurrent transaction stored the same content
+        first; the caller should then reference that blob instead.
+        """
+        try:
+            async with self.db.begin_nested():
+                self.db.add(blob)
+                await self.db.flush()
+        except IntegrityError:
+            return None
+        return blob
+
+    async def add_blob_ref(self, blob_id: UUID) -> None:
+        """Record one more reference to a blob."""
+        await self.db.execute(
+            update(ContentBlob)
+            .where(ContentBlob.id == blob_id)
+            .values(ref_count=ContentBlob.ref_count + 1, updated_at=ContentBlob.updated_at)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    async def release_blobs(self, blob_ids: Iterable[UUID]) -> int:
+        """Drop one reference per ID (repeats allowed) and delete unused blobs.
+
+        Deleting a delta releases its reference to its base blob in turn.
+        Returns the number of blobs deleted.
+        """
+        deleted = 0
+        released = Counter(blob_ids)
+        while released:
+            by_count: dict[int, list[UUID]] = defaultdict(list)
+            for blob_id, count in released.items():
+                by_count[count].append(blob_id)
+            for count, ids in by_count.items():
+                await self.db.execute(
+                    update(ContentBlob)
+                    .where(ContentBlob.id.in_(ids))
+                    .values(
+                        ref_count=ContentBlob.ref_count - count,
+                        updated_at=ContentBlob.updated_at,
+                    )
+                    .execution_options(synchronize_session="fetch")
+                )
+            unused = (
+                await self.db.execute(
+                    select(ContentBlob.id, ContentBlob.base_blob_id).where(
+                        ContentBlob.id.in_(list(released)), ContentBlob.ref_count <= 0
+                    )
+                )
+            ).all()
+            if unused:
+                await self.db.execute(
+                    delete(ContentBlob)
+                    .where(ContentBlob.id.in_([row.id for row in unused]))
+                    .execution_options(synchronize_session="fetch")
+                )
+            deleted += len(unused)
+            released = Counter(row.base_blob_id for row in unused if row.base_blob_id)
+        return deleted
+
+    async def set_blob_body(self, blob_id: UUID, **values) -> None:
+        """Change how a blob's body is stored (``body`` and compression columns)."""
+        await self.db.execute(
+            update(ContentBlob)
+            .where(ContentBlob.id == blob_id)
+            .values(**values, updated_at=ContentBlob.updated_at)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    async def get_history(self, document_id: UUID, *, after: int, limit: int) -> list[Row]:
+        """Fetch ``(id, version_number, content, blob_id)`` of versions numbered above ``after``."""
+        result = await self.db.execute(
+            select(
+                DocumentVersion.id,
+                DocumentVersion.version_number,
+                DocumentVersion.content,
+                DocumentVersion.blob_id,
+            )
+            .where(
+                DocumentVersion.document_id == document_id,
+                DocumentVersion.version_number > after,
+            )
+            .order_by(DocumentVersion.version_number)
+            .limit(limit)
         )
+        return list(result.all())
 
-    async def get_latest_version_number(self, document_id: UUID) -> int:
-        """Get the latest version number for a document."""
+    async def get_document_blobs(self, document_id: UUID) -> list[Row]:
+        """Fetch the stored body of every blob a document's versions reference."""
         result = await self.db.execute(
-            select(func.coalesce(func.max(DocumentVersion.version_number), 0)).where(
-                DocumentVersion.document_id == document_id
+            select(
+                ContentBlob.id,
+                ContentBlob.body,
+                ContentBlob.compressed,
+                ContentBlob.compression_dictionary_id,
             )
+            .where(
+                ContentBlob.id.in_(
+                    select(DocumentVersion.blob_id).where(
+                        DocumentVersion.document_id == document_id
+                    )
+                )
+            )
+            .order_by(ContentBlob.id)
         )
-        return result.scalar_one()
+        return list(result.all())
+
+    async def set_storage(self, version_id: UUID, **values) -> None:
+        """Change where a version's content is stored (``content`` and ``blob_id``).
+
+        ``updated_at`` is left untouched: this changes how the version is
+        stored, not what it contains.
+        """
+        await self.db.execute(
+            update(DocumentVersion)
+            .where(DocumentVersion.id == version_id)
+            .values(**values, updated_at=DocumentVersion.updated_at)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    async def delete_by_document(self, document_id: UUID) -> tuple[list[UUID], list[UUID]]:
+        """Delete every version of a document.
+
+        Returns the IDs of the deleted versions and of the blobs they
+        referenced; the blobs are left to :meth:`release_blobs`.
+        """
+        result = await self.db.execute(
+            delete(DocumentVersion)
+            .where(DocumentVersion.document_id == document_id)
+            .returning(DocumentVersion.id, DocumentVersion.blob_id)
+            .execution_options(synchronize_session="fetch")
+        )
+        rows = result.all()
+        return [row.id for row in rows], [row.blob_id for row in rows if row.blob_id is not None]
+
+    async def get_dictionary(self, dictionary_id: UUID) -> zstandard.ZstdCompressionDict:
+        """Load a compression dictionary, cached in process."""
+        dictionary = dictionary_cache.get(dictionary_id)
+        if dictionary is None:
+            data = await self.db.scalar(
+                select(CompressionDictionary.data).where(CompressionDictionary.id == dictionary_id)
+            )
+            dictionary = zstandard.ZstdCompressionDict(data)
+            # Digest the dictionary once instead of on every compressor.
+            dictionary.precompute_compress(level=settings.VERSION_COMPRESSION_LEVEL)
+            dictionary_cache.set(dictionary_id, dictionary)
+        return dictionary
+
+    async def get_latest_dictionary_id(self, org_id: UUID) -> UUID | None:
+        """Get the ID of the newest dictionary trained for an organization."""
+        return await self.db.scalar(
+            select(CompressionDictionary.id)
+            .where(CompressionDictionary.organization_id == org_id)
+            .order_by(CompressionDictionary.created_at.desc())
+            .limit(1)
+        )
+
+    async def create_dictionary(self, dictionary: CompressionDictionary) -> CompressionDictionary:
+        """Persist a new compression dictionary."""
+        self.db.add(dictionary)
+        await self.db.flush()
+        await self.db.refresh(dictionary)
+        return dictionary
 
     async def create(self, version: DocumentVersion) -> DocumentVersion:
         """Persist a new document version."""
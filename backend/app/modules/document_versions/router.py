@@ -1,55 +1,135 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.dependencies import get_current_org_id, get_current_user
+from app.core.etag import (
+    cached_not_modified,
+    etag_key,
+    etag_matches,
+    make_etag,
+    not_modified,
+    remember_etag,
+)
+from app.core.pagination import KeysetPage, KeysetParams
+from app.dependencies import get_current_org_id, get_tenant_user
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.document_versions.repository import DocumentVersionRepository
-from app.modules.document_versions.schemas import DocumentVersionCreate, DocumentVersionRead
+from app.modules.document_versions.schemas import (
+    DocumentVersionCreate,
+    DocumentVersionDiff,
+    DocumentVersionRead,
+    DocumentVersionSummary,
+)
 from app.modules.document_versions.service import DocumentVersionService
 from app.modules.documents.repository import DocumentRepository
+from app.modules.search.dependencies import get_search_repository
+from app.modules.search.repository import SearchRepository
 from app.modules.users.models import User
 
 router = APIRouter(
     prefix="/organizations/{org_id}/documents/{document_id}/versions",
     tags=["Document Versions"],
+    route_class=AuditedRoute,
 )
 
 
-def _get_service(db: AsyncSession = Depends(get_db)) -> DocumentVersionService:
-    return DocumentVersionService(DocumentVersionRepository(db), DocumentRepository(db), db)
+def _get_service(
+    db: AsyncSession = Depends(get_db),
+    search_repo: SearchRepository = Depends(get_search_repository),
+) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(db), DocumentRepository(db), search_repo, db
+    )
 
 
-@router.get("", response_model=CursorPage[DocumentVersionRead])
+@router.get("", response_model=KeysetPage[DocumentVersionSummary])
 async def list_versions(
     document_id: UUID,
-    params: CursorParams = Depends(),
+    params: KeysetParams = Depends(),
     org_id: UUID = Depends(get_current_org_id),
     service: DocumentVersionService = Depends(_get_service),
 ):
-    """List all versions of a document."""
+    """List all versions of a document, without their content.
+
+    Fetch a single version to get its content.
+    """
     return await service.list_versions(document_id, org_id, params)
 
 
 @router.post("", response_model=DocumentVersionRead, status_code=201)
+@audited("document_version.created", "document_version", details=("document_id", "version_number"))
 async def create_version(
     document_id: UUID,
     data: DocumentVersionCreate,
+    response: Response,
     org_id: UUID = Depends(get_current_org_id),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_tenant_user),
     service: DocumentVersionService = Depends(_get_service),
 ):
-    """Create a version snapshot of the current document state."""
-    return await service.create_version(document_id, org_id, current_user.id, data)
+    """Create a version snapshot of the current document state.
+
+    Responds 200 with the current version if ``skip_unchanged`` skipped the save.
+    """
+    version, created = await service.create_version(document_id, org_id, current_user.id, data)
+    if not created:
+        response.status_code = 200
+    return version
 
 
-@router.get("/{version_id}", response_model=DocumentVersionRead)
+@router.get(
+    "/{version_id}",
+    response_model=DocumentVersionRead,
+    responses={304: {"description": "Not modified (matches If-None-Match)"}},
+)
 async def get_version(
     version_id: UUID,
+    request: Request,
+    response: Response,
+    org_id: UUID = Depends(get_current_org_id),
+    service: DocumentVersionService = Depends(_get_service),
+):
+    """Get a specific document version.
+
+    Versions never change, so the response may be cached as immutable and
+    a request with its ETag in ``If-None-Match`` gets a 304 without the
+    content being loaded.
+    """
+    cache_control = f"private, max-age={settings.VERSION_CACHE_MAX_AGE_SECONDS}, immutable"
+    key = etag_key("version", org_id, version_id)
+    if cached := await cached_not_modified(request, key, cache_control):
+        return cached
+    etag = make_etag(version_id)
+    if etag_matches(request, etag):
+        await service.check_version_exists(version_id, org_id)
+        await remember_etag(key, etag)
+        return not_modified(etag, cache_control)
+    version = await service.get_version(version_id, org_id)
+    await remember_etag(key, etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return version
+
+
+@router.get("/{version_id}/diff/{other_version_id}", response_model=DocumentVersionDiff)
+async def diff_versions(
+    document_id: UUID,
+    version_id: UUID,
+    other_version_id: UUID,
+    context: int = Query(3, ge=0, le=1000, description="Unchanged lines around each change"),
+    granularity: Literal["line", "word"] = Query("line"),
     org_id: UUID = Depends(get_current_org_id),
     service: DocumentVersionService = Depends(_get_service),
 ):
-    """Get a specific document version."""
-    return await service.get_version(version_id, org_id)
+    """Diff a version (old side) against another version (new side) of the document."""
+    return await service.diff_versions(
+        document_id,
+        org_id,
+        version_id,
+        other_version_id,
+        context=context,
+        words=granularity == "word",
+    )
@@ -1,15 +1,38 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 from uuid import UUID
 
 from pydantic import BaseModel, StringConstraints
 
 
 class DocumentVersionCreate(BaseModel):
-    """Schema for creating a document version (internal use)."""
+    """Schema for creating a document version (internal use).
+
+    With ``skip_unchanged``, saving the same title and content as the
+    document's current version returns that version instead of a new one.
+    """
 
     title: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=500)]
     content: str
+    skip_unchanged: bool = False
+
+
+class DocumentVersionSummary(BaseModel):
+    """Schema for version listings: everything but the content itself.
+
+    ``content_hash`` is the SHA-256 of the content, or ``None`` for versions
+    written before blob storage that have not been compacted yet.
+    """
+
+    id: UUID
+    version_number: int
+    title: str
+    content_length: int
+    content_hash: str | None
+    created_by: UUID
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
 
 
 class DocumentVersionRead(BaseModel):
@@ -25,3 +48,29 @@ class DocumentVersionRead(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class DiffHunk(BaseModel):
+    """A run of changes with its surrounding context lines.
+
+    Starts are 1-based line numbers. Each op is ``[tag, text]`` with tag
+    ``" "`` (unchanged), ``"-"`` (removed) or ``"+"`` (added); the hunk's old
+    text is its ``" "`` and ``"-"`` ops joined, the new text its ``" "`` and
+    ``"+"`` ops joined.
+    """
+
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    ops: list[tuple[Literal[" ", "-", "+"], str]]
+
+
+class DocumentVersionDiff(BaseModel):
+    """Schema for the diff between two versions of a document."""
+
+    from_version_id: UUID
+    to_version_id: UUID
+    additions: int
+    deletions: int
+    hunks: list[DiffHunk]
@@ -1,21 +1,54 @@
+import asyncio
+from collections.abc import Iterable
 from uuid import UUID
 
-from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
-
+from app.core.config import settings
+from app.core.etag import forget_etags
 from app.core.exceptions import NotFoundException
-from app.modules.document_versions.models import DocumentVersion
-from app.modules.document_versions.repository import DocumentVersionRepository
-from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.core.pagination import KeysetPage, KeysetParams, paginate
+from app.modules.document_versions.diff import diff, diff_cache
+from app.modules.document_versions.models import ContentBlob, DocumentVersion
+from app.modules.document_versions.repository import VERSION_ORDER, DocumentVersionRepository
+from app.modules.document_versions.schemas import (
+    DocumentVersionCreate,
+    DocumentVersionDiff,
+    DocumentVersionRead,
+    DocumentVersionSummary,
+)
+from app.modules.document_versions.storage import (
+    VersionStorage,
+    apply_delta,
+    compress,
+    content_hash,
+    decompress,
+    encode_delta,
+    keyframe_cache,
+    should_compress,
+)
 from app.modules.documents.repository import DocumentRepository
+from app.modules.documents.service import document_etag_keys
+from app.modules.search.repository import SearchRepository
+
+
+def _to_read(version: DocumentVersion, content: str) -> DocumentVersionRead:
+    # Built field by field so the ORM row is never modified (and flushed).
+    data = version.model_dump(include=set(DocumentVersionRead.model_fields))
+    return DocumentVersionRead.model_validate({**data, "content": content})
 
 
 class DocumentVersionService:
     """Business logic for document version operations."""
 
-    def __init__(self, repo: DocumentVersionRepository, document_repo: DocumentRepository, db):
+    def __init__(
+        self,
+        repo: DocumentVersionRepository,
+        document_repo: DocumentRepository,
+        search_repo: SearchRepository,
+        db,
+    ):
         self.repo = repo
         self.document_repo = document_repo
+        self.search_repo = search_repo
         self.db = db
 
     async def create_version(
@@ -24,37 +57,64 @@ class DocumentVersionService:
         org_id: UUID,
         user_id: UUID,
         data: DocumentVersionCreate,
-    ) -> DocumentVersion:
+    ) -> tuple[DocumentVersion, bool]:
         """Create a new version snapshot for a document.
 
-        Automatically increments the version number and updates
-        the parent document's current_version_id.
+        Numbers the version from the document's counter, updates the parent
+        document's current_version_id and moves the search index entry
+        to the new version. The content is stored in the organization's
+        blob for it, which is created if no version had that content yet.
+        The new version also keeps a copy of its content for search; the
+        previous version's copy is dropped.
+
+        With ``data.skip_unchanged``, nothing is written if the title and
+        content equal the document's current version, which is returned
+        instead. Returns the version and whether it was created.
         """
-        # Verify document exists
-        document = await self.document_repo.get_by_id(document_id, org_id)
+        # Locked until commit, so concurrent saves to the document run one at a
+        # time and its current version (compared, numbered after and
+        # un-indexed below) cannot change under us.
+        document = await self.document_repo.get_by_id(document_id, org_id, for_update=True)
         if not document:
             raise NotFoundException("Document not found")
 
-        latest = await self.repo.get_latest_version_number(document_id)
+        digest = content_hash(data.content)
+        if data.skip_unchanged and document.current_version_id:
+            current = await self.repo.get_by_id(document.current_version_id, org_id)
+            if current.title == data.title and await self._hash_of(current) == digest:
+                return current, False
 
-        version = DocumentVersion(
-            document_id=document_id,
-            version_number=latest + 1,
-            title=data.title,
-            content=data.content,
-            created_by=user_id,
-            organization_id=org_id,
+        number = await self.document_repo.next_version_number(document_id)
+        latest = await self.repo.get_latest(document_id)
+        blob = await self._store(org_id, data.content, digest, base=latest)
+        version = await self.repo.create(
+            DocumentVersion(
+                document_id=document_id,
+                version_number=number,
+                title=data.title,
+                content=data.content,
+                blob_id=blob.id,
+                created_by=user_id,
+                organization_id=org_id,
+            )
         )
-        version = await self.repo.create(version)
 
         # Update the parent document to point to this new version
+        previous_version_id = document.current_version_id
         document.current_version_id = version.id
         await self.document_repo.update(document)
+        await forget_etags(*document_etag_keys(org_id, document_id), db=self.db)
+        await self.search_repo.index_current_version(
+            version.id, previous_version_id, document.title
+        )
+        # Only after re-indexing: the search index may still need the old content.
+        if latest and latest.blob_id:
+            await self.repo.set_storage(latest.id, content=None)
 
-        return version
+        return version, True
 
-    async def get_version(self, version_id: UUID, org_id: UUID) -> DocumentVersion:
-        """Get a specific version by ID.
+    async def get_version(self, version_id: UUID, org_id: UUID) -> DocumentVersionRead:
+        """Get a specific version by ID, rebuilding its content if needed.
 
         Raises:
             NotFoundException: If the version does not exist.
@@ -62,9 +122,228 @@ class DocumentVersionService:
         version = await self.repo.get_by_id(version_id, org_id)
         if not version:
             raise NotFoundException("Document version not found")
-        return version
+        return _to_read(version, await self._content_of(version))
+
+    async def check_version_exists(self, version_id: UUID, org_id: UUID) -> None:
+        """Check that a version exists without loading it or its content.
+
+        Raises:
+            NotFoundException: If the version does not exist.
+        """
+        if not await self.repo.exists(version_id, org_id):
+            raise NotFoundException("Document version not found")
 
-    async def list_versions(self, document_id: UUID, org_id: UUID, params: CursorParams):
-        """List all versions of a document (cursor-paginated)."""
+    async def list_versions(
+        self, document_id: UUID, org_id: UUID, params: KeysetParams
+    ) -> KeysetPage[DocumentVersionSummary]:
+        """List version summaries of a document, without content (keyset-paginated)."""
         query = self.repo.get_document_versions_query(document_id, org_id)
-        return await paginate(self.db, query, params)
+        return await paginate(self.db, query, VERSION_ORDER, params, DocumentVersionSummary)
+
+    async def diff_versions(
+        self,
+        document_id: UUID,
+        org_id: UUID,
+        from_version_id: UUID,
+        to_version_id: UUID,
+        *,
+        context: int = 3,
+        words: bool = False,
+    ) -> DocumentVersionDiff:
+        """Diff two versions of a document, line by line or word by word.
+
+        Results are cached per version pair and options; versions never
+        change, so a cached diff is always current.
+
+        Raises:
+            NotFoundException: If either version does not exist or belongs
+                to another document.
+        """
+        key = f"{org_id}:{document_id}:{from_version_id}:{to_version_id}:{context}:{int(words)}"
+        cached = await diff_cache.get(key)
+        if cached is not None:
+            return DocumentVersionDiff.model_validate(cached)
+
+        versions = []
+        for version_id in (from_version_id, to_version_id):
+            version = await self.repo.get_by_id(version_id, org_id)
+            if not version or version.document_id != document_id:
+                raise NotFoundException("Document version not found")
+            versions.append(version)
+        old, new = [await self._content_of(version) for version in versions]
+        # Large diffs take a while; keep the event loop serving other requests.
+        result = await asyncio.to_thread(
+            diff,
+            old,
+            new,
+            context=context,
+            words=words,
+            max_cost=settings.VERSION_DIFF_MAX_COST,
+        )
+        data = {"from_version_id": str(from_version_id), "to_version_id": str(to_version_id)}
+        data.update(result)
+        await diff_cache.set(key, data)
+        return DocumentVersionDiff.model_validate(data)
+
+    async def compact_document(
+        self, document_id: UUID, org_id: UUID, *, batch_size: int = 200
+    ) -> int:
+        """Move a document's history into the current storage layout.
+
+        Versions written before blob storage are moved into blobs, older
+        versions drop their copy of the content, and the document's blobs
+        are (re)compressed per the current compression setting and the
+        organization's newest dictionary. Contents never change. The
+        document row is locked meanwhile. Returns the number of versions
+        and blobs rewritten.
+
+        Raises:
+            NotFoundException: If the document does not exist.
+        """
+        document = await self.document_repo.get_by_id(document_id, org_id, for_update=True)
+        if not document:
+            raise NotFoundException("Document not found")
+        latest = await self.repo.get_latest(document_id)
+
+        changed = 0
+        after = 0
+        previous: tuple[ContentBlob, str] | None = None
+        while batch := await self.repo.get_history(document_id, after=after, limit=batch_size):
+            for row in batch:
+                content = row.content
+                if row.blob_id is None:
+                    blob = await self._store(org_id, content, content_hash(content), base=previous)
+                else:
+                    blob = await self.repo.get_blob(row.blob_id)
+                    if content is None:
+                        content = (await self._blob_contents([row.blob_id]))[row.blob_id]
+                values = {
+                    "blob_id": blob.id,
+                    "content": content if row.id == latest.id else None,
+                }
+                if (row.blob_id, row.content) != (values["blob_id"], values["content"]):
+                    await self.repo.set_storage(row.id, **values)
+                    changed += 1
+                previous = blob, content
+            after = batch[-1].version_number
+
+        dictionary_id = await self.repo.get_latest_dictionary_id(org_id)
+        for blob in await self.repo.get_document_blobs(document_id):
+            body = await self._decode(blob.body, blob.compressed, blob.compression_dictionary_id)
+            if not should_compress(body):
+                values = {"body": body, "compressed": None, "compression_dictionary_id": None}
+            elif blob.compressed is None or blob.compression_dictionary_id != dictionary_id:
+                compressed, _ = await self._compress(org_id, body, dictionary_id)
+                values = {
+                    "body": None,
+                    "compressed": compressed,
+                    "compression_dictionary_id": dictionary_id,
+                }
+            else:
+                continue
+            if any(getattr(blob, name) != value for name, value in values.items()):
+                await self.repo.set_blob_body(blob.id, **values)
+                changed += 1
+        return changed
+
+    async def _store(
+        self,
+        org_id: UUID,
+        content: str,
+        digest: str,
+        *,
+        base: DocumentVersion | tuple[ContentBlob, str] | None,
+    ) -> ContentBlob:
+        """Reference the blob for ``content``, creating it if needed.
+
+        A new blob is stored as a delta against ``base`` (the version
+        written before it, or a blob and its content) unless that would
+        make the chain reach ``VERSION_KEYFRAME_INTERVAL`` deltas.
+        """
+        blob = await self.repo.get_blob_by_hash(org_id, digest)
+        if blob:
+            await self.repo.add_blob_ref(blob.id)
+            return blob
+
+        if isinstance(base, DocumentVersion):
+            base = (await self.repo.get_blob(base.blob_id), base.content) if base.blob_id else None
+        blob = ContentBlob(
+            organization_id=org_id,
+            content_hash=digest,
+            size=len(content),
+            storage=VersionStorage.keyframe,
+        )
+        body = content
+        if base and base[0].depth + 1 < settings.VERSION_KEYFRAME_INTERVAL:
+            base_blob, base_content = base
+            if base_content is None:
+                base_content = (await self._blob_contents([base_blob.id]))[base_blob.id]
+            blob.storage = VersionStorage.delta
+            blob.base_blob_id = base_blob.id
+            blob.depth = base_blob.depth + 1
+            body = encode_delta(base_content, content)
+        if should_compress(body):
+            blob.compressed, blob.compression_dictionary_id = await self._compress(org_id, body)
+        else:
+            blob.body = body
+
+        if await self.repo.create_blob(blob) is None:
+            # Lost a race with a concurrent save of the same content.
+            return await self._store(org_id, content, digest, base=None)
+        if blob.base_blob_id:
+            await self.repo.add_blob_ref(blob.base_blob_id)
+        return blob
+
+    async def _hash_of(self, version: DocumentVersion) -> str:
+        if version.blob_id:
+            return (await self.repo.get_blob(version.blob_id)).content_hash
+        return content_hash(version.content)
+
+    async def _compress(
+        self, org_id: UUID, body: str, dictionary_id: UUID | None = None
+    ) -> tuple[bytes, UUID | None]:
+        # New writes use the organization's newest dictionary, if it has one.
+        dictionary_id = dictionary_id or await self.repo.get_latest_dictionary_id(org_id)
+        dictionary = await self.repo.get_dictionary(dictionary_id) if dictionary_id else None
+        return compress(body, dictionary), dictionary_id
+
+    async def _decode(
+        self, plain: str | None, compressed: bytes | None, dictionary_id: UUID | None
+    ) -> str:
+        if plain is not None:
+            return plain
+        dictionary = await self.repo.get_dictionary(dictionary_id) if dictionary_id else None
+        return decompress(compressed, dictionary)
+
+    async def _content_of(self, version: DocumentVersion) -> str:
+        if version.content is not None:
+            return version.content
+        return (await self._blob_contents([version.blob_id]))[version.blob_id]
+
+    async def _keyframe(self, blob_id: UUID) -> str:
+        content = keyframe_cache.get(blob_id)
+        if content is None:
+            content = await self._decode(*await self.repo.get_blob_body(blob_id))
+            keyframe_cache.set(blob_id, content)
+        return content
+
+    async def _blob_contents(self, blob_ids: Iterable[UUID]) -> dict[UUID, str]:
+        """Rebuild the content of several blobs, sharing work between their chains."""
+        blob_ids = set(blob_ids)
+        if not blob_ids:
+            return {}
+        # Skip the chain query for cached keyframes, the common case for reads.
+        contents = {blob_id: keyframe_cache.get(blob_id) for blob_id in blob_ids}
+        if all(content is not None for content in contents.values()):
+            return contents
+
+        lines: dict[UUID, list[str]] = {}
+        for link in await self.repo.get_blob_chains(blob_ids):  # bases before their deltas
+            if link.storage == VersionStorage.keyframe:
+                lines[link.id] = (await self._keyframe(link.id)).splitlines(keepends=True)
+            else:
+                delta = await self._decode(
+                    link.body, link.compressed, link.compression_dictionary_id
+                )
+                lines[link.id] = apply_delta(lines[link.base_blob_id], delta)
+        return {blob_id: "".join(lines[blob_id]) for blob_id in blob_ids}
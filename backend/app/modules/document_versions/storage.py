@@ -0,0 +1,125 @@
+"""
+Content-addressed, delta-compressed storage for version history.
+
+Version content lives in content blobs, one per distinct text within an
+organization, so no-op saves and reverts cost nothing. A blob is either a
+*keyframe* (the full content) or a *delta*: a line-level edit script
+against the blob of the version it was written after. Chains are cut by a
+keyframe every ``VERSION_KEYFRAME_INTERVAL`` blobs, so rebuilding any
+content replays at most ``interval - 1`` deltas.
+
+A delta is a JSON array whose items are either ``[start, stop]`` (copy
+lines ``start:stop`` of the previous version) or a string (insert this
+text). Lines keep their line endings, so joining the result reproduces the
+content byte for byte.
+
+Stored bodies (a keyframe's content or a delta) of at least
+``VERSION_COMPRESSION_MIN_BYTES`` are zstd-compressed, optionally with a
+dictionary trained on the organization's own documents.
+"""
+
+import enum
+import hashlib
+import json
+from difflib import SequenceMatcher
+
+import zstandard
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class VersionStorage(enum.StrEnum):
+    """How a blob's content is stored."""
+
+    keyframe = "keyframe"
+    delta = "delta"
+
+
+def content_hash(content: str) -> str:
+    """Return the key a content blob is stored under."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def encode_delta(old: str, new: str) -> str:
+    """Return the line delta that turns ``old`` into ``new``."""
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+
+    # Edits are usually local, so strip the common prefix and suffix before
+    # handing the (quadratic) matcher only the lines that changed.
+    prefix = 0
+    limit = min(len(a), len(b))
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+
+    ops: list[list[int] | str] = []
+
+    def copy(start: int, stop: int) -> None:
+        if start == stop:
+            return
+        if ops and isinstance(ops[-1], list) and ops[-1][1] == start:
+            ops[-1][1] = stop
+        else:
+            ops.append([start, stop])
+
+    def insert(text: str) -> None:
+        if not text:
+            return
+        if ops and isinstance(ops[-1], str):
+            ops[-1] += text
+        else:
+            ops.append(text)
+
+    copy(0, prefix)
+    matcher = SequenceMatcher(None, a[prefix : len(a) - suffix], b[prefix : len(b) - suffix])
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            copy(prefix + i1, prefix + i2)
+        elif tag in ("replace", "insert"):
+            insert("".join(b[prefix + j1 : prefix + j2]))
+    copy(len(a) - suffix, len(a))
+    return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_delta(lines: list[str], delta: str) -> list[str]:
+    """Apply a delta to the lines of the previous version."""
+    result: list[str] = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            result.extend(op.splitlines(keepends=True))
+        else:
+            result.extend(lines[op[0] : op[1]])
+    return result
+
+
+def should_compress(body: str) -> bool:
+    """Return whether a stored body is large enough to be compressed."""
+    return (
+        settings.VERSION_COMPRESSION_ENABLED and len(body) >= settings.VERSION_COMPRESSION_MIN_BYTES
+    )
+
+
+def compress(body: str, dictionary: zstandard.ZstdCompressionDict | None = None) -> bytes:
+    """Compress a stored body with zstd."""
+    compressor = zstandard.ZstdCompressor(
+        level=settings.VERSION_COMPRESSION_LEVEL, dict_data=dictionary
+    )
+    return compressor.compress(body.encode())
+
+
+def decompress(data: bytes, dictionary: zstandard.ZstdCompressionDict | None = None) -> str:
+    """Inverse of :func:`compress`."""
+    return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data).decode()
+
+
+# Keyframe content by blob ID. Blob content is immutable, so entries never
+# go stale and are only evicted by size.
+keyframe_cache = TTLCache(settings.VERSION_KEYFRAME_CACHE_MAX_ENTRIES, ttl=float("inf"))
+
+# Loaded zstd dictionaries by ID; dictionaries are never modified either.
+dictionary_cache = TTLCache(64, ttl=float("inf"))
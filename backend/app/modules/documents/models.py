@@ -3,7 +3,7 @@ from uuid import UUID
 
 from sqlmodel import Column, Enum, Field
 
-from app.models.base import BaseDBModel
+from app.models.base import BaseDBModel, keyset_index
 
 
 class DocumentStatus(enum.StrEnum):
@@ -23,12 +23,18 @@ class Document(BaseDBModel, table=True):
         title: Document title.
         status: Lifecycle status (draft → published → archived).
         current_version_id: FK to the latest document version.
+        version_count: Number of the latest version; incremented to number
+            each new version.
         workspace_id: FK to the parent workspace.
         organization_id: FK to the parent organization.
         created_by: FK to the user who created the document.
     """
 
     __tablename__ = "documents"
+    __table_args__ = (
+        keyset_index("documents", "organization_id"),
+        keyset_index("documents", "organization_id", "workspace_id"),
+    )
 
     title: str = Field(max_length=500, nullable=False)
     status: DocumentStatus = Field(
@@ -37,6 +43,7 @@ class Document(BaseDBModel, table=True):
     current_version_id: UUID | None = Field(
         default=None, foreign_key="document_versions.id", nullable=True
     )
+    version_count: int = Field(default=0, nullable=False)
     workspace_id: UUID = Field(foreign_key="workspaces.id", nullable=False, index=True)
-    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
     created_by: UUID = Field(foreign_key="users.id", nullable=False)
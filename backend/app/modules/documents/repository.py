@@ -1,10 +1,14 @@
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.modules.document_versions.models import DocumentVersion
 from app.modules.documents.models import Document
 
+# Order of document listings, newest first.
+DOCUMENT_ORDER = (Document.created_at.desc(), Document.id.desc())
+
 
 class DocumentRepository:
     """Handles all database operations for documents."""
@@ -12,16 +16,46 @@ class DocumentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_by_id(self, doc_id: UUID, org_id: UUID) -> Document | None:
-        """Fetch a document by ID, scoped to an organization."""
-        result = await self.db.execute(
-            select(Document).where(
-                Document.id == doc_id,
-                Document.organization_id == org_id,
-            )
+    async def get_by_id(
+        self, doc_id: UUID, org_id: UUID, *, for_update: bool = False
+    ) -> Document | None:
+        """Fetch a document by ID, scoped to an organization.
+
+        With ``for_update`` the row stays locked until the transaction ends,
+        and is read again even if the session already holds it.
+        """
+        query = select(Document).where(
+            Document.id == doc_id,
+            Document.organization_id == org_id,
         )
+        if for_update:
+            query = query.with_for_update().execution_options(populate_existing=True)
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_with_current_version(self, doc_id: UUID, org_id: UUID) -> Row | None:
+        """Fetch a document and its current version (or ``None``) in one query."""
+        result = await self.db.execute(
+            select(Document, DocumentVersion)
+            .outerjoin(DocumentVersion, DocumentVersion.id == Document.current_version_id)
+            .where(Document.id == doc_id, Document.organization_id == org_id)
+        )
+        return result.one_or_none()
+
+    async def next_version_number(self, doc_id: UUID) -> int:
+        """Increment and return the document's version counter.
+
+        The row stays locked until the transaction ends, so concurrent saves
+        to the same document are numbered (and written) one at a time.
+        """
+        result = await self.db.execute(
+            update(Document)
+            .where(Document.id == doc_id)
+            .values(version_count=Document.version_count + 1)
+            .returning(Document.version_count)
+        )
+        return result.scalar_one()
+
     async def list_by_workspace(
         self, workspace_id: UUID, org_id: UUID, *, skip: int = 0, limit: int = 100
     ) -> list[Document]:
@@ -49,7 +83,7 @@ class DocumentRepository:
         query = select(Document).where(Document.organization_id == org_id)
         if workspace_id:
             query = query.where(Document.workspace_id == workspace_id)
-        return query.order_by(Document.created_at.desc(), Document.id.desc())
+        return query.order_by(*DOCUMENT_ORDER)
 
     async def create(self, document: Document) -> Document:
         """Persist a new document."""
@@ -1,30 +1,52 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import get_current_org_id, get_current_user, require_role
+from app.core.etag import (
+    cached_not_modified,
+    etag_key,
+    etag_matches,
+    make_etag,
+    not_modified,
+    remember_etag,
+)
+from app.core.pagination import KeysetPage, KeysetParams
+from app.dependencies import get_current_org_id, get_tenant_user, require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
+from app.modules.document_versions.repository import DocumentVersionRepository
 from app.modules.documents.repository import DocumentRepository
-from app.modules.documents.schemas import DocumentCreate, DocumentRead, DocumentUpdate
+from app.modules.documents.schemas import (
+    DocumentCreate,
+    DocumentRead,
+    DocumentUpdate,
+    DocumentWithContent,
+)
 from app.modules.documents.service import DocumentService
 from app.modules.memberships.models import RoleEnum
+from app.modules.search.dependencies import get_search_repository
+from app.modules.search.repository import SearchRepository
 from app.modules.users.models import User
 
 router = APIRouter(
     prefix="/organizations/{org_id}/documents",
     tags=["Documents"],
+    route_class=AuditedRoute,
 )
 
 
-def _get_service(db: AsyncSession = Depends(get_db)) -> DocumentService:
-    return DocumentService(DocumentRepository(db), db)
+def _get_service(
+    db: AsyncSession = Depends(get_db),
+    search_repo: SearchRepository = Depends(get_search_repository),
+) -> DocumentService:
+    return DocumentService(DocumentRepository(db), DocumentVersionRepository(db), search_repo, db)
 
 
-@router.get("", response_model=CursorPage[DocumentRead])
+@router.get("", response_model=KeysetPage[DocumentRead])
 async def list_documents(
-    params: CursorParams = Depends(),
+    params: KeysetParams = Depends(),
     org_id: UUID = Depends(get_current_org_id),
     workspace_id: UUID | None = Query(None, description="Filter by workspace"),
     service: DocumentService = Depends(_get_service),
@@ -34,10 +56,11 @@ async def list_documents(
 
 
 @router.post("", response_model=DocumentRead, status_code=201)
+@audited("document.created", "document", details=("workspace_id",))
 async def create_document(
     data: DocumentCreate,
     org_id: UUID = Depends(get_current_org_id),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_tenant_user),
     _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin, RoleEnum.member)),
     service: DocumentService = Depends(_get_service),
 ):
@@ -45,17 +68,44 @@ async def create_document(
     return await service.create_document(org_id, current_user.id, data)
 
 
-@router.get("/{document_id}", response_model=DocumentRead)
+@router.get(
+    "/{document_id}",
+    response_model=DocumentWithContent,
+    response_model_exclude_unset=True,
+    responses={304: {"description": "Not modified (matches If-None-Match)"}},
+)
 async def get_document(
     document_id: UUID,
+    request: Request,
+    response: Response,
+    include: Literal["content"] | None = Query(
+        None, description="`content` adds the current version's number and content"
+    ),
     org_id: UUID = Depends(get_current_org_id),
     service: DocumentService = Depends(_get_service),
 ):
-    """Get document details."""
-    return await service.get_document(document_id, org_id)
+    """Get document details, optionally with the current content.
+
+    Responds with an ETag; send it back in ``If-None-Match`` to get a 304
+    while neither the document nor its current version changed.
+    """
+    key = etag_key("document", org_id, document_id, include)
+    if cached := await cached_not_modified(request, key):
+        return cached
+    if include == "content":
+        document = await service.get_document_with_content(document_id, org_id)
+    else:
+        document = await service.get_document(document_id, org_id)
+    etag = make_etag(document.id, document.updated_at, document.current_version_id, include)
+    await remember_etag(key, etag)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return document
 
 
 @router.patch("/{document_id}", response_model=DocumentRead)
+@audited("document.updated", "document", resource_id="document_id", details=("workspace_id",))
 async def update_document(
     document_id: UUID,
     data: DocumentUpdate,
@@ -68,6 +118,7 @@ async def update_document(
 
 
 @router.delete("/{document_id}", status_code=204)
+@audited("document.deleted", "document", resource_id="document_id")
 async def delete_document(
     document_id: UUID,
     org_id: UUID = Depends(get_current_org_id),
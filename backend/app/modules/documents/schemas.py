@@ -39,3 +39,13 @@ class DocumentRead(BaseModel):
     current_version_id: UUID | None = None
 
     model_config = {"from_attributes": True}
+
+
+class DocumentWithContent(DocumentRead):
+    """Schema for a document together with its current version (``include=content``).
+
+    Both fields are ``None`` for a document without versions.
+    """
+
+    version_number: int | None = None
+    content: str | None = None
@@ -1,19 +1,38 @@
 from uuid import UUID
 
-from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
-
+from app.core.etag import etag_key, forget_etags
 from app.core.exceptions import NotFoundException
+from app.core.pagination import KeysetPage, KeysetParams, paginate
+from app.modules.document_versions.repository import DocumentVersionRepository
 from app.modules.documents.models import Document
-from app.modules.documents.repository import DocumentRepository
-from app.modules.documents.schemas import DocumentCreate, DocumentUpdate
+from app.modules.documents.repository import DOCUMENT_ORDER, DocumentRepository
+from app.modules.documents.schemas import (
+    DocumentCreate,
+    DocumentRead,
+    DocumentUpdate,
+    DocumentWithContent,
+)
+from app.modules.search.repository import SearchRepository
+
+
+def document_etag_keys(org_id: UUID, doc_id: UUID) -> tuple[str, str]:
+    """ETag validator keys of a document, without and with ``include=content``."""
+    return etag_key("document", org_id, doc_id), etag_key("document", org_id, doc_id, "content")
 
 
 class DocumentService:
     """Business logic for document operations."""
 
-    def __init__(self, repo: DocumentRepository, db):
+    def __init__(
+        self,
+        repo: DocumentRepository,
+        version_repo: DocumentVersionRepository,
+        search_repo: SearchRepository,
+        db,
+    ):
         self.repo = repo
+        self.version_repo = version_repo
+        self.search_repo = search_repo
         self.db = db
 
     async def create_document(self, org_id: UUID, user_id: UUID, data: DocumentCreate) -> Document:
@@ -38,6 +57,27 @@ class DocumentService:
             raise NotFoundException("Document not found")
         return document
 
+    async def get_document_with_content(self, doc_id: UUID, org_id: UUID) -> DocumentWithContent:
+        """Get a document with its current version's content, in a single query.
+
+        The current version always keeps its content inline (search indexes
+        it), so no blob has to be read.
+
+        Raises:
+            NotFoundException: If the document does not exist.
+        """
+        row = await self.repo.get_with_current_version(doc_id, org_id)
+        if not row:
+            raise NotFoundException("Document not found")
+        document, version = row
+        return DocumentWithContent.model_validate(
+            {
+                **document.model_dump(include=set(DocumentWithContent.model_fields)),
+                "version_number": version.version_number if version else None,
+                "content": version.content if version else None,
+            }
+        )
+
     async def update_document(self, doc_id: UUID, org_id: UUID, data: DocumentUpdate) -> Document:
         """Update a document.
 
@@ -49,13 +89,22 @@ class DocumentService:
             raise NotFoundException("Document not found")
 
         update_data = data.model_dump(exclude_unset=True)
+        previous_title = document.title
         for field, value in update_data.items():
             setattr(document, field, value)
 
-        return await self.repo.update(document)
+        document = await self.repo.update(document)
+        await forget_etags(*document_etag_keys(org_id, doc_id), db=self.db)
+        if document.title != previous_title and document.current_version_id:
+            await self.search_repo.reindex_title(
+                document.current_version_id, document.title, previous_title
+            )
+        return document
 
     async def delete_document(self, doc_id: UUID, org_id: UUID) -> None:
-        """Delete a document.
+        """Delete a document with its versions.
+
+        Content blobs no other version references are deleted as well.
 
         Raises:
             NotFoundException: If the document does not exist.
@@ -63,15 +112,26 @@ class DocumentService:
         document = await self.repo.get_by_id(doc_id, org_id)
         if not document:
             raise NotFoundException("Document not found")
+        if document.current_version_id:
+            await self.search_repo.remove(document.current_version_id, document.title)
+            document.current_version_id = None
+            await self.repo.update(document)
+        version_ids, blob_ids = await self.version_repo.delete_by_document(doc_id)
+        await self.version_repo.release_blobs(blob_ids)
         await self.repo.delete(document)
+        await forget_etags(
+            *document_etag_keys(org_id, doc_id),
+            *(etag_key("version", org_id, version_id) for version_id in version_ids),
+            db=self.db,
+        )
 
     async def list_documents(
         self,
         org_id: UUID,
         workspace_id: UUID | None = None,
         *,
-        params: CursorParams,
-    ):
-        """List documents, optionally filtered by workspace (cursor-paginated)."""
+        params: KeysetParams,
+    ) -> KeysetPage[DocumentRead]:
+        """List documents, optionally filtered by workspace (keyset-paginated)."""
         query = self.repo.get_org_documents_query(org_id, workspace_id)
-        return await paginate(self.db, query, params)
+        return await paginate(self.db, query, DOCUMENT_ORDER, params, DocumentRead)
@@ -0,0 +1 @@
+"""Autosave drafts module."""
@@ -0,0 +1,151 @@
+"""
+Background writer of idle autosave drafts.
+
+Every ``DRAFT_FLUSH_INTERVAL_SECONDS`` each worker's flusher lists drafts
+that have not been saved for ``DRAFT_IDLE_SECONDS`` and writes each as a
+version in its own transaction. Workers share the pending set in Redis;
+removing a draft from it is the claim, so every draft is written by one
+worker. The draft itself is only deleted after the version is committed,
+and only if it was not saved again meanwhile (the new save put it back on
+the pending set). Drafts that fail to write are put back and retried on a
+later pass; drafts of deleted documents are dropped, and so are drafts
+whose author can no longer edit the organization's documents (removed,
+deactivated or made a viewer since the last save). Pending drafts live in
+Redis, so they survive restarts of every worker.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from contextlib import suppress
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import redis as redis_module
+from app.core.config import settings
+from app.core.database import async_session_factory, commit
+from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.dependencies import has_role
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.repository import DocumentRepository
+from app.modules.drafts.repository import DraftKey, DraftRepository
+from app.modules.drafts.service import DraftService
+from app.modules.memberships.models import RoleEnum
+from app.modules.search.backends import SearchBackend, search_backend
+from app.modules.search.repository import SearchRepository
+
+logger = get_logger(__name__)
+
+
+class DraftFlusher:
+    """Periodically writes idle drafts as versions.
+
+    Args:
+        session_factory: Opens the database session for each draft.
+        backend: Search backend used to reindex written versions.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], backend: SearchBackend):
+        self.session_factory = session_factory
+        self.backend = backend
+        self.flushed = 0
+        self.versions_created = 0
+        self.failures = 0
+        self.dropped = 0
+        self._task: asyncio.Task | None = None
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "flushed": self.flushed,
+            "versions_created": self.versions_created,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+    async def flush_idle(self, *, idle_seconds: float | None = None) -> int:
+        """Write up to ``DRAFT_FLUSH_BATCH_SIZE`` drafts idle for ``idle_seconds``.
+
+        Returns the number written.
+        """
+        idle = settings.DRAFT_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        repo = DraftRepository(redis_module.get_redis())
+        flushed = 0
+        for key in await repo.list_idle(time.time() - idle, settings.DRAFT_FLUSH_BATCH_SIZE):
+            if await repo.claim(key) and await self._flush(repo, key):
+                flushed += 1
+        return flushed
+
+    async def _flush(self, repo: DraftRepository, key: DraftKey) -> bool:
+        draft = await repo.get(key)
+        if draft is None:
+            return False  # discarded or expired
+        try:
+            async with self.session_factory() as session:
+                if not await has_role(
+                    session,
+                    key.user_id,
+                    key.org_id,
+                    RoleEnum.owner,
+                    RoleEnum.admin,
+                    RoleEnum.member,
+                ):
+                    raise ForbiddenException("The author can no longer edit documents")
+                service = DraftService(
+                    repo,
+                    DocumentRepository(session),
+                    DocumentVersionService(
+                        DocumentVersionRepository(session),
+                        DocumentRepository(session),
+                        SearchRepository(session, self.backend),
+                        session,
+                    ),
+                )
+                _, created = await service.write_version(key, draft)
+                await commit(session)
+        except NotFoundException:
+            await repo.delete(key)
+            return False
+        except ForbiddenException:
+            self.dropped += 1
+            logger.info("Dropped draft %s: its author can no longer edit", key.member)
+            await repo.delete(key)
+            return False
+        except Exception:
+            self.failures += 1
+            logger.exception("Could not flush draft %s", key.member)
+            await repo.requeue(key, draft["saved_at"])
+            return False
+        await repo.delete_if_unchanged(key, draft["saved_at"])
+        self.flushed += 1
+        self.versions_created += created
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DRAFT_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush_idle()
+            except (RedisError, OSError) as exc:
+                logger.warning("Draft flush skipped: Redis unavailable (%s)", exc)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task. Pending drafts stay in Redis for other workers."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+draft_flusher = DraftFlusher(async_session_factory, search_backend)
+register_metrics("draft_flusher", draft_flusher.metrics)
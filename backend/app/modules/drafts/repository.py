@@ -0,0 +1,96 @@
+import time
+from typing import NamedTuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+# Sorted set of every pending draft, scored by the time of its last save.
+PENDING_KEY = "drafts:pending"
+
+
+class DraftKey(NamedTuple):
+    """Identifies a draft: one per user and document."""
+
+    org_id: UUID
+    document_id: UUID
+    user_id: UUID
+
+    @property
+    def member(self) -> str:
+        return f"{self.org_id}:{self.document_id}:{self.user_id}"
+
+    @property
+    def redis_key(self) -> str:
+        return f"draft:{self.member}"
+
+    @classmethod
+    def parse(cls, member: str) -> "DraftKey":
+        org_id, document_id, user_id = member.split(":")
+        return cls(UUID(org_id), UUID(document_id), UUID(user_id))
+
+
+class DraftRepository:
+    """Handles draft storage in Redis.
+
+    Each draft is a hash of ``title``, ``content``, ``saved_at`` (Unix time)
+    and ``saves``, and is listed in :data:`PENDING_KEY` until it is written
+    as a version.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def save(self, key: DraftKey, title: str, content: str, *, ttl: int) -> dict:
+        """Replace the draft's title and content and mark it pending."""
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key.redis_key, mapping={"title": title, "content": content, "saved_at": now})
+            pipe.hincrby(key.redis_key, "saves", 1)
+            pipe.expire(key.redis_key, ttl)
+            pipe.zadd(PENDING_KEY, {key.member: now})
+            _, saves, _, _ = await pipe.execute()
+        return {"title": title, "content": content, "saved_at": now, "saves": saves}
+
+    async def get(self, key: DraftKey) -> dict | None:
+        """Fetch a draft, or ``None`` if there is none."""
+        draft = await self.redis.hgetall(key.redis_key)
+        if not draft:
+            return None
+        return {**draft, "saved_at": float(draft["saved_at"]), "saves": int(draft["saves"])}
+
+    async def delete(self, key: DraftKey) -> bool:
+        """Delete a draft. Returns whether there was one."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key.redis_key)
+            pipe.zrem(PENDING_KEY, key.member)
+            deleted, _ = await pipe.execute()
+        return bool(deleted)
+
+    async def delete_if_unchanged(self, key: DraftKey, saved_at: float) -> bool:
+        """Delete a draft unless it was saved again after ``saved_at``."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key.redis_key)
+                current = await pipe.hget(key.redis_key, "saved_at")
+                if current is None or float(current) != saved_at:
+                    return False
+                pipe.multi()
+                pipe.delete(key.redis_key)
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    async def list_idle(self, before: float, limit: int) -> list[DraftKey]:
+        """List pending drafts last saved before ``before``, oldest first."""
+        members = await self.redis.zrangebyscore(PENDING_KEY, "-inf", before, start=0, num=limit)
+        return [DraftKey.parse(member) for member in members]
+
+    async def claim(self, key: DraftKey) -> bool:
+        """Take a draft off the pending set. Only one caller can claim it."""
+        return bool(await self.redis.zrem(PENDING_KEY, key.member))
+
+    async def requeue(self, key: DraftKey, saved_at: float) -> None:
+        """Put a claimed draft back on the pending set, unless it was saved since."""
+        await self.redis.zadd(PENDING_KEY, {key.member: saved_at}, nx=True)
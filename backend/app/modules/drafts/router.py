@@ -0,0 +1,101 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Response
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.redis import get_redis
+from app.dependencies import get_current_org_id, get_tenant_user, require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionRead
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.repository import DocumentRepository
+from app.modules.drafts.repository import DraftRepository
+from app.modules.drafts.schemas import DraftRead, DraftSave
+from app.modules.drafts.service import DraftService
+from app.modules.memberships.models import RoleEnum
+from app.modules.search.dependencies import get_search_repository
+from app.modules.search.repository import SearchRepository
+from app.modules.users.models import User
+
+router = APIRouter(
+    prefix="/organizations/{org_id}/documents/{document_id}/draft",
+    tags=["Drafts"],
+    route_class=AuditedRoute,
+)
+
+
+def _get_service(
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    search_repo: SearchRepository = Depends(get_search_repository),
+) -> DraftService:
+    return DraftService(
+        DraftRepository(redis),
+        DocumentRepository(db),
+        DocumentVersionService(
+            DocumentVersionRepository(db), DocumentRepository(db), search_repo, db
+        ),
+    )
+
+
+@router.put("", response_model=DraftRead)
+async def save_draft(
+    document_id: UUID,
+    data: DraftSave,
+    org_id: UUID = Depends(get_current_org_id),
+    current_user: User = Depends(get_tenant_user),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin, RoleEnum.member)),
+    service: DraftService = Depends(_get_service),
+):
+    """Autosave: replace your draft of the document.
+
+    The draft becomes a version once it has been idle for a while, or
+    when committed.
+    """
+    return await service.save_draft(document_id, org_id, current_user.id, data)
+
+
+@router.get("", response_model=DraftRead)
+async def get_draft(
+    document_id: UUID,
+    org_id: UUID = Depends(get_current_org_id),
+    current_user: User = Depends(get_tenant_user),
+    service: DraftService = Depends(_get_service),
+):
+    """Get your pending draft of the document."""
+    return await service.get_draft(document_id, org_id, current_user.id)
+
+
+@router.delete("", status_code=204)
+@audited("draft.discarded", "document", resource_id="document_id")
+async def discard_draft(
+    document_id: UUID,
+    org_id: UUID = Depends(get_current_org_id),
+    current_user: User = Depends(get_tenant_user),
+    service: DraftService = Depends(_get_service),
+):
+    """Discard your pending draft without creating a version."""
+    await service.discard_draft(document_id, org_id, current_user.id)
+
+
+@router.post("/commit", response_model=DocumentVersionRead, status_code=201)
+@audited("draft.committed", "document_version", details=("document_id", "version_number"))
+async def commit_draft(
+    document_id: UUID,
+    response: Response,
+    org_id: UUID = Depends(get_current_org_id),
+    current_user: User = Depends(get_tenant_user),
+    _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin, RoleEnum.member)),
+    service: DraftService = Depends(_get_service),
+):
+    """Write your pending draft as a version now.
+
+    Responds 200 with the current version if the draft did not change it.
+    """
+    version, created = await service.commit_draft(document_id, org_id, current_user.id)
+    if not created:
+        response.status_code = 200
+    return version
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, StringConstraints
+
+
+class DraftSave(BaseModel):
+    """Schema for an autosave of the document being edited."""
+
+    title: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=500)]
+    content: str
+
+
+class DraftRead(BaseModel):
+    """Schema for the caller's pending draft of a document.
+
+    ``saves`` counts the autosaves coalesced into the draft since it was
+    last written as a version.
+    """
+
+    title: str
+    content: str
+    saved_at: datetime
+    saves: int
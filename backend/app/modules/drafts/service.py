@@ -0,0 +1,115 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundException
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.repository import DocumentRepository
+from app.modules.drafts.repository import DraftKey, DraftRepository
+from app.modules.drafts.schemas import DraftRead, DraftSave
+
+
+def _to_read(draft: dict) -> DraftRead:
+    return DraftRead(
+        title=draft["title"],
+        content=draft["content"],
+        saved_at=datetime.fromtimestamp(draft["saved_at"], UTC),
+        saves=draft["saves"],
+    )
+
+
+class DraftService:
+    """Business logic for autosave drafts.
+
+    Autosaves only replace the caller's draft in Redis. A draft becomes a
+    version when its editor commits it or once it has been idle for
+    ``DRAFT_IDLE_SECONDS`` (see :mod:`app.modules.drafts.flusher`), so a
+    burst of autosaves costs one version instead of one each.
+    """
+
+    def __init__(
+        self,
+        repo: DraftRepository,
+        document_repo: DocumentRepository,
+        version_service: DocumentVersionService,
+    ):
+        self.repo = repo
+        self.document_repo = document_repo
+        self.version_service = version_service
+
+    async def save_draft(
+        self, document_id: UUID, org_id: UUID, user_id: UUID, data: DraftSave
+    ) -> DraftRead:
+        """Replace the caller's draft of a document.
+
+        Raises:
+            NotFoundException: If the document does not exist.
+        """
+        if not await self.document_repo.get_by_id(document_id, org_id):
+            raise NotFoundException("Document not found")
+        draft = await self.repo.save(
+            DraftKey(org_id, document_id, user_id),
+            data.title,
+            data.content,
+            ttl=settings.DRAFT_TTL_SECONDS,
+        )
+        return _to_read(draft)
+
+    async def get_draft(self, document_id: UUID, org_id: UUID, user_id: UUID) -> DraftRead:
+        """Get the caller's pending draft of a document.
+
+        Raises:
+            NotFoundException: If there is no pending draft.
+        """
+        draft = await self.repo.get(DraftKey(org_id, document_id, user_id))
+        if draft is None:
+            raise NotFoundException("Draft not found")
+        return _to_read(draft)
+
+    async def discard_draft(self, document_id: UUID, org_id: UUID, user_id: UUID) -> None:
+        """Drop the caller's draft without writing a version.
+
+        Raises:
+            NotFoundException: If there is no pending draft.
+        """
+        if not await self.repo.delete(DraftKey(org_id, document_id, user_id)):
+            raise NotFoundException("Draft not found")
+
+    async def commit_draft(
+        self, document_id: UUID, org_id: UUID, user_id: UUID
+    ) -> tuple[DocumentVersion, bool]:
+        """Write the caller's draft as a version now.
+
+        Returns the version and whether it was created; a draft equal to
+        the current version creates none.
+
+        Raises:
+            NotFoundException: If there is no pending draft.
+        """
+        key = DraftKey(org_id, document_id, user_id)
+        draft = await self.repo.get(key)
+        if draft is None:
+            raise NotFoundException("Draft not found")
+        await self.repo.claim(key)
+        try:
+            result = await self.write_version(key, draft)
+        except Exception:
+            await self.repo.requeue(key, draft["saved_at"])
+            raise
+        # Deleted before the request commits: if the commit fails, the client
+        # gets an error and still has the content to save again.
+        await self.repo.delete_if_unchanged(key, draft["saved_at"])
+        return result
+
+    async def write_version(self, key: DraftKey, draft: dict) -> tuple[DocumentVersion, bool]:
+        """Create a version of the document from a draft, unless nothing changed."""
+        return await self.version_service.create_version(
+            key.document_id,
+            key.org_id,
+            key.user_id,
+            DocumentVersionCreate(
+                title=draft["title"], content=draft["content"], skip_unchanged=True
+            ),
+        )
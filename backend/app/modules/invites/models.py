@@ -3,7 +3,7 @@ from uuid import UUID
 
 from sqlmodel import Column, Enum, Field
 
-from app.models.base import BaseDBModel
+from app.models.base import BaseDBModel, keyset_index
 
 
 class InviteStatus(enum.StrEnum):
@@ -31,6 +31,7 @@ class Invite(BaseDBModel, table=True):
     """
 
     __tablename__ = "invites"
+    __table_args__ = (keyset_index("invites", "organization_id"),)
 
     email: str = Field(max_length=255, nullable=False, index=True)
     token: str = Field(unique=True, nullable=False, index=True, max_length=255)
@@ -38,5 +39,5 @@ class Invite(BaseDBModel, table=True):
     status: InviteStatus = Field(
         sa_column=Column(Enum(InviteStatus), nullable=False, default=InviteStatus.pending)
     )
-    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
     invited_by: UUID = Field(foreign_key="users.id", nullable=False)
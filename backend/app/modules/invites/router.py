@@ -5,7 +5,8 @@ from fastapi_pagination.cursor import CursorPage, CursorParams
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import get_current_org_id, get_current_user, require_role
+from app.dependencies import get_current_org_id, get_current_user, get_tenant_user, require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.invites.repository import InviteRepository
 from app.modules.invites.schemas import InviteAccept, InviteCreate, InviteRead
 from app.modules.invites.service import InviteService
@@ -15,7 +16,7 @@ from app.modules.memberships.schemas import MembershipRead
 from app.modules.users.models import User
 from app.modules.users.repository import UserRepository
 
-router = APIRouter(tags=["Invites"])
+router = APIRouter(tags=["Invites"], route_class=AuditedRoute)
 
 
 def _get_service(db: AsyncSession = Depends(get_db)) -> InviteService:
@@ -46,10 +47,11 @@ async def list_invites(
     response_model=InviteRead,
     status_code=201,
 )
+@audited("invite.created", "invite", details=("email", "role"))
 async def create_invite(
     data: InviteCreate,
     org_id: UUID = Depends(get_current_org_id),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_tenant_user),
     _role: None = Depends(require_role(RoleEnum.owner, RoleEnum.admin)),
     service: InviteService = Depends(_get_service),
 ):
@@ -61,6 +63,7 @@ async def create_invite(
     "/organizations/{org_id}/invites/{invite_id}",
     response_model=InviteRead,
 )
+@audited("invite.revoked", "invite", resource_id="invite_id")
 async def revoke_invite(
     invite_id: UUID,
     org_id: UUID = Depends(get_current_org_id),
@@ -72,6 +75,7 @@ async def revoke_invite(
 
 
 @router.post("/invites/accept", response_model=MembershipRead)
+@audited("invite.accepted", "membership", org_id="organization_id")
 async def accept_invite(
     data: InviteAccept,
     current_user: User = Depends(get_current_user),
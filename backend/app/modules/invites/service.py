@@ -2,9 +2,10 @@ import secrets
 from uuid import UUID
 
 from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate
 
 from app.core.exceptions import BadRequestException, ConflictException, NotFoundException
+from app.modules.auth.cache import invalidate_membership
 from app.modules.invites.models import Invite, InviteStatus
 from app.modules.invites.repository import InviteRepository
 from app.modules.invites.schemas import InviteCreate
@@ -81,6 +82,7 @@ class InviteService:
             role=role,
         )
         membership = await self.membership_repo.create(membership)
+        await invalidate_membership(user_id, invite.organization_id, self.db)
 
         # Mark invite as accepted
         invite.status = InviteStatus.accepted
@@ -108,4 +110,4 @@ class InviteService:
     async def list_invites(self, org_id: UUID, params: CursorParams):
         """List all invites for an organization (cursor-paginated)."""
         query = self.invite_repo.get_org_invites_query(org_id)
-        return await paginate(self.db, query, params)
+        return await apaginate(self.db, query, params)
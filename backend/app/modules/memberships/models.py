@@ -3,7 +3,7 @@ from uuid import UUID
 
 from sqlmodel import Column, Enum, Field
 
-from app.models.base import BaseDBModel
+from app.models.base import BaseDBModel, keyset_index
 
 
 class RoleEnum(enum.StrEnum):
@@ -28,9 +28,10 @@ class Membership(BaseDBModel, table=True):
     """
 
     __tablename__ = "memberships"
+    __table_args__ = (keyset_index("memberships", "organization_id"),)
 
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
-    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
     role: RoleEnum = Field(
         sa_column=Column(Enum(RoleEnum), nullable=False, default=RoleEnum.member)
     )
@@ -6,12 +6,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.dependencies import require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.memberships.models import RoleEnum
 from app.modules.memberships.repository import MembershipRepository
 from app.modules.memberships.schemas import MembershipCreate, MembershipRead, MembershipUpdate
 from app.modules.memberships.service import MembershipService
 
-router = APIRouter(prefix="/organizations/{org_id}/members", tags=["Memberships"])
+router = APIRouter(
+    prefix="/organizations/{org_id}/members", tags=["Memberships"], route_class=AuditedRoute
+)
 
 
 def _get_service(db: AsyncSession = Depends(get_db)) -> MembershipService:
@@ -30,6 +33,7 @@ async def list_members(
 
 
 @router.post("", response_model=MembershipRead, status_code=201)
+@audited("member.added", "membership", details=("user_id", "role"))
 async def add_member(
     org_id: UUID,
     data: MembershipCreate,
@@ -41,6 +45,9 @@ async def add_member(
 
 
 @router.patch("/{membership_id}", response_model=MembershipRead)
+@audited(
+    "member.role_changed", "membership", resource_id="membership_id", details=("user_id", "role")
+)
 async def update_member_role(
     org_id: UUID,
     membership_id: UUID,
@@ -53,6 +60,7 @@ async def update_member_role(
 
 
 @router.delete("/{membership_id}", status_code=204)
+@audited("member.removed", "membership", resource_id="membership_id")
 async def remove_member(
     org_id: UUID,
     membership_id: UUID,
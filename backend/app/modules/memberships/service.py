@@ -1,9 +1,10 @@
 from uuid import UUID
 
 from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate
 
 from app.core.exceptions import ConflictException, ForbiddenException, NotFoundException
+from app.modules.auth.cache import invalidate_membership
 from app.modules.memberships.models import Membership, RoleEnum
 from app.modules.memberships.repository import MembershipRepository
 from app.modules.memberships.schemas import MembershipCreate, MembershipUpdate
@@ -54,7 +55,9 @@ class MembershipService:
                 raise ForbiddenException("Cannot change role of the last owner")
 
         membership.role = data.role
-        return await self.repo.update(membership)
+        membership = await self.repo.update(membership)
+        await invalidate_membership(membership.user_id, org_id, self.db)
+        return membership
 
     async def remove_member(self, org_id: UUID, membership_id: UUID) -> None:
         """Remove a member from an organization.
@@ -74,8 +77,9 @@ class MembershipService:
                 raise ForbiddenException("Cannot remove the last owner")
 
         await self.repo.delete(membership)
+        await invalidate_membership(membership.user_id, org_id, self.db)
 
     async def list_members(self, org_id: UUID, params: CursorParams):
         """List all members of an organization (cursor-paginated)."""
         query = self.repo.get_org_members_query(org_id)
-        return await paginate(self.db, query, params)
+        return await apaginate(self.db, query, params)
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.dependencies import get_current_user, require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.memberships.models import RoleEnum
 from app.modules.organizations.repository import OrganizationRepository
 from app.modules.organizations.schemas import (
@@ -16,7 +17,7 @@ from app.modules.organizations.schemas import (
 from app.modules.organizations.service import OrganizationService
 from app.modules.users.models import User
 
-router = APIRouter(prefix="/organizations", tags=["Organizations"])
+router = APIRouter(prefix="/organizations", tags=["Organizations"], route_class=AuditedRoute)
 
 
 def _get_service(db: AsyncSession = Depends(get_db)) -> OrganizationService:
@@ -24,6 +25,7 @@ def _get_service(db: AsyncSession = Depends(get_db)) -> OrganizationService:
 
 
 @router.post("", response_model=OrganizationRead, status_code=201)
+@audited("organization.created", "organization", org_id="id")
 async def create_organization(
     data: OrganizationCreate,
     current_user: User = Depends(get_current_user),
@@ -54,6 +56,7 @@ async def get_organization(
 
 
 @router.patch("/{org_id}", response_model=OrganizationRead)
+@audited("organization.updated", "organization", resource_id="org_id")
 async def update_organization(
     org_id: UUID,
     data: OrganizationUpdate,
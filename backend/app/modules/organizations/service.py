@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate
 from slugify import slugify
 
 from app.core.exceptions import NotFoundException
@@ -84,4 +84,4 @@ class OrganizationService:
     async def list_user_organizations(self, user_id: UUID, params: CursorParams):
         """List all organizations a user belongs to (cursor-paginated)."""
         query = self.repo.get_user_organizations_query(user_id)
-        return await paginate(self.db, query, params)
+        return await apaginate(self.db, query, params)
@@ -0,0 +1,33 @@
+"""Search backends, selected from the database URL."""
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.modules.search.backends.base import SearchBackend
+from app.modules.search.backends.postgres import PostgresSearchBackend
+from app.modules.search.backends.sqlite import SQLiteSearchBackend
+
+__all__ = [
+    "PostgresSearchBackend",
+    "SQLiteSearchBackend",
+    "SearchBackend",
+    "create_search_backend",
+    "search_backend",
+]
+
+
+def create_search_backend(database_url: str) -> SearchBackend:
+    """Return the search backend for a database URL.
+
+    Raises:
+        ValueError: If the database has no search backend.
+    """
+    backend = make_url(database_url).get_backend_name()
+    if backend == "postgresql":
+        return PostgresSearchBackend()
+    if backend == "sqlite":
+        return SQLiteSearchBackend()
+    raise ValueError(f"No search backend for database '{backend}'")
+
+
+search_backend = create_search_backend(settings.DATABASE_URL)
@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.modules.documents.models import DocumentStatus
+
+# Backends delimit the matches in snippets with these private-use characters
+# rather than with markup, so the document text around them can be escaped
+# as HTML before they are turned into ``<mark>`` tags; see the search service.
+SNIPPET_START = "\ue000"
+SNIPPET_STOP = "\ue001"
+SNIPPET_MAX_WORDS = 35
+
+
+class SearchBackend(ABC):
+    """Database-specific storage and querying of the document search index.
+
+    Only the current version of each document is indexed, under the
+    document's title and that version's content, with title terms ranked
+    above content terms. ``search`` returns rows with the fields of
+    :class:`~app.modules.search.schemas.SearchHit`, best match first.
+    """
+
+    async def ensure_schema(self, engine: AsyncEngine) -> None:
+        """Create index structures that ``SQLModel.metadata`` does not manage."""
+        return None
+
+    @abstractmethod
+    async def index_current_version(
+        self,
+        db: AsyncSession,
+        version_id: UUID,
+        previous_version_id: UUID | None,
+        title: str,
+    ) -> None:
+        """Index a document's new current version and drop the previous one."""
+
+    @abstractmethod
+    async def remove(self, db: AsyncSession, version_id: UUID, title: str) -> None:
+        """Drop an indexed version, before it is deleted."""
+
+    @abstractmethod
+    async def reindex_title(
+        self, db: AsyncSession, version_id: UUID, title: str, previous_title: str
+    ) -> None:
+        """Replace the title terms of an indexed version after a rename."""
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        org_id: UUID,
+        text: str,
+        *,
+        workspace_id: UUID | None = None,
+        status: DocumentStatus | None = None,
+        after: tuple[float, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Row]:
+        """Return up to ``limit`` hits ordered by ``(rank, document_id)`` descending.
+
+        ``after`` is the ``(rank, document_id)`` of the last hit of the
+        previous page.
+        """
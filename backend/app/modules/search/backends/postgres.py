@@ -0,0 +1,137 @@
+from uuid import UUID
+
+from sqlalchemy import Float, Row, case, func, literal_column, null, select, true, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.documents.models import Document, DocumentStatus
+from app.modules.search.backends.base import (
+    SNIPPET_MAX_WORDS,
+    SNIPPET_START,
+    SNIPPET_STOP,
+    SearchBackend,
+)
+
+versions = DocumentVersion.__table__
+documents = Document.__table__
+
+HEADLINE_OPTIONS = (
+    f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords={SNIPPET_MAX_WORDS}, MinWords=15"
+)
+
+
+def _title_vector(title):
+    return func.setweight(
+        func.to_tsvector(settings.SEARCH_TEXT_CONFIG, title), literal_column("'A'")
+    )
+
+
+def _content_vector(content):
+    return func.setweight(
+        func.to_tsvector(settings.SEARCH_TEXT_CONFIG, func.coalesce(content, "")),
+        literal_column("'B'"),
+    )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Search over the ``document_versions.search_vector`` tsvector column.
+
+    Title terms are weighted ``A`` and content terms ``B``; hits are ranked
+    with ``ts_rank_cd`` and the column has a partial GIN index. Maintenance
+    writes leave ``updated_at`` untouched: versions are immutable snapshots
+    and re-indexing is not an edit.
+    """
+
+    async def index_current_version(
+        self,
+        db: AsyncSession,
+        version_id: UUID,
+        previous_version_id: UUID | None,
+        title: str,
+    ) -> None:
+        # Both rows are written by a single UPDATE; the content is read
+        # server-side so it is not sent over the wire a second time.
+        vector = _title_vector(title).op("||")(_content_vector(versions.c.content))
+        ids = [version_id] if previous_version_id is None else [version_id, previous_version_id]
+        await db.execute(
+            update(versions)
+            .where(versions.c.id.in_(ids))
+            .values(
+                search_vector=case((versions.c.id == version_id, vector), else_=null()),
+                updated_at=versions.c.updated_at,
+            )
+        )
+
+    async def remove(self, db: AsyncSession, version_id: UUID, title: str) -> None:
+        # The vector is stored on the version row and goes away with it.
+        return None
+
+    async def reindex_title(
+        self, db: AsyncSession, version_id: UUID, title: str, previous_title: str
+    ) -> None:
+        # Content terms are kept with ts_filter rather than re-parsing the content.
+        content_terms = func.ts_filter(versions.c.search_vector, literal_column("'{b}'"))
+        await db.execute(
+            update(versions)
+            .where(versions.c.id == version_id, versions.c.search_vector.is_not(None))
+            .values(
+                search_vector=_title_vector(title).op("||")(content_terms),
+                updated_at=versions.c.updated_at,
+            )
+        )
+
+    async def search(
+        self,
+        db: AsyncSession,
+        org_id: UUID,
+        text: str,
+        *,
+        workspace_id: UUID | None = None,
+        status: DocumentStatus | None = None,
+        after: tuple[float, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Row]:
+        query = (
+            select(func.websearch_to_tsquery(settings.SEARCH_TEXT_CONFIG, text).label("q"))
+        ).subquery("query")
+        rank = func.ts_rank_cd(versions.c.search_vector, query.c.q, type_=Float)
+
+        page = (
+            select(
+                documents.c.id.label("document_id"),
+                versions.c.id.label("version_id"),
+                documents.c.workspace_id,
+                documents.c.title,
+                documents.c.status,
+                documents.c.updated_at,
+                rank.label("rank"),
+            )
+            .select_from(versions)
+            .join(documents, documents.c.current_version_id == versions.c.id)
+            .join(query, true())
+            .where(
+                versions.c.organization_id == org_id,
+                versions.c.search_vector.op("@@")(query.c.q),
+            )
+        )
+        if workspace_id:
+            page = page.where(documents.c.workspace_id == workspace_id)
+        if status:
+            page = page.where(documents.c.status == status)
+        if after:
+            page = page.where(tuple_(rank, documents.c.id) < tuple_(*after))
+        page = page.order_by(rank.desc(), documents.c.id.desc()).limit(limit).subquery("page")
+
+        # Headlines re-parse the content, so they are only built for this page.
+        snippet = func.ts_headline(
+            settings.SEARCH_TEXT_CONFIG, versions.c.content, query.c.q, HEADLINE_OPTIONS
+        )
+        result = await db.execute(
+            select(page, snippet.label("snippet"))
+            .select_from(page)
+            .join(versions, versions.c.id == page.c.version_id)
+            .join(query, true())
+            .order_by(page.c.rank.desc(), page.c.document_id.desc())
+        )
+        return list(result.all())
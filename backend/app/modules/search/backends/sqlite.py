@@ -0,0 +1,227 @@
+import re
+from uuid import UUID
+
+from sqlalchemy import (
+    Float,
+    Row,
+    column,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy import text as sql_text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.documents.models import Document, DocumentStatus
+from app.modules.search.backends.base import (
+    SNIPPET_MAX_WORDS,
+    SNIPPET_START,
+    SNIPPET_STOP,
+    SearchBackend,
+)
+
+versions = DocumentVersion.__table__
+documents = Document.__table__
+
+# FTS5 table and the view it uses as external content: one row per current version.
+fts = table(
+    "document_search",
+    column("rowid"),
+    column("title"),
+    column("content"),
+    column("document_search"),  # hidden column used for FTS5 commands and MATCH
+)
+fts_command = literal_column("document_search")
+version_rowid = literal_column("document_versions.rowid")
+
+CONTENT_VIEW_DDL = """
+CREATE VIEW IF NOT EXISTS document_search_content AS
+SELECT v.rowid AS version_rowid, d.title AS title, v.content AS content
+FROM document_versions AS v
+JOIN documents AS d ON d.id = v.document_id
+WHERE d.current_version_id = v.id
+"""
+
+FTS_TABLE_DDL = """
+CREATE VIRTUAL TABLE document_search USING fts5(
+    title,
+    content,
+    content='document_search_content',
+    content_rowid='version_rowid',
+    tokenize='porter unicode61'
+)
+"""
+
+# bm25 column weights: (title, content).
+TITLE_WEIGHT = 2.5
+CONTENT_WEIGHT = 1.0
+
+_TERM = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+def to_fts5_query(text: str) -> str | None:
+    """Translate web-search syntax into an FTS5 query expression.
+
+    Mirrors PostgreSQL's ``websearch_to_tsquery``: words are ANDed,
+    ``"quoted text"`` is a phrase, ``or`` joins alternatives and a leading
+    ``-`` excludes a term. Every term is quoted, so user input can never
+    be parsed as FTS5 syntax. Returns ``None`` if nothing is left to match.
+    """
+    groups: list[list[str]] = []
+    excluded: list[str] = []
+    alternative = False
+    for match in _TERM.finditer(text):
+        negated, phrase, word = match.groups()
+        if word is not None:
+            if word.lower() == "or":
+                alternative = bool(groups)
+                continue
+            if word.startswith("-"):
+                negated, word = "-", word[1:]
+        tokens = _WORD.findall(phrase if phrase is not None else word)
+        if not tokens:
+            continue
+        term = '"' + " ".join(tokens) + '"'
+        if negated:
+            excluded.append(term)
+        elif alternative:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        alternative = False
+
+    if not groups:
+        return None
+    expression = " AND ".join(
+        f"({' OR '.join(group)})" if len(group) > 1 else group[0] for group in groups
+    )
+    for term in excluded:
+        expression = f"({expression}) NOT {term}"
+    return expression
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Search over an FTS5 external-content table.
+
+    ``document_search`` indexes the ``document_search_content`` view
+    (the current version of each document, under the document's title)
+    without storing a second copy of the text. Hits are ranked with
+    ``bm25`` and snippets come from FTS5's ``snippet()``.
+
+    External-content tables are not updated automatically: an entry is
+    removed by replaying the exact values it was indexed with, which is
+    why ``reindex_title`` needs the previous title.
+    """
+
+    async def ensure_schema(self, engine: AsyncEngine) -> None:
+        async with engine.begin() as conn:
+            exists = await conn.scalar(
+                sql_text("SELECT 1 FROM sqlite_master WHERE name = 'document_search'")
+            )
+            await conn.execute(sql_text(CONTENT_VIEW_DDL))
+            if not exists:
+                await conn.execute(sql_text(FTS_TABLE_DDL))
+                await conn.execute(
+                    sql_text("INSERT INTO document_search(document_search) VALUES ('rebuild')")
+                )
+
+    async def index_current_version(
+        self,
+        db: AsyncSession,
+        version_id: UUID,
+        previous_version_id: UUID | None,
+        title: str,
+    ) -> None:
+        if previous_version_id is not None:
+            await self._delete(db, previous_version_id, title)
+        await self._insert(db, version_id, title)
+
+    async def remove(self, db: AsyncSession, version_id: UUID, title: str) -> None:
+        await self._delete(db, version_id, title)
+
+    async def reindex_title(
+        self, db: AsyncSession, version_id: UUID, title: str, previous_title: str
+    ) -> None:
+        await self._delete(db, version_id, previous_title)
+        await self._insert(db, version_id, title)
+
+    async def _insert(self, db: AsyncSession, version_id: UUID, title: str) -> None:
+        await db.execute(
+            insert(fts).from_select(
+                ["rowid", "title", "content"],
+                select(version_rowid, literal(title), versions.c.content).where(
+                    versions.c.id == version_id
+                ),
+            )
+        )
+
+    async def _delete(self, db: AsyncSession, version_id: UUID, title: str) -> None:
+        await db.execute(
+            insert(fts).from_select(
+                ["document_search", "rowid", "title", "content"],
+                select(literal("delete"), version_rowid, literal(title), versions.c.content).where(
+                    versions.c.id == version_id
+                ),
+            )
+        )
+
+    async def search(
+        self,
+        db: AsyncSession,
+        org_id: UUID,
+        text: str,
+        *,
+        workspace_id: UUID | None = None,
+        status: DocumentStatus | None = None,
+        after: tuple[float, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Row]:
+        query = to_fts5_query(text)
+        if query is None:
+            return []
+
+        matches = fts_command.op("MATCH")(query)
+        # bm25 is lower-is-better; negate it so rank sorts like ts_rank_cd.
+        rank = -func.bm25(fts_command, TITLE_WEIGHT, CONTENT_WEIGHT, type_=Float)
+
+        page = (
+            select(
+                documents.c.id.label("document_id"),
+                versions.c.id.label("version_id"),
+                documents.c.workspace_id,
+                documents.c.title,
+                documents.c.status,
+                documents.c.updated_at,
+                rank.label("rank"),
+                fts.c.rowid.label("search_rowid"),
+            )
+            .select_from(fts)
+            .join(versions, version_rowid == fts.c.rowid)
+            .join(documents, documents.c.current_version_id == versions.c.id)
+            .where(matches, versions.c.organization_id == org_id)
+        )
+        if workspace_id:
+            page = page.where(documents.c.workspace_id == workspace_id)
+        if status:
+            page = page.where(documents.c.status == status)
+        if after:
+            page = page.where(tuple_(rank, documents.c.id) < tuple_(*after))
+        page = page.order_by(rank.desc(), documents.c.id.desc()).limit(limit).subquery("page")
+
+        # snippet() only works inside a full-text query, so the page is
+        # matched again by rowid to build snippets for just these rows.
+        snippet = func.snippet(fts_command, 1, SNIPPET_START, SNIPPET_STOP, "…", SNIPPET_MAX_WORDS)
+        result = await db.execute(
+            select(page, snippet.label("snippet"))
+            .select_from(page)
+            .join(fts, fts.c.rowid == page.c.search_rowid)
+            .where(matches)
+            .order_by(page.c.rank.desc(), page.c.document_id.desc())
+        )
+        return list(result.all())
@@ -0,0 +1,23 @@
+"""
+Search-specific dependencies.
+"""
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.modules.search.backends import SearchBackend, search_backend
+from app.modules.search.repository import SearchRepository
+
+
+def get_search_backend() -> SearchBackend:
+    """Dependency: the search backend for ``settings.DATABASE_URL``."""
+    return search_backend
+
+
+def get_search_repository(
+    db: AsyncSession = Depends(get_db),
+    backend: SearchBackend = Depends(get_search_backend),
+) -> SearchRepository:
+    """Dependency: a SearchRepository bound to the request session."""
+    return SearchRepository(db, backend)
@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.documents.models import DocumentStatus
+from app.modules.search.backends import SearchBackend
+
+
+class SearchRepository:
+    """Maintains and queries the document search index through a backend."""
+
+    def __init__(self, db: AsyncSession, backend: SearchBackend):
+        self.db = db
+        self.backend = backend
+
+    async def index_current_version(
+        self, version_id: UUID, previous_version_id: UUID | None, title: str
+    ) -> None:
+        """Index a document's new current version and drop the previous one."""
+        await self.backend.index_current_version(self.db, version_id, previous_version_id, title)
+
+    async def remove(self, version_id: UUID, title: str) -> None:
+        """Drop an indexed version, before it is deleted."""
+        await self.backend.remove(self.db, version_id, title)
+
+    async def reindex_title(self, version_id: UUID, title: str, previous_title: str) -> None:
+        """Replace the title terms of an indexed version after a rename."""
+        await self.backend.reindex_title(self.db, version_id, title, previous_title)
+
+    async def search(
+        self,
+        org_id: UUID,
+        text: str,
+        *,
+        workspace_id: UUID | None = None,
+        status: DocumentStatus | None = None,
+        after: tuple[float, UUID] | None = None,
+        limit: int = 20,
+    ) -> list[Row]:
+        """Return up to ``limit`` matching documents ordered by rank."""
+        return await self.backend.search(
+            self.db,
+            org_id,
+            text,
+            workspace_id=workspace_id,
+            status=status,
+            after=after,
+            limit=limit,
+        )
@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import get_current_org_id
+from app.modules.documents.models import DocumentStatus
+from app.modules.search.dependencies import get_search_repository
+from app.modules.search.repository import SearchRepository
+from app.modules.search.schemas import SearchPage
+from app.modules.search.service import SearchService
+
+router = APIRouter(
+    prefix="/organizations/{org_id}/search",
+    tags=["Search"],
+)
+
+
+def _get_service(
+    search_repo: SearchRepository = Depends(get_search_repository),
+) -> SearchService:
+    return SearchService(search_repo)
+
+
+@router.get("", response_model=SearchPage)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=256, description="Search terms"),
+    workspace_id: UUID | None = Query(None, description="Filter by workspace"),
+    status: DocumentStatus | None = Query(None, description="Filter by document status"),
+    cursor: str | None = Query(None, description="`next_page` of the previous page"),
+    size: int = Query(20, ge=1, le=100),
+    org_id: UUID = Depends(get_current_org_id),
+    service: SearchService = Depends(_get_service),
+):
+    """Full-text search over document titles and current content."""
+    return await service.search(
+        org_id, q, workspace_id=workspace_id, status=status, cursor=cursor, size=size
+    )
@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.modules.documents.models import DocumentStatus
+
+
+class SearchHit(BaseModel):
+    """A document matching a search query.
+
+    ``snippet`` is HTML: an excerpt of the content, escaped, with each
+    match in ``<mark>`` tags.
+    """
+
+    document_id: UUID
+    version_id: UUID
+    workspace_id: UUID
+    title: str
+    status: DocumentStatus
+    snippet: str
+    rank: float
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SearchPage(BaseModel):
+    """A page of search hits, best match first.
+
+    Pass ``next_page`` back as ``cursor`` to fetch the following page;
+    it is ``None`` on the last page.
+    """
+
+    items: list[SearchHit]
+    next_page: str | None = None
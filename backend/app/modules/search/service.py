@@ -0,0 +1,75 @@
+import html
+from uuid import UUID
+
+from sqlalchemy import Float, column
+
+from app.core.exceptions import BadRequestException
+from app.core.pagination import decode_cursor, encode_cursor
+from app.modules.documents.models import Document, DocumentStatus
+from app.modules.search.backends.base import SNIPPET_START, SNIPPET_STOP
+from app.modules.search.repository import SearchRepository
+from app.modules.search.schemas import SearchHit, SearchPage
+
+# Hits are ordered by (rank, document id), best first; cursors carry that key.
+SEARCH_ORDER = ((column("rank", Float), True), (Document.__table__.c.id, True))
+
+
+def _highlight(snippet: str) -> str:
+    # The snippet is document text: escape it, so only the highlights are markup.
+    snippet = html.escape(snippet)
+    # Backends differ in whether adjacent matched words share one highlight
+    # (FTS5 phrases) or get one each (ts_headline); always show one span.
+    snippet = snippet.replace(f"{SNIPPET_STOP} {SNIPPET_START}", " ")
+    return snippet.replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+
+def _encode_cursor(rank: float, document_id: UUID) -> str:
+    return encode_cursor(SEARCH_ORDER, (rank, document_id), backwards=False)
+
+
+def _decode_cursor(cursor: str) -> tuple[float, UUID]:
+    (rank, document_id), backwards = decode_cursor(SEARCH_ORDER, cursor)
+    if backwards:
+        raise BadRequestException("Invalid cursor")
+    return rank, document_id
+
+
+class SearchService:
+    """Business logic for document search."""
+
+    def __init__(self, repo: SearchRepository):
+        self.repo = repo
+
+    async def search(
+        self,
+        org_id: UUID,
+        text: str,
+        *,
+        workspace_id: UUID | None = None,
+        status: DocumentStatus | None = None,
+        cursor: str | None = None,
+        size: int = 20,
+    ) -> SearchPage:
+        """Search the current version of every document in an organization.
+
+        Raises:
+            BadRequestException: If the cursor is malformed or was tampered with.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        rows = await self.repo.search(
+            org_id,
+            text,
+            workspace_id=workspace_id,
+            status=status,
+            after=after,
+            limit=size + 1,
+        )
+        items = [
+            SearchHit.model_validate({**row._mapping, "snippet": _highlight(row.snippet)})
+            for row in rows[:size]
+        ]
+        next_page = None
+        if len(rows) > size:
+            last = items[-1]
+            next_page = _encode_cursor(last.rank, last.document_id)
+        return SearchPage(items=items, next_page=next_page)
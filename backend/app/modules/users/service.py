@@ -1,7 +1,8 @@
 from uuid import UUID
 
 from app.core.exceptions import ConflictException, NotFoundException
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+from app.modules.auth.cache import invalidate_user
 from app.modules.users.models import User
 from app.modules.users.repository import UserRepository
 from app.modules.users.schemas import UserCreate, UserUpdate
@@ -25,7 +26,7 @@ class UserService:
 
         user = User(
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await hash_password_async(data.password),
             full_name=data.full_name,
         )
         return await self.repo.create(user)
@@ -55,7 +56,9 @@ class UserService:
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        return await self.repo.update(user)
+        user = await self.repo.update(user)
+        await invalidate_user(user.id, self.repo.db)
+        return user
 
     async def list_users(self, *, skip: int = 0, limit: int = 100) -> list[User]:
         """List all users with pagination."""
@@ -2,7 +2,7 @@ from uuid import UUID
 
 from sqlmodel import Field
 
-from app.models.base import BaseDBModel
+from app.models.base import BaseDBModel, keyset_index
 
 
 class Workspace(BaseDBModel, table=True):
@@ -19,8 +19,9 @@ class Workspace(BaseDBModel, table=True):
     """
 
     __tablename__ = "workspaces"
+    __table_args__ = (keyset_index("workspaces", "organization_id"),)
 
     name: str = Field(max_length=255, nullable=False)
     slug: str = Field(max_length=100, nullable=False, index=True)
     description: str | None = Field(default=None, max_length=1000)
-    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False, index=True)
+    organization_id: UUID = Field(foreign_key="organizations.id", nullable=False)
@@ -1,11 +1,20 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi_pagination.cursor import CursorPage, CursorParams
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.etag import (
+    cached_not_modified,
+    etag_key,
+    etag_matches,
+    make_etag,
+    not_modified,
+    remember_etag,
+)
 from app.dependencies import get_current_org_id, require_role
+from app.modules.audit_logs.hook import AuditedRoute, audited
 from app.modules.memberships.models import RoleEnum
 from app.modules.workspaces.repository import WorkspaceRepository
 from app.modules.workspaces.schemas import WorkspaceCreate, WorkspaceRead, WorkspaceUpdate
@@ -14,6 +23,7 @@ from app.modules.workspaces.service import WorkspaceService
 router = APIRouter(
     prefix="/organizations/{org_id}/workspaces",
     tags=["Workspaces"],
+    route_class=AuditedRoute,
 )
 
 
@@ -32,6 +42,7 @@ async def list_workspaces(
 
 
 @router.post("", response_model=WorkspaceRead, status_code=201)
+@audited("workspace.created", "workspace")
 async def create_workspace(
     data: WorkspaceCreate,
     org_id: UUID = Depends(get_current_org_id),
@@ -42,17 +53,37 @@ async def create_workspace(
     return await service.create_workspace(org_id, data)
 
 
-@router.get("/{workspace_id}", response_model=WorkspaceRead)
+@router.get(
+    "/{workspace_id}",
+    response_model=WorkspaceRead,
+    responses={304: {"description": "Not modified (matches If-None-Match)"}},
+)
 async def get_workspace(
     workspace_id: UUID,
+    request: Request,
+    response: Response,
     org_id: UUID = Depends(get_current_org_id),
     service: WorkspaceService = Depends(_get_service),
 ):
-    """Get workspace details."""
-    return await service.get_workspace(workspace_id, org_id)
+    """Get workspace details.
+
+    Responds with an ETag; send it back in ``If-None-Match`` to get a 304
+    while the workspace is unchanged.
+    """
+    key = etag_key("workspace", org_id, workspace_id)
+    if cached := await cached_not_modified(request, key):
+        return cached
+    workspace = await service.get_workspace(workspace_id, org_id)
+    etag = make_etag(workspace.id, workspace.updated_at)
+    await remember_etag(key, etag)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return workspace
 
 
 @router.patch("/{workspace_id}", response_model=WorkspaceRead)
+@audited("workspace.updated", "workspace", resource_id="workspace_id")
 async def update_workspace(
     workspace_id: UUID,
     data: WorkspaceUpdate,
@@ -65,6 +96,7 @@ async def update_workspace(
 
 
 @router.delete("/{workspace_id}", status_code=204)
+@audited("workspace.deleted", "workspace", resource_id="workspace_id")
 async def delete_workspace(
     workspace_id: UUID,
     org_id: UUID = Depends(get_current_org_id),
@@ -1,9 +1,10 @@
 from uuid import UUID
 
 from fastapi_pagination.cursor import CursorParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate
 from slugify import slugify
 
+from app.core.etag import etag_key, forget_etags
 from app.core.exceptions import NotFoundException
 from app.modules.workspaces.models import Workspace
 from app.modules.workspaces.repository import WorkspaceRepository
@@ -72,7 +73,9 @@ class WorkspaceService:
         for field, value in update_data.items():
             setattr(workspace, field, value)
 
-        return await self.repo.update(workspace)
+        workspace = await self.repo.update(workspace)
+        await forget_etags(etag_key("workspace", org_id, workspace_id), db=self.db)
+        return workspace
 
     async def delete_workspace(self, workspace_id: UUID, org_id: UUID) -> None:
         """Delete a workspace.
@@ -84,8 +87,9 @@ class WorkspaceService:
         if not workspace:
             raise NotFoundException("Workspace not found")
         await self.repo.delete(workspace)
+        await forget_etags(etag_key("workspace", org_id, workspace_id), db=self.db)
 
     async def list_workspaces(self, org_id: UUID, params: CursorParams):
         """List all workspaces in an organization (cursor-paginated)."""
         query = self.repo.get_org_workspaces_query(org_id)
-        return await paginate(self.db, query, params)
+        return await apaginate(self.db, query, params)
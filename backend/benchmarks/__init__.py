@@ -0,0 +1,7 @@
+"""Benchmark scripts (run with ``python -m benchmarks.<name>``)."""
+
+import os
+
+# Benchmarks run without a .env file; settings need a secret key at import time.
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DEBUG", "false")
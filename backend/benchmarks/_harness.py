@@ -0,0 +1,184 @@
+"""
+Shared benchmark harness.
+
+Boots the FastAPI app against an in-memory SQLite database (the same setup
+as the test suite), seeds a tenant, and provides helpers for counting SQL
+statements and summarising latencies.
+
+Every statement can be charged a simulated network round-trip (``rtt_ms``)
+so that query-count reductions show up in wall-clock numbers the way they
+would against a remote PostgreSQL server.
+"""
+
+import statistics
+import time
+from collections.abc import AsyncGenerator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from app.core.database import get_db
+from app.core.security import create_access_token, hash_password
+from app.main import create_app
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.documents.models import Document
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.organizations.models import Organization
+from app.modules.search.backends import create_search_backend
+from app.modules.search.dependencies import get_search_backend
+from app.modules.search.repository import SearchRepository
+from app.modules.users.models import User
+from app.modules.workspaces.models import Workspace
+
+SQLITE_URL = "sqlite+aiosqlite:///"
+search_backend = create_search_backend(SQLITE_URL)
+
+
+@dataclass
+class Tenant:
+    """Identifiers of the seeded benchmark tenant."""
+
+    user_id: UUID
+    org_id: UUID
+    workspace_id: UUID
+    document_id: UUID
+    version_id: UUID
+    token: str
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine and charges a simulated RTT."""
+
+    def __init__(self, engine: AsyncEngine, rtt_ms: float = 0.0):
+        self.count = 0
+        self.rtt_s = rtt_ms / 1000
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    @contextmanager
+    def measure(self):
+        """Yield a one-element list that receives the statement count of the block."""
+        start = self.count
+        result = [0]
+        yield result
+        result[0] = self.count - start
+
+
+async def create_engine() -> AsyncEngine:
+    """Create an in-memory SQLite engine with all tables."""
+    engine = create_async_engine(
+        SQLITE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    await search_backend.ensure_schema(engine)
+    return engine
+
+
+def create_client(engine: AsyncEngine, app: FastAPI | None = None) -> AsyncClient:
+    """Create an HTTP client for ``app`` (by default the whole API) bound to ``engine``.
+
+    Each request gets its own session, committed on success, exactly
+    like :func:`app.core.database.get_db`.
+    """
+    app = app or create_app()
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_search_backend] = lambda: search_backend
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+async def seed_tenant(engine: AsyncEngine, *, role: RoleEnum = RoleEnum.owner) -> Tenant:
+    """Insert a user, organization, membership, workspace, document and version."""
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        user = User(
+            email=f"bench-{uuid4().hex[:8]}@example.com",
+            hashed_password=hash_password("BenchPass1!"),
+            full_name="Bench User",
+        )
+        org = Organization(name="Bench Org", slug=f"bench-{uuid4().hex[:8]}")
+        session.add_all([user, org])
+        await session.flush()
+
+        workspace = Workspace(name="Bench", slug="bench", organization_id=org.id)
+        session.add_all([Membership(user_id=user.id, organization_id=org.id, role=role), workspace])
+        await session.flush()
+
+        document = Document(
+            title="Bench document",
+            version_count=1,
+            workspace_id=workspace.id,
+            organization_id=org.id,
+            created_by=user.id,
+        )
+        session.add(document)
+        await session.flush()
+
+        version = DocumentVersion(
+            document_id=document.id,
+            version_number=1,
+            title=document.title,
+            content="hello world\n" * 50,
+            created_by=user.id,
+            organization_id=org.id,
+        )
+        session.add(version)
+        await session.flush()
+        document.current_version_id = version.id
+        await SearchRepository(session, search_backend).index_current_version(
+            version.id, None, document.title
+        )
+        await session.commit()
+
+        return Tenant(
+            user_id=user.id,
+            org_id=org.id,
+            workspace_id=workspace.id,
+            document_id=document.id,
+            version_id=version.id,
+            token=create_access_token(user.id),
+        )
+
+
+def summarize(samples_s: list[float]) -> dict[str, float]:
+    """Return p50/p99/mean in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples_s)
+    p99_index = max(0, min(len(ordered) - 1, round(len(ordered) * 0.99) - 1))
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[p99_index] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
@@ -0,0 +1,121 @@
+"""
+Overhead of audit logging a mutating request.
+
+Sends ``--requests`` ``PATCH .../documents/{id}`` requests to three builds
+of the documents API: without auditing, with an inline audit ``INSERT`` in
+the request (what calling the old ``log_action`` from each service would
+cost), and with the ``audited`` hook, which queues the entry for the
+background writer. Reports statements per request and p50/p99 wall-clock
+time with a simulated per-query round trip, and for the hook, the writer's
+batch insert time per entry, paid outside the request.
+
+Usage::
+
+    python -m benchmarks.bench_audit_hook --requests 1000 --rtt-ms 1.0
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, FastAPI, Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.exceptions import register_exception_handlers
+from app.dependencies import TenantContext, get_tenant_context
+from app.modules.audit_logs import hook
+from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.repository import AuditLogRepository
+from app.modules.audit_logs.writer import AuditWriter
+from app.modules.documents.router import router as documents_router
+from benchmarks._harness import QueryCounter, create_client, create_engine, seed_tenant, summarize
+
+
+async def _insert_inline(
+    document_id: UUID,
+    request: Request,
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    await AuditLogRepository(db).create(
+        AuditLog(
+            action="document.updated",
+            resource_type="document",
+            resource_id=document_id,
+            user_id=tenant.user.id,
+            organization_id=tenant.org_id,
+            ip_address=request.client.host,
+        )
+    )
+
+
+def _documents_app(*, inline_audit: bool) -> FastAPI:
+    """The documents routes as plain (unaudited) routes, optionally auditing inline."""
+    app = FastAPI()
+    register_exception_handlers(app)
+    router = APIRouter(prefix=settings.API_V1_PREFIX)
+    for route in documents_router.routes:
+        audit = inline_audit and route.name == "update_document"
+        router.add_api_route(
+            route.path,
+            route.endpoint,
+            methods=route.methods,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            dependencies=[Depends(_insert_inline)] if audit else None,
+        )
+    app.include_router(router)
+    return app
+
+
+async def main(requests: int, rtt_ms: float) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    counter = QueryCounter(engine, rtt_ms=rtt_ms)
+    writer = AuditWriter(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    hook.audit_writer = writer
+    url = f"/api/v1/organizations/{tenant.org_id}/documents/{tenant.document_id}"
+
+    print(f"{'auditing':<18} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, app in (
+        ("none", _documents_app(inline_audit=False)),
+        ("inline INSERT", _documents_app(inline_audit=True)),
+        ("audited hook", None),
+    ):
+        async with create_client(engine, app) as client:
+            samples: list[float] = []
+            queries = 0
+            for i in range(requests):
+                with counter.measure() as executed:
+                    start = time.perf_counter()
+                    response = await client.patch(
+                        url, json={"title": f"Runbook {i}"}, headers=tenant.headers
+                    )
+                    samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+                queries += executed[0]
+        stats = summarize(samples)
+        print(
+            f"{name:<18} {queries / requests:>8.1f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+    queued = writer.metrics()["queue_depth"]
+    start = time.perf_counter()
+    await writer.flush()
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nwriter: {queued} queued entries written in {writer.batches} batches, "
+        f"{elapsed / max(queued, 1) * 1000:.3f} ms per entry"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated per-query RTT")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rtt_ms))
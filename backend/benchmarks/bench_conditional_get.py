@@ -0,0 +1,117 @@
+"""
+Queries, latency and bytes of conditional GETs.
+
+Saves ``--versions`` edits of a ``--size-kb`` markdown document, then loads
+the workspace, the document (with and without ``include=content``) and a
+version from the middle of its history three ways: unconditionally, revalidated with the ETag from
+the first load while its validator is cached, and (versions only)
+revalidated with a cold validator cache. Reports statements per request
+(auth and tenant resolution included), p50/p99 with a simulated per-query
+round trip, and response bytes.
+
+Usage::
+
+    python -m benchmarks.bench_conditional_get --requests 200 --rtt-ms 1.0
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.etag import validator_cache
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.document_versions.storage import keyframe_cache
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import (
+    QueryCounter,
+    create_client,
+    create_engine,
+    search_backend,
+    seed_tenant,
+    summarize,
+)
+from benchmarks.bench_version_storage import _edit, _runbook
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(42)
+    lines = _runbook(rng, args.size_kb)
+    version_ids = []
+    for _ in range(args.versions):
+        _edit(rng, lines)
+        async with session_factory() as session:
+            version, _ = await DocumentVersionService(
+                DocumentVersionRepository(session),
+                DocumentRepository(session),
+                SearchRepository(session, search_backend),
+                session,
+            ).create_version(
+                tenant.document_id,
+                tenant.org_id,
+                tenant.user_id,
+                DocumentVersionCreate(title="Runbook", content="".join(lines)),
+            )
+            await session.commit()
+            version_ids.append(version.id)
+
+    org = f"/api/v1/organizations/{tenant.org_id}"
+    document = f"{org}/documents/{tenant.document_id}"
+    routes = [
+        ("workspace", f"{org}/workspaces/{tenant.workspace_id}", {}),
+        ("document", document, {}),
+        ("doc+content", document, {"include": "content"}),
+        ("version", f"{document}/versions/{version_ids[len(version_ids) // 2]}", {}),
+    ]
+    counter = QueryCounter(engine, rtt_ms=args.rtt_ms)
+
+    print(
+        f"{args.versions} versions of a {args.size_kb} KB document, "
+        f"{args.requests} requests each, {args.rtt_ms} ms per query\n"
+    )
+    print(f"{'route':<12} {'mode':<16} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8} {'bytes':>8}")
+    async with create_client(engine) as client:
+        for name, url, params in routes:
+            etag = (await client.get(url, params=params, headers=tenant.headers)).headers["etag"]
+            modes = [("full", {}, False), ("304 cached", {"If-None-Match": etag}, False)]
+            if name == "version":
+                modes.append(("304 cold", {"If-None-Match": etag}, True))
+            for mode, conditional, cold in modes:
+                samples, queries, size = [], 0, 0
+                for _ in range(args.requests):
+                    if cold:
+                        validator_cache.clear_local()
+                    keyframe_cache.clear()
+                    with counter.measure() as executed:
+                        start = time.perf_counter()
+                        response = await client.get(
+                            url, params=params, headers={**tenant.headers, **conditional}
+                        )
+                        samples.append(time.perf_counter() - start)
+                    assert response.status_code == (304 if conditional else 200)
+                    queries += executed[0]
+                    size = len(response.content)
+                stats = summarize(samples)
+                print(
+                    f"{name:<12} {mode:<16} {queries / args.requests:>8.1f} "
+                    f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} {size:>8}"
+                )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--versions", type=int, default=30)
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated per-query RTT")
+    args = parser.parse_args()
+    asyncio.run(main(args))
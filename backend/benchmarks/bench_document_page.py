@@ -0,0 +1,81 @@
+"""
+Queries and latency of loading a document page.
+
+Times the three ways a client can load a document with its current content:
+``GET .../documents/{id}`` followed by ``GET .../versions/{current}`` (two
+requests), a single ``GET .../documents/{id}?include=content``, and
+revalidating that response with ``If-None-Match`` (a 304). Reports
+statements per page load (auth and tenant resolution included) and p50/p99
+wall-clock time with a simulated per-query round trip.
+
+Usage::
+
+    python -m benchmarks.bench_document_page --pages 300 --rtt-ms 1.0
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._harness import QueryCounter, create_client, create_engine, seed_tenant, summarize
+
+
+async def main(pages: int, rtt_ms: float) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    counter = QueryCounter(engine, rtt_ms=rtt_ms)
+    url = f"/api/v1/organizations/{tenant.org_id}/documents/{tenant.document_id}"
+
+    async with create_client(engine) as client:
+
+        async def two_requests() -> None:
+            document = (await client.get(url, headers=tenant.headers)).json()
+            response = await client.get(
+                f"{url}/versions/{document['current_version_id']}", headers=tenant.headers
+            )
+            response.raise_for_status()
+
+        async def include_content() -> None:
+            response = await client.get(url, params={"include": "content"}, headers=tenant.headers)
+            response.raise_for_status()
+
+        etag = (
+            await client.get(url, params={"include": "content"}, headers=tenant.headers)
+        ).headers["etag"]
+
+        async def revalidate() -> None:
+            response = await client.get(
+                url,
+                params={"include": "content"},
+                headers={**tenant.headers, "If-None-Match": etag},
+            )
+            assert response.status_code == 304
+
+        print(f"{'page load':<18} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, load in (
+            ("two requests", two_requests),
+            ("include=content", include_content),
+            ("304 revalidation", revalidate),
+        ):
+            samples: list[float] = []
+            queries = 0
+            for _ in range(pages):
+                with counter.measure() as executed:
+                    start = time.perf_counter()
+                    await load()
+                    samples.append(time.perf_counter() - start)
+                queries += executed[0]
+            stats = summarize(samples)
+            print(
+                f"{name:<18} {queries / pages:>8.1f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated per-query RTT")
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.rtt_ms))
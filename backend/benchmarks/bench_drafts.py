@@ -0,0 +1,174 @@
+"""
+Write amplification of autosaves with and without draft coalescing.
+
+Simulates ``--editors`` people each editing their own document for
+``--minutes``: bursts of typing with an autosave every ``--autosave``
+seconds, separated by pauses of a few seconds to several minutes, and a
+final explicit commit for half of them. The same event timeline is
+replayed twice on a simulated clock: once posting every autosave to
+``POST .../versions`` (with ``skip_unchanged``), as editors do today, and
+once putting it to ``PUT .../draft`` with the draft flusher running every
+``DRAFT_FLUSH_INTERVAL_SECONDS``. Reports versions written, database
+write statements and bytes stored per mode.
+
+Usage::
+
+    python -m benchmarks.bench_drafts --editors 20 --minutes 30
+"""
+
+import argparse
+import asyncio
+import heapq
+import random
+from types import SimpleNamespace
+
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import redis as redis_module
+from app.core.config import settings
+from app.modules.document_versions.models import ContentBlob, DocumentVersion
+from app.modules.documents.models import Document
+from app.modules.drafts import flusher as flusher_module
+from app.modules.drafts import repository as repository_module
+from app.modules.drafts.flusher import DraftFlusher
+from benchmarks._harness import create_client, create_engine, search_backend, seed_tenant
+from benchmarks.bench_version_storage import _edit, _runbook
+
+
+def _timeline(rng: random.Random, args: argparse.Namespace) -> list[tuple[float, int, str]]:
+    """Return ``(time, editor, action)`` events, ordered by time."""
+    events = []
+    for editor in range(args.editors):
+        t, end = rng.uniform(0, 60), args.minutes * 60
+        while t < end:
+            burst_end = t + rng.uniform(20, 180)
+            while t < min(burst_end, end):
+                events.append((t, editor, "save"))
+                t += args.autosave
+            t += rng.choice([rng.uniform(5, 25), rng.uniform(30, 600)])
+        if rng.random() < 0.5:
+            events.append((min(t, end) + 1, editor, "commit"))
+    heapq.heapify(events)
+    return [heapq.heappop(events) for _ in range(len(events))]
+
+
+async def _run(args: argparse.Namespace, drafts: bool) -> dict:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    writes = [0]
+
+    def count_writes(_conn, _cursor, statement, *_args) -> None:
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            writes[0] += 1
+
+    async with session_factory() as session:
+        documents = [
+            Document(
+                title=f"Document {i}",
+                workspace_id=tenant.workspace_id,
+                organization_id=tenant.org_id,
+                created_by=tenant.user_id,
+            )
+            for i in range(args.editors)
+        ]
+        session.add_all(documents)
+        await session.commit()
+
+    # Simulated clock for draft timestamps and idleness.
+    clock = SimpleNamespace(now=0.0)
+    fake_time = SimpleNamespace(time=lambda: clock.now)
+    repository_module.time = flusher_module.time = fake_time
+    redis_module.redis_client = FakeAsyncRedis(decode_responses=True)
+    flusher = DraftFlusher(session_factory, search_backend)
+
+    rng = random.Random(42)
+    contents = [_runbook(rng, args.size_kb) for _ in documents]
+    events = _timeline(random.Random(7), args)
+    base = f"/api/v1/organizations/{tenant.org_id}/documents"
+    event.listen(engine.sync_engine, "before_cursor_execute", count_writes)
+    async with create_client(engine) as client:
+        next_flush = 0.0
+        for t, editor, action in events:
+            while drafts and next_flush <= t:
+                clock.now = next_flush
+                await flusher.flush_idle()
+                next_flush += settings.DRAFT_FLUSH_INTERVAL_SECONDS
+            clock.now = t
+            document = documents[editor]
+            if action == "save":
+                _edit(rng, contents[editor])
+                body = {"title": document.title, "content": "".join(contents[editor])}
+                if drafts:
+                    response = await client.put(
+                        f"{base}/{document.id}/draft", json=body, headers=tenant.headers
+                    )
+                else:
+                    response = await client.post(
+                        f"{base}/{document.id}/versions",
+                        json={**body, "skip_unchanged": True},
+                        headers=tenant.headers,
+                    )
+                response.raise_for_status()
+            elif drafts:
+                response = await client.post(
+                    f"{base}/{document.id}/draft/commit", headers=tenant.headers
+                )
+                assert response.status_code in (200, 201, 404)  # 404: already flushed
+        if drafts:
+            clock.now += settings.DRAFT_IDLE_SECONDS
+            await flusher.flush_idle()
+    event.remove(engine.sync_engine, "before_cursor_execute", count_writes)
+
+    async with session_factory() as session:
+        versions = await session.scalar(
+            select(func.count())
+            .select_from(DocumentVersion)
+            .where(DocumentVersion.document_id != tenant.document_id)
+        )
+        stored = (
+            await session.scalar(select(func.sum(func.coalesce(func.length(ContentBlob.body), 0))))
+            or 0
+        ) + (
+            await session.scalar(
+                select(func.sum(func.coalesce(func.length(ContentBlob.compressed), 0)))
+            )
+            or 0
+        )
+    await redis_module.redis_client.aclose()
+    redis_module.redis_client = None
+    await engine.dispose()
+    saves = sum(action == "save" for _, _, action in events)
+    return {"saves": saves, "versions": versions, "writes": writes[0], "stored": stored}
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.VERSION_COMPRESSION_ENABLED = False
+    direct = await _run(args, drafts=False)
+    drafted = await _run(args, drafts=True)
+    print(
+        f"{args.editors} editors x {args.minutes} min, autosave every {args.autosave:g}s, "
+        f"idle flush after {settings.DRAFT_IDLE_SECONDS:g}s: {direct['saves']} autosaves\n"
+    )
+    print(f"{'mode':<10} {'versions':>9} {'DB writes':>10} {'stored KB':>10}")
+    for name, result in (("direct", direct), ("drafts", drafted)):
+        print(
+            f"{name:<10} {result['versions']:>9} {result['writes']:>10} "
+            f"{result['stored'] / 1e3:>10.1f}"
+        )
+    print(
+        f"\nversions {direct['versions'] / drafted['versions']:.1f}x fewer, "
+        f"DB writes {direct['writes'] / drafted['writes']:.1f}x fewer"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--editors", type=int, default=20)
+    parser.add_argument("--minutes", type=int, default=30)
+    parser.add_argument("--autosave", type=float, default=3.0, help="seconds between autosaves")
+    parser.add_argument("--size-kb", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,94 @@
+"""
+Event-loop lag and unrelated-request throughput during a login storm.
+
+Runs concurrent logins while a probe measures event-loop lag and a
+second client hammers ``GET /health``. ``--mode inline`` reproduces the
+old behaviour of hashing on the event loop; ``thread`` and ``process``
+use the bounded password hash pool.
+
+Usage::
+
+    python -m benchmarks.bench_password_hashing --mode inline
+    python -m benchmarks.bench_password_hashing --mode thread --logins 32
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.security import PasswordHashPool, password_hash_pool
+from benchmarks._harness import create_client, create_engine, seed_tenant, summarize
+
+
+async def _probe_lag(stop: asyncio.Event, lags: list[float], interval: float = 0.005) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def _health_loop(client, stop: asyncio.Event, done: list[int]) -> None:
+    while not stop.is_set():
+        (await client.get("/health")).raise_for_status()
+        done[0] += 1
+        await asyncio.sleep(0)
+
+
+async def _login_loop(client, email: str, stop: asyncio.Event, stats: dict[str, int]) -> None:
+    while not stop.is_set():
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": email, "password": "BenchPass1!"}
+        )
+        stats[str(response.status_code)] = stats.get(str(response.status_code), 0) + 1
+        await asyncio.sleep(0)
+
+
+async def main(mode: str, logins: int, workers: int, seconds: float) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    async with create_client(engine) as client:
+        email = (await client.get("/api/v1/users/me", headers=tenant.headers)).json()["email"]
+
+    if mode == "inline":
+
+        async def _inline(fn, *args):
+            return fn(*args)
+
+        password_hash_pool.run = _inline
+    else:
+        pool = PasswordHashPool(workers, queue_size=logins, kind=mode)
+        password_hash_pool.run = pool.run
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    health_done = [0]
+    login_stats: dict[str, int] = {}
+    async with create_client(engine) as client:
+        tasks = [
+            asyncio.create_task(_probe_lag(stop, lags)),
+            asyncio.create_task(_health_loop(client, stop, health_done)),
+            *(
+                asyncio.create_task(_login_loop(client, email, stop, login_stats))
+                for _ in range(logins)
+            ),
+        ]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    lag = summarize(lags)
+    print(f"mode={mode} concurrent_logins={logins} workers={workers} duration={seconds}s")
+    print(f"event-loop lag   p50 {lag['p50_ms']:.1f} ms   p99 {lag['p99_ms']:.1f} ms")
+    print(f"GET /health      {health_done[0] / seconds:.0f} req/s")
+    print(f"logins           {login_stats.get('200', 0) / seconds:.1f} /s   statuses {login_stats}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["inline", "thread", "process"], default="thread")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.mode, args.logins, args.workers, args.seconds))
@@ -0,0 +1,69 @@
+"""
+Queries-per-request and latency of the documents and versions routers.
+
+Measures how many SQL statements each org-scoped route issues (auth and
+tenant resolution included) together with p50/p99 latency.
+
+Usage::
+
+    python -m benchmarks.bench_tenant_context --requests 300 --rtt-ms 1.0
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._harness import (
+    QueryCounter,
+    create_client,
+    create_engine,
+    seed_tenant,
+    summarize,
+)
+
+
+def _routes(t) -> list[tuple[str, str, str, dict | None]]:
+    docs = f"/api/v1/organizations/{t.org_id}/documents"
+    versions = f"{docs}/{t.document_id}/versions"
+    return [
+        ("list documents", "GET", docs, None),
+        ("get document", "GET", f"{docs}/{t.document_id}", None),
+        ("create document", "POST", docs, {"title": "Doc", "workspace_id": str(t.workspace_id)}),
+        ("update document", "PATCH", f"{docs}/{t.document_id}", {"title": "Renamed"}),
+        ("list versions", "GET", versions, None),
+        ("get version", "GET", f"{versions}/{t.version_id}", None),
+        ("create version", "POST", versions, {"title": "Doc", "content": "body\n" * 20}),
+    ]
+
+
+async def main(requests: int, rtt_ms: float) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    counter = QueryCounter(engine, rtt_ms=rtt_ms)
+
+    print(f"{'route':<18} {'queries/req':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    async with create_client(engine) as client:
+        for name, method, url, body in _routes(tenant):
+            samples: list[float] = []
+            queries = 0
+            for _ in range(requests):
+                with counter.measure() as executed:
+                    start = time.perf_counter()
+                    response = await client.request(method, url, json=body, headers=tenant.headers)
+                    samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+                queries += executed[0]
+            stats = summarize(samples)
+            print(
+                f"{name:<18} {queries / requests:>11.1f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated per-query RTT")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rtt_ms))
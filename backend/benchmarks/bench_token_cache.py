@@ -0,0 +1,65 @@
+"""
+CPU cost of the auth dependency chain with and without the verified-token cache.
+
+Runs ``get_token_user_id`` + ``get_tenant_context`` (with a warm auth
+cache, so no database work) in a tight loop and reports CPU time per
+request, first with the token cache disabled, then enabled.
+
+Usage::
+
+    python -m benchmarks.bench_token_cache --iterations 20000
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
+
+from app.core import security
+from app.core.security import VerifiedTokenCache, create_access_token
+from app.dependencies import get_tenant_context, get_token_user_id
+from app.modules.auth.cache import auth_cache, cache_membership, cache_user
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.users.models import User
+
+
+async def _run_chain(credentials, org_id, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        request = Request({"type": "http", "headers": []})
+        user_id = get_token_user_id(request, credentials)
+        await get_tenant_context(org_id, request, user_id, db=None)
+    return (time.process_time() - start) / iterations
+
+
+async def main(iterations: int) -> None:
+    auth_cache.local.ttl = 3600  # keep the user/membership warm for the whole run
+    user = User(id=uuid4(), email="bench@example.com", hashed_password="x", full_name="Bench")
+    org_id = uuid4()
+    await cache_user(user)
+    await cache_membership(
+        Membership(user_id=user.id, organization_id=org_id, role=RoleEnum.member)
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token(user.id)
+    )
+
+    results = {}
+    for label, maxsize in (("token cache off", 0), ("token cache on", 1024)):
+        security.verified_token_cache = VerifiedTokenCache(maxsize)
+        await _run_chain(credentials, org_id, 100)  # warm-up
+        results[label] = await _run_chain(credentials, org_id, iterations)
+        print(f"{label:<16} {results[label] * 1e6:8.1f} µs CPU / request")
+
+    saved = results["token cache off"] - results["token cache on"]
+    print(f"{'saved':<16} {saved * 1e6:8.1f} µs CPU / request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
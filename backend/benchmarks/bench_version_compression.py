@@ -0,0 +1,180 @@
+"""
+Bytes on disk, insert throughput and read latency of plain vs zstd version storage.
+
+Replays a synthetic edit history for every markdown file under ``--corpus``
+(each version replaces, inserts or deletes a few lines of the previous one)
+through ``DocumentVersionService``, once per mode:
+
+* ``plain``: compression disabled,
+* ``zstd``: compression above ``VERSION_COMPRESSION_MIN_BYTES``,
+* ``zstd+dict``: the same with a dictionary trained on the first versions.
+
+and reports the size of the ``document_versions`` and ``content_blobs``
+tables on disk (SQLite ``dbstat``), versions written per second and
+``get_version`` latency for random versions with cold caches. The latest
+version of each document also keeps a plain copy for search, so the gain
+grows with history.
+
+Usage::
+
+    python -m benchmarks.bench_version_compression --corpus ~/src/docs --versions 8
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.modules.document_versions.compaction import train_dictionary
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.document_versions.storage import dictionary_cache, keyframe_cache
+from app.modules.documents.models import Document
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import create_engine, search_backend, seed_tenant, summarize
+
+MODES = ("plain", "zstd", "zstd+dict")
+
+
+def _load_corpus(root: Path, limit: int) -> list[str]:
+    corpus = []
+    for path in sorted(root.rglob("*.md")):
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        if len(content) >= 1024:
+            corpus.append(content)
+        if len(corpus) == limit:
+            break
+    return corpus
+
+
+def _edit(rng: random.Random, content: str) -> str:
+    lines = content.splitlines(keepends=True)
+    for _ in range(rng.randint(1, 3)):
+        at = rng.randrange(len(lines))
+        action = rng.random()
+        if action < 0.5:
+            lines[at] = rng.choice(lines)
+        elif action < 0.8:
+            lines.insert(at, rng.choice(lines))
+        elif len(lines) > 1:
+            del lines[at]
+    return "".join(lines)
+
+
+def _service(session: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(session),
+        DocumentRepository(session),
+        SearchRepository(session, search_backend),
+        session,
+    )
+
+
+async def _run(mode: str, corpus: list[str], versions: int, reads: int) -> dict:
+    settings.VERSION_COMPRESSION_ENABLED = mode != "plain"
+    keyframe_cache.clear()
+    dictionary_cache.clear()
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        documents = [
+            Document(
+                title=f"Doc {i}",
+                workspace_id=tenant.workspace_id,
+                organization_id=tenant.org_id,
+                created_by=tenant.user_id,
+            )
+            for i in range(len(corpus))
+        ]
+        session.add_all(documents)
+        await session.commit()
+
+    rng = random.Random(42)
+    contents = list(corpus)
+    ids = []
+    elapsed = 0.0
+    for number in range(1, versions + 1):
+        for i, document in enumerate(documents):
+            if number > 1:
+                contents[i] = _edit(rng, contents[i])
+            async with session_factory() as session:
+                start = time.perf_counter()
+                version, _ = await _service(session).create_version(
+                    document.id,
+                    tenant.org_id,
+                    tenant.user_id,
+                    DocumentVersionCreate(title=document.title, content=contents[i]),
+                )
+                await session.commit()
+                elapsed += time.perf_counter() - start
+            ids.append(version.id)
+        if number == 1 and mode == "zstd+dict":
+            async with session_factory() as session:
+                await train_dictionary(session, tenant.org_id)
+                await session.commit()
+
+    async with engine.connect() as conn:
+        on_disk = await conn.scalar(
+            text(
+                "SELECT sum(pgsize) FROM dbstat "
+                "WHERE name IN ('document_versions', 'content_blobs')"
+            )
+        )
+
+    samples = []
+    for version_id in random.Random(7).choices(ids, k=reads):
+        keyframe_cache.clear()
+        dictionary_cache.clear()
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await _service(session).get_version(version_id, tenant.org_id)
+            samples.append(time.perf_counter() - start)
+    await engine.dispose()
+
+    return {
+        "on_disk_mb": on_disk / 1e6,
+        "inserts_per_s": len(ids) / elapsed,
+        "read": summarize(samples),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    corpus = _load_corpus(args.corpus, args.documents)
+    if len(corpus) < 10:
+        raise SystemExit(f"need at least 10 markdown files of 1 KB or more under {args.corpus}")
+    settings.VERSION_KEYFRAME_INTERVAL = args.interval
+    raw_mb = sum(len(content.encode()) for content in corpus) / 1e6
+    print(
+        f"{len(corpus)} documents ({raw_mb:.1f} MB), {args.versions} versions each, "
+        f"keyframe interval {args.interval}, {args.reads} cold reads per mode\n"
+    )
+    print(f"{'mode':<10} {'on disk MB':>10} {'inserts/s':>10} {'read p50':>9} {'read p99':>9}")
+    for mode in MODES:
+        result = await _run(mode, corpus, args.versions, args.reads)
+        print(
+            f"{mode:<10} {result['on_disk_mb']:>10.2f} {result['inserts_per_s']:>10.0f} "
+            f"{result['read']['p50_ms']:>9.2f} {result['read']['p99_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=Path, default=Path(__file__).resolve().parents[2])
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--versions", type=int, default=8)
+    parser.add_argument("--interval", type=int, default=settings.VERSION_KEYFRAME_INTERVAL)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args))
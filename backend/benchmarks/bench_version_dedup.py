@@ -0,0 +1,161 @@
+"""
+Deduplication of version content on replayed real edit histories.
+
+Every file matching ``--pattern`` in each ``--repo`` becomes a document and
+every commit that touched it becomes a save of its content at that commit,
+written through ``DocumentVersionService``. Git histories contain reverts
+and commits that only touch other lines of a file the way real documents
+do; ``--noop-rate`` additionally replays that share of saves twice, as an
+editor that saves without changes would.
+
+Saves are sent with ``skip_unchanged`` unless ``--no-skip`` is given;
+versions that are still created with earlier content (reverts, or repeated
+saves with ``--no-skip``) reference the existing blob. Reports versions written, blobs
+stored, the dedup ratio (versions per blob) and content bytes vs bytes
+stored in ``document_versions.content`` and ``content_blobs``.
+
+Usage::
+
+    python -m benchmarks.bench_version_dedup --repo ~/src/project --pattern '*.md'
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.modules.document_versions.models import ContentBlob, DocumentVersion
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.models import Document
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import create_engine, search_backend, seed_tenant
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _histories(repo: Path, pattern: str) -> dict[str, list[str]]:
+    """Return the content of every matching file at each commit that touched it."""
+    histories = {}
+    for path in _git(repo, "ls-files", pattern).splitlines():
+        commits = _git(repo, "log", "--reverse", "--format=%H", "--", path).split()
+        contents = []
+        for commit in commits:
+            try:
+                contents.append(_git(repo, "show", f"{commit}:{path}"))
+            except (subprocess.CalledProcessError, UnicodeDecodeError):
+                continue  # deleted or renamed at this commit, or not text
+        if contents:
+            histories[f"{repo.name}/{path}"] = contents
+    return histories
+
+
+def _service(session: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(session),
+        DocumentRepository(session),
+        SearchRepository(session, search_backend),
+        session,
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    histories: dict[str, list[str]] = {}
+    for repo in args.repo:
+        histories.update(_histories(repo, args.pattern))
+    if not histories:
+        raise SystemExit(f"no files matching {args.pattern!r} in {args.repo}")
+
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(42)
+
+    saves = skipped = logical = 0
+    for name, contents in histories.items():
+        async with session_factory() as session:
+            document = Document(
+                title=name,
+                workspace_id=tenant.workspace_id,
+                organization_id=tenant.org_id,
+                created_by=tenant.user_id,
+            )
+            session.add(document)
+            await session.commit()
+        for content in contents:
+            repeats = 2 if rng.random() < args.noop_rate else 1
+            for _ in range(repeats):
+                async with session_factory() as session:
+                    _, created = await _service(session).create_version(
+                        document.id,
+                        tenant.org_id,
+                        tenant.user_id,
+                        DocumentVersionCreate(
+                            title=document.title,
+                            content=content,
+                            skip_unchanged=not args.no_skip,
+                        ),
+                    )
+                    await session.commit()
+                saves += 1
+                if created:
+                    logical += len(content.encode())
+                else:
+                    skipped += 1
+
+    async with session_factory() as session:
+        versions = await session.scalar(
+            select(func.count())
+            .select_from(DocumentVersion)
+            .where(DocumentVersion.blob_id.is_not(None))
+        )
+        blobs = await session.scalar(select(func.count()).select_from(ContentBlob))
+        stored = await session.scalar(
+            select(func.sum(func.coalesce(func.length(DocumentVersion.content), 0))).where(
+                DocumentVersion.blob_id.is_not(None)
+            )
+        ) + await session.scalar(
+            select(
+                func.sum(
+                    func.coalesce(func.length(ContentBlob.body), 0)
+                    + func.coalesce(func.length(ContentBlob.compressed), 0)
+                )
+            )
+        )
+    await engine.dispose()
+
+    print(
+        f"{len(histories)} documents, {saves} saves "
+        f"(noop rate {args.noop_rate:.0%}), keyframe interval {args.interval}\n"
+    )
+    print(f"skipped unchanged  {skipped:>10}")
+    print(f"versions written   {versions:>10}")
+    print(f"blobs stored       {blobs:>10}")
+    print(f"dedup ratio        {versions / blobs:>10.2f}")
+    print(f"content MB         {logical / 1e6:>10.2f}")
+    print(f"stored MB          {stored / 1e6:>10.2f}   ({logical / stored:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--repo", type=Path, nargs="+", default=[Path(__file__).resolve().parents[2]]
+    )
+    parser.add_argument("--pattern", default="*.md")
+    parser.add_argument("--noop-rate", type=float, default=0.0)
+    parser.add_argument("--no-skip", action="store_true", help="save unchanged content too")
+    parser.add_argument("--interval", type=int, default=settings.VERSION_KEYFRAME_INTERVAL)
+    args = parser.parse_args()
+    settings.VERSION_KEYFRAME_INTERVAL = args.interval
+    asyncio.run(main(args))
@@ -0,0 +1,140 @@
+"""
+Latency of version diffs on large documents.
+
+Builds a ``--lines``-line markdown runbook and copies of it with 10, 100 and
+1000 random line edits, plus an unrelated runbook of the same size, and
+times ``diff`` in line and word mode against ``difflib.unified_diff`` on
+each pair. Then saves the runbook and its 100-edit copy as two versions and
+times ``GET .../versions/{a}/diff/{b}`` with a cold and a warm diff cache.
+
+Usage::
+
+    python -m benchmarks.bench_version_diff --lines 10000
+"""
+
+import argparse
+import asyncio
+import difflib
+import random
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.modules.document_versions.diff import diff, diff_cache
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import create_client, create_engine, search_backend, seed_tenant, summarize
+from benchmarks.bench_version_storage import WORDS, _runbook
+
+
+def _edited(rng: random.Random, lines: list[str], edits: int) -> list[str]:
+    lines = list(lines)
+    for _ in range(edits):
+        at = rng.randrange(len(lines))
+        words = lines[at].split()
+        if rng.random() < 0.6 and len(words) > 2:
+            words[rng.randrange(1, len(words))] = rng.choice(WORDS)
+            lines[at] = " ".join(words) + "\n"
+        elif rng.random() < 0.5:
+            lines.insert(at, f"- {' '.join(rng.choices(WORDS, k=rng.randint(6, 14)))}.\n")
+        else:
+            del lines[at]
+    return lines
+
+
+def _time(function, repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def _runbook_of(rng: random.Random, lines: int) -> list[str]:
+    # ``_runbook`` sizes by KB; lines average about 70 bytes.
+    return _runbook(rng, lines * 70 // 1024 + 1)[:lines]
+
+
+async def _endpoint(old: str, new: str, repeat: int) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    ids = []
+    for content in (old, new):
+        async with session_factory() as session:
+            service = DocumentVersionService(
+                DocumentVersionRepository(session),
+                DocumentRepository(session),
+                SearchRepository(session, search_backend),
+                session,
+            )
+            version, _ = await service.create_version(
+                tenant.document_id,
+                tenant.org_id,
+                tenant.user_id,
+                DocumentVersionCreate(title="Runbook", content=content),
+            )
+            await session.commit()
+            ids.append(version.id)
+
+    url = (
+        f"/api/v1/organizations/{tenant.org_id}/documents/{tenant.document_id}"
+        f"/versions/{ids[0]}/diff/{ids[1]}"
+    )
+    cold, warm = [], []
+    async with create_client(engine) as client:
+        for _ in range(repeat):
+            diff_cache.clear_local()
+            start = time.perf_counter()
+            response = await client.get(url, headers=tenant.headers)
+            cold.append(time.perf_counter() - start)
+            response.raise_for_status()
+            start = time.perf_counter()
+            await client.get(url, headers=tenant.headers)
+            warm.append(time.perf_counter() - start)
+    await engine.dispose()
+    for name, samples in (("cold cache", cold), ("warm cache", warm)):
+        stats = summarize(samples)
+        print(f"{name:<12} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(42)
+    base = _runbook_of(rng, args.lines)
+    pairs = {f"{edits} edits": _edited(rng, base, edits) for edits in (10, 100, 1000)}
+    pairs["unrelated"] = _runbook_of(rng, args.lines)
+    old = "".join(base)
+
+    print(f"{args.lines}-line document, {args.repeat} runs, p50 / p99 ms\n")
+    print(f"{'pair':<12} {'line':>17} {'word':>17} {'difflib':>17}")
+    for name, lines in pairs.items():
+        new = "".join(lines)
+        results = [
+            _time(
+                lambda new=new: diff(old, new, max_cost=settings.VERSION_DIFF_MAX_COST), args.repeat
+            ),
+            _time(
+                lambda new=new: diff(old, new, words=True, max_cost=settings.VERSION_DIFF_MAX_COST),
+                args.repeat,
+            ),
+            _time(lambda lines=lines: list(difflib.unified_diff(base, lines)), args.repeat),
+        ]
+        print(
+            f"{name:<12} " + " ".join(f"{r['p50_ms']:>8.1f}/{r['p99_ms']:>8.1f}" for r in results)
+        )
+
+    print(f"\n{'endpoint':<12} {'p50 ms':>9} {'p99 ms':>9}")
+    await _endpoint(old, "".join(pairs["100 edits"]), args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args))
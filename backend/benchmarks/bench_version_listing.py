@@ -0,0 +1,172 @@
+"""
+Response size and latency of version listings with and without content.
+
+Writes ``--versions`` successive edits of a ``--size-kb`` markdown document,
+then walks its whole history one page at a time, building each page the
+way ``list_versions`` does (the summary query, serialized as
+``DocumentVersionSummary``) and, with ``--baseline``, the way it did before
+summaries (full rows with every version's content rebuilt, serialized as
+``DocumentVersionRead``). Both skip HTTP; the ``http`` row walks the real
+``GET .../versions`` endpoint for reference.
+
+Usage::
+
+    python -m benchmarks.bench_version_listing --versions 1000 --size-kb 50 --baseline
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import (
+    DocumentVersionCreate,
+    DocumentVersionRead,
+    DocumentVersionSummary,
+)
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.document_versions.storage import keyframe_cache
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import create_client, create_engine, search_backend, seed_tenant, summarize
+from benchmarks.bench_version_storage import _edit, _runbook
+
+PAGE_SIZE = 100
+summaries_adapter = TypeAdapter(list[DocumentVersionSummary])
+versions_adapter = TypeAdapter(list[DocumentVersionRead])
+
+
+def _service(session: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(session),
+        DocumentRepository(session),
+        SearchRepository(session, search_backend),
+        session,
+    )
+
+
+async def _summary_page(session: AsyncSession, tenant, before: int | None) -> tuple[bytes, int]:
+    """Return one serialized page of summaries and its last version number."""
+    query = (
+        DocumentVersionRepository(session)
+        .get_document_versions_query(tenant.document_id, tenant.org_id)
+        .limit(PAGE_SIZE)
+    )
+    if before is not None:
+        query = query.where(DocumentVersion.version_number < before)
+    rows = (await session.execute(query)).all()
+    items = [DocumentVersionSummary.model_validate(row) for row in rows]
+    return summaries_adapter.dump_json(items), rows[-1].version_number
+
+
+async def _full_page(session: AsyncSession, tenant, before: int | None) -> tuple[bytes, int]:
+    """Return one page as the pre-summary endpoint serialized it, and its last number."""
+    query = (
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == tenant.document_id)
+        .order_by(DocumentVersion.version_number.desc())
+        .limit(PAGE_SIZE)
+    )
+    if before is not None:
+        query = query.where(DocumentVersion.version_number < before)
+    versions = list((await session.scalars(query)).all())
+    service = _service(session)
+    contents = await service._blob_contents(v.blob_id for v in versions if v.content is None)
+    items = [
+        DocumentVersionRead.model_validate(
+            {
+                **v.model_dump(include=set(DocumentVersionRead.model_fields)),
+                "content": v.content if v.content is not None else contents[v.blob_id],
+            }
+        )
+        for v in versions
+    ]
+    return versions_adapter.dump_json(items), versions[-1].version_number
+
+
+async def _walk(session_factory, tenant, page, repeat: int) -> tuple[list[float], list[int]]:
+    samples, sizes = [], []
+    for _ in range(repeat):
+        keyframe_cache.clear()
+        before = None
+        while before != 1:
+            async with session_factory() as session:
+                start = time.perf_counter()
+                body, before = await page(session, tenant, before)
+                samples.append(time.perf_counter() - start)
+            sizes.append(len(body))
+    return samples, sizes
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rng = random.Random(42)
+    lines = _runbook(rng, args.size_kb)
+    for _ in range(args.versions):
+        _edit(rng, lines)
+        async with session_factory() as session:
+            await _service(session).create_version(
+                tenant.document_id,
+                tenant.org_id,
+                tenant.user_id,
+                DocumentVersionCreate(title="Runbook", content="".join(lines)),
+            )
+            await session.commit()
+    total = args.versions + 1  # plus the harness seed
+    print(
+        f"{total} versions of a {args.size_kb} KB document, "
+        f"{PAGE_SIZE} per page, {args.repeat} walks of the whole history\n"
+    )
+    print(f"{'listing':<10} {'page KB':>9} {'history MB':>11} {'page p50':>9} {'page p99':>9}")
+
+    _report(
+        "summary", *await _walk(session_factory, tenant, _summary_page, args.repeat), args.repeat
+    )
+    if args.baseline:
+        _report(
+            "content", *await _walk(session_factory, tenant, _full_page, args.repeat), args.repeat
+        )
+
+    url = f"/api/v1/organizations/{tenant.org_id}/documents/{tenant.document_id}/versions"
+    samples, sizes = [], []
+    async with create_client(engine) as client:
+        for _ in range(args.repeat):
+            cursor = None
+            while True:
+                params = {"size": PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+                start = time.perf_counter()
+                response = await client.get(url, params=params, headers=tenant.headers)
+                samples.append(time.perf_counter() - start)
+                sizes.append(len(response.content))
+                cursor = response.json()["next_page"]
+                if not cursor:
+                    break
+    _report("http", samples, sizes, args.repeat)
+    await engine.dispose()
+
+
+def _report(name: str, samples: list[float], sizes: list[int], repeat: int) -> None:
+    stats = summarize(samples)
+    print(
+        f"{name:<10} {sum(sizes) / len(sizes) / 1e3:>9.1f} {sum(sizes) / repeat / 1e6:>11.2f} "
+        f"{stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,163 @@
+"""
+Storage size and read latency of version history for several keyframe intervals.
+
+Writes ``--versions`` successive edits of a ``--size-kb`` markdown runbook
+through ``DocumentVersionService`` for each keyframe interval (1 stores every
+version in full), then reports bytes stored and ``get_version`` latency for
+random versions with a cold and a warm keyframe cache, plus the worst case:
+the last version of a chain, which replays ``interval - 1`` deltas.
+
+Usage::
+
+    python -m benchmarks.bench_version_storage --versions 400 --size-kb 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.modules.document_versions.models import ContentBlob, DocumentVersion
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.document_versions.storage import keyframe_cache
+from app.modules.documents.repository import DocumentRepository
+from app.modules.search.repository import SearchRepository
+from benchmarks._harness import create_engine, search_backend, seed_tenant, summarize
+
+WORDS = (  # noqa: SIM905
+    "restart drain queue worker deploy rollback verify dashboard alert latency "
+    "database replica failover cache token certificate rotate escalate on-call"
+).split()
+
+
+def _runbook(rng: random.Random, size_kb: int) -> list[str]:
+    lines, size = [], 0
+    while size < size_kb * 1024:
+        if rng.random() < 0.1:
+            line = f"## {' '.join(rng.choices(WORDS, k=3)).title()}\n"
+        else:
+            line = f"- {' '.join(rng.choices(WORDS, k=rng.randint(6, 14)))}.\n"
+        lines.append(line)
+        size += len(line)
+    return lines
+
+
+def _edit(rng: random.Random, lines: list[str]) -> None:
+    for _ in range(rng.randint(1, 3)):
+        at = rng.randrange(len(lines))
+        action = rng.random()
+        line = f"- {' '.join(rng.choices(WORDS, k=rng.randint(6, 14)))}.\n"
+        if action < 0.5:
+            lines[at] = line
+        elif action < 0.8:
+            lines.insert(at, line)
+        elif len(lines) > 1:
+            del lines[at]
+
+
+def _service(session: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(session),
+        DocumentRepository(session),
+        SearchRepository(session, search_backend),
+        session,
+    )
+
+
+async def _run(interval: int, versions: int, size_kb: int, reads: int) -> dict:
+    settings.VERSION_KEYFRAME_INTERVAL = interval
+    keyframe_cache.clear()
+    engine = await create_engine()
+    tenant = await seed_tenant(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rng = random.Random(42)
+    lines = _runbook(rng, size_kb)
+    ids = []
+    start = time.perf_counter()
+    for _ in range(versions):
+        _edit(rng, lines)
+        async with session_factory() as session:
+            version, _ = await _service(session).create_version(
+                tenant.document_id,
+                tenant.org_id,
+                tenant.user_id,
+                DocumentVersionCreate(title="Runbook", content="".join(lines)),
+            )
+            await session.commit()
+        ids.append(version.id)
+    write_s = (time.perf_counter() - start) / versions
+
+    async with session_factory() as session:
+        stored = await session.scalar(
+            select(func.sum(func.coalesce(func.length(DocumentVersion.content), 0)))
+        ) + await session.scalar(
+            select(
+                func.sum(
+                    func.coalesce(func.length(ContentBlob.body), 0)
+                    + func.coalesce(func.length(ContentBlob.compressed), 0)
+                )
+            )
+        )
+
+    async def read(version_id, *, cold: bool) -> float:
+        if cold:
+            keyframe_cache.clear()
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await _service(session).get_version(version_id, tenant.org_id)
+            return time.perf_counter() - start
+
+    sample = random.Random(7).choices(ids, k=reads)
+    cold = [await read(version_id, cold=True) for version_id in sample]
+    warm = [await read(version_id, cold=False) for version_id in sample]
+    # The harness seed has no blob, so the first version written starts a chain.
+    chain_ends = [v for n, v in enumerate(ids, start=1) if n % interval == 0][:reads] or ids[:1]
+    worst = [await read(version_id, cold=False) for version_id in chain_ends]
+    await engine.dispose()
+
+    return {
+        "stored_mb": stored / 1e6,
+        "write_ms": write_s * 1000,
+        "cold": summarize(cold),
+        "warm": summarize(warm),
+        "worst": summarize(worst),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(
+        f"{args.versions} versions of a {args.size_kb} KB document, "
+        f"{args.reads} random reads per interval\n"
+    )
+    print(
+        f"{'interval':>8} {'stored MB':>10} {'write ms':>9} "
+        f"{'cold p50':>9} {'cold p99':>9} {'warm p50':>9} {'warm p99':>9} {'chain end':>10}"
+    )
+    baseline = None
+    for interval in args.intervals:
+        result = await _run(interval, args.versions, args.size_kb, args.reads)
+        baseline = baseline or result["stored_mb"]
+        print(
+            f"{interval:>8} {result['stored_mb']:>10.1f} {result['write_ms']:>9.2f} "
+            f"{result['cold']['p50_ms']:>9.2f} {result['cold']['p99_ms']:>9.2f} "
+            f"{result['warm']['p50_ms']:>9.2f} {result['warm']['p99_ms']:>9.2f} "
+            f"{result['worst']['p50_ms']:>10.2f}"
+            f"   ({baseline / result['stored_mb']:.1f}x smaller)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", type=int, default=400)
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 8, 16, 32, 64])
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -5,22 +5,57 @@ Provides reusable fixtures for the async test client, database sessions,
 and authenticated test users.
 """
 
+import os
 from collections.abc import AsyncGenerator
 from uuid import uuid4
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel
 
 from app.core.database import get_db
-from app.core.security import create_access_token, hash_password
+from app.core.etag import validator_cache
+from app.core.security import create_access_token, hash_password, verified_token_cache
 from app.main import create_app
+from app.modules.auth.cache import auth_cache
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.organizations.models import Organization
+from app.modules.search.backends import create_search_backend
+from app.modules.search.dependencies import get_search_backend
 from app.modules.users.models import User
 
 # In-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///"
+test_search_backend = create_search_backend(TEST_DATABASE_URL)
+
+# Optional scratch PostgreSQL database for tests that need it; its schema
+# is dropped and recreated.
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+requires_postgres = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+
+async def reset_postgres_schema(conn) -> None:
+    """Drop and recreate the public schema of the test PostgreSQL database."""
+    # documents and document_versions reference each other, which metadata.drop_all
+    # cannot order; dropping the schema sidesteps that.
+    await conn.execute(text("DROP SCHEMA public CASCADE"))
+    await conn.execute(text("CREATE SCHEMA public"))
+
+
+@pytest.fixture(autouse=True)
+def _clear_process_caches():
+    """Keep in-process caches from leaking state between tests."""
+    auth_cache.clear_local()
+    validator_cache.clear_local()
+    verified_token_cache.clear()
+    yield
+    auth_cache.clear_local()
+    validator_cache.clear_local()
+    verified_token_cache.clear()
 
 
 @pytest.fixture(scope="session")
@@ -35,6 +70,7 @@ async def test_engine():
 
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    await test_search_backend.ensure_schema(engine)
 
     yield engine
 
@@ -60,9 +96,18 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app = create_app()
 
     async def _override_get_db():
-        yield db_session
+        # Like get_db, but the test's transaction is only flushed, never committed.
+        try:
+            yield db_session
+            await db_session.flush()
+        except Exception:
+            db_session.info.pop("after_commit", None)
+            raise
+        for callback in db_session.info.pop("after_commit", []):
+            await callback()
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_search_backend] = lambda: test_search_backend
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -89,3 +134,14 @@ def auth_headers(test_user: User) -> dict[str, str]:
     """Provide Authorization headers for the test user."""
     token = create_access_token(test_user.id)
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def test_org(db_session: AsyncSession, test_user: User) -> Organization:
+    """Create an organization owned by the test user."""
+    org = Organization(id=uuid4(), name="Test Org", slug=f"test-org-{uuid4().hex[:8]}")
+    db_session.add(org)
+    await db_session.flush()
+    db_session.add(Membership(user_id=test_user.id, organization_id=org.id, role=RoleEnum.owner))
+    await db_session.flush()
+    return org
@@ -0,0 +1,128 @@
+"""Tests for streaming audit log exports."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.modules.audit_logs.models import AuditLog
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.users.models import User
+
+START = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+async def logs(db_session: AsyncSession, test_org, test_user) -> list[AuditLog]:
+    logs = [
+        AuditLog(
+            action="document.updated" if i % 2 else "document.created",
+            resource_type="document",
+            resource_id=uuid4(),
+            user_id=test_user.id,
+            organization_id=test_org.id,
+            details={"n": i, "note": 'a, "quoted" note'} if i == 3 else None,
+            ip_address="10.0.0.1",
+            created_at=START + timedelta(hours=i),
+        )
+        for i in range(7)
+    ]
+    db_session.add_all(logs)
+    await db_session.flush()
+    return logs
+
+
+@pytest.mark.asyncio
+async def test_export_streams_ndjson_oldest_first(
+    client: AsyncClient, auth_headers, test_org, logs, monkeypatch
+):
+    """Test that every entry is exported once, in order, across several batches."""
+    monkeypatch.setattr(settings, "AUDIT_EXPORT_BATCH_SIZE", 3)
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs/export", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert [entry["id"] for entry in entries] == [str(log.id) for log in logs]
+    assert entries[3]["details"] == logs[3].details
+    assert entries[0]["created_at"].startswith("2026-03-01T00:00:00")
+
+
+@pytest.mark.asyncio
+async def test_details_filter_matches_null_only_when_present(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, test_org, test_user, logs
+):
+    """Test that a null in the details filter needs the key, and odd keys are rejected."""
+    null_n = AuditLog(
+        action="document.updated",
+        resource_type="document",
+        resource_id=uuid4(),
+        user_id=test_user.id,
+        organization_id=test_org.id,
+        details={"n": None},
+        created_at=START,
+    )
+    db_session.add(null_n)
+    await db_session.flush()
+    url = f"/api/v1/organizations/{test_org.id}/audit-logs"
+
+    async def matching(details: str) -> list[str] | int:
+        response = await client.get(url, params={"details": details}, headers=auth_headers)
+        if response.status_code != 200:
+            return response.status_code
+        return [log["id"] for log in response.json()["items"]]
+
+    assert await matching('{"n": null}') == [str(null_n.id)]
+    assert await matching('{"n": 3}') == [str(logs[3].id)]
+    assert await matching(json.dumps({"n\\": 1})) == 400
+    assert await matching(json.dumps({'a"b': 1})) == 400
+
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip_with_filters(client: AsyncClient, auth_headers, test_org, logs):
+    """Test a gzip-compressed CSV export of a time range and action."""
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs/export",
+        params={
+            "format": "csv",
+            "gzip": "true",
+            "action": "document.updated",
+            "since": (START + timedelta(hours=2)).isoformat(),
+            "until": (START + timedelta(hours=6)).isoformat(),
+        },
+        headers=auth_headers,
+    )
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.csv.gz"')
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert [row["id"] for row in rows] == [str(logs[3].id), str(logs[5].id)]
+    assert json.loads(rows[0]["details"]) == logs[3].details
+    assert rows[1]["details"] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_requires_admin(client: AsyncClient, test_org, db_session: AsyncSession):
+    """Test that members cannot export audit logs."""
+    member = User(id=uuid4(), email="member@example.com", hashed_password="x", full_name="M")
+    db_session.add(member)
+    await db_session.flush()
+    db_session.add(Membership(user_id=member.id, organization_id=test_org.id, role=RoleEnum.member))
+    await db_session.flush()
+
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs/export",
+        headers={"Authorization": f"Bearer {create_access_token(member.id)}"},
+    )
+    assert response.status_code == 403
@@ -0,0 +1,169 @@
+"""Tests for automatic audit logging of mutating routes."""
+
+import importlib.util
+import json
+import pkgutil
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from fastapi.routing import APIRoute
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.modules
+from app.core.database import commit, get_db
+from app.main import create_app
+from app.modules.audit_logs import hook
+from app.modules.audit_logs.writer import AuditWriter
+from app.modules.users.models import User
+
+# Mutating routes outside any organization, which audit logs are scoped to.
+UNAUDITED = {"/auth/register", "/auth/login", "/auth/refresh", "/users/me"}
+
+
+@pytest.fixture
+def writer(db_session: AsyncSession, monkeypatch) -> AuditWriter:
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    writer = AuditWriter(session_factory)
+    monkeypatch.setattr(hook, "audit_writer", writer)
+    return writer
+
+
+async def _audit_logs(client: AsyncClient, org_id, headers) -> list[dict]:
+    response = await client.get(f"/api/v1/organizations/{org_id}/audit-logs", headers=headers)
+    return response.json()["items"]
+
+
+def test_every_mutating_route_is_audited():
+    """Test that all POST/PATCH/DELETE routes in organizations declare an audit action."""
+    routes = []
+    for module in pkgutil.iter_modules(app.modules.__path__):
+        if importlib.util.find_spec(f"app.modules.{module.name}.router"):
+            routes += importlib.import_module(f"app.modules.{module.name}.router").router.routes
+    unaudited = {
+        route.path
+        for route in routes
+        if isinstance(route, APIRoute)
+        and route.methods & {"POST", "PATCH", "DELETE"}
+        and getattr(route, "audit", None) is None
+    }
+    assert unaudited == UNAUDITED
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_logged_after_the_request(
+    client: AsyncClient, auth_headers, writer, test_org, test_user
+):
+    """Test the logged action, resource, user and IP of a create, update and delete."""
+    url = f"/api/v1/organizations/{test_org.id}/workspaces"
+    created = await client.post(url, json={"name": "Ops", "slug": "ops"}, headers=auth_headers)
+    workspace_id = created.json()["id"]
+    await client.patch(f"{url}/{workspace_id}", json={"name": "Operations"}, headers=auth_headers)
+    await client.delete(f"{url}/{workspace_id}", headers=auth_headers)
+    missing = await client.delete(f"{url}/{uuid4()}", headers=auth_headers)
+    assert missing.status_code == 404
+
+    assert writer.metrics()["queue_depth"] == 3
+    assert await _audit_logs(client, test_org.id, auth_headers) == []
+    await writer.flush()
+
+    logs = await _audit_logs(client, test_org.id, auth_headers)
+    assert [log["action"] for log in logs] == [
+        "workspace.deleted",
+        "workspace.updated",
+        "workspace.created",
+    ]
+    assert {
+        (log["resource_type"], log["resource_id"], log["user_id"], log["ip_address"])
+        for log in logs
+    } == {("workspace", workspace_id, str(test_user.id), "127.0.0.1")}
+
+
+@pytest.mark.asyncio
+async def test_requests_whose_commit_fails_are_not_logged(
+    db_session: AsyncSession, auth_headers, writer, test_org, monkeypatch
+):
+    """Test that a 2xx response is not logged when the session then fails to commit."""
+    app = create_app()
+
+    async def _get_db():
+        # get_db's own handling, on the test's session.
+        try:
+            yield db_session
+            await commit(db_session)
+        except Exception:
+            db_session.info.pop("after_commit", None)
+            raise
+
+    async def fail():
+        raise ConnectionError("commit failed")
+
+    app.dependency_overrides[get_db] = _get_db
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    with monkeypatch.context() as patch:
+        patch.setattr(db_session, "commit", fail)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post(
+                f"/api/v1/organizations/{test_org.id}/workspaces",
+                json={"name": "Ops", "slug": "ops"},
+                headers=auth_headers,
+            )
+    assert writer.metrics()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_routes_outside_an_organization_read_it_from_the_response(
+    client: AsyncClient, auth_headers, writer
+):
+    """Test that creating an organization is logged in the new organization."""
+    response = await client.post(
+        "/api/v1/organizations", json={"name": "New Org", "slug": "new-org"}, headers=auth_headers
+    )
+    org_id = response.json()["id"]
+    await writer.flush()
+
+    (log,) = await _audit_logs(client, org_id, auth_headers)
+    assert (log["action"], log["resource_id"], log["organization_id"]) == (
+        "organization.created",
+        org_id,
+        org_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_details_are_recorded_and_filterable(
+    client: AsyncClient, auth_headers, writer, test_org, db_session: AsyncSession
+):
+    """Test that declared response fields become details that listings filter on."""
+    member = User(id=uuid4(), email="member@example.com", hashed_password="x", full_name="M")
+    db_session.add(member)
+    await db_session.flush()
+    url = f"/api/v1/organizations/{test_org.id}/members"
+    added = await client.post(url, json={"user_id": str(member.id)}, headers=auth_headers)
+    await client.patch(f"{url}/{added.json()['id']}", json={"role": "admin"}, headers=auth_headers)
+    await writer.flush()
+
+    logs = await _audit_logs(client, test_org.id, auth_headers)
+    assert [log["details"] for log in logs] == [
+        {"user_id": str(member.id), "role": "admin"},
+        {"user_id": str(member.id), "role": "member"},
+    ]
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs",
+        params={"details": json.dumps({"role": "admin"})},
+        headers=auth_headers,
+    )
+    assert [log["action"] for log in response.json()["items"]] == ["member.role_changed"]
+
+    invalid = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs",
+        params={"details": "[1, 2]"},
+        headers=auth_headers,
+    )
+    assert invalid.status_code == 400
@@ -0,0 +1,208 @@
+"""Tests for audit log partitions, retention and archives."""
+
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.core.database import commit
+from app.core.exceptions import BadRequestException
+from app.core.pagination import KeysetParams
+from app.modules.audit_logs.archive import MAINTENANCE_LOCK, AuditArchive
+from app.modules.audit_logs.models import AuditLog, AuditRestore
+from app.modules.audit_logs.partitions import (
+    add_months,
+    attached_partitions,
+    create_partitions,
+    month_of,
+    partition_name,
+)
+from app.modules.audit_logs.repository import AuditLogRepository
+from app.modules.audit_logs.retention import AuditRetention
+from app.modules.audit_logs.service import AuditLogService
+from app.modules.organizations.models import Organization
+from app.modules.users.models import User
+from tests.conftest import TEST_POSTGRES_URL, requires_postgres, reset_postgres_schema
+
+
+def _log(org_id, user_id, created_at: datetime) -> AuditLog:
+    return AuditLog(
+        action="document.updated",
+        resource_type="document",
+        resource_id=uuid4(),
+        user_id=user_id,
+        organization_id=org_id,
+        created_at=created_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_listing_filters_by_time_range(
+    client: AsyncClient, db_session: AsyncSession, auth_headers, test_org, test_user
+):
+    """Test that since is inclusive and until exclusive."""
+    times = [datetime(2026, 3, day, tzinfo=UTC) for day in (1, 2, 3, 4)]
+    db_session.add_all(_log(test_org.id, test_user.id, at) for at in times)
+    await db_session.flush()
+
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs",
+        params={"since": times[1].isoformat(), "until": times[3].isoformat()},
+        headers=auth_headers,
+    )
+    assert [item["created_at"][:10] for item in response.json()["items"]] == [
+        "2026-03-03",
+        "2026-03-02",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_restores_are_requested_explicitly(client: AsyncClient, auth_headers, test_org):
+    """Test that restores are accepted for later and that naive times are read as UTC."""
+    url = f"/api/v1/organizations/{test_org.id}/audit-logs"
+    listing = await client.get(url, params={"since": "2020-01-01T00:00:00"}, headers=auth_headers)
+    assert listing.status_code == 200
+
+    # Nothing is archived on SQLite.
+    response = await client.post(
+        f"{url}/restores", json={"since": "2020-01-01T00:00:00"}, headers=auth_headers
+    )
+    assert response.status_code == 202
+    assert response.json() == []
+    assert (await client.get(f"{url}/restores", headers=auth_headers)).json() == []
+
+
+@pytest.fixture
+async def pg_engine():
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+    await engine.dispose()
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_expired_months_are_archived_and_restored_on_demand(pg_engine, tmp_path, monkeypatch):
+    """Test the life of an old month: archived, dropped, restored for one tenant, dropped again."""
+    monkeypatch.setattr(settings, "AUDIT_RETENTION_MONTHS", 12)
+    now = datetime.now(UTC)
+    this_month = month_of(now)
+    old, older = add_months(this_month, -13), add_months(this_month, -15)
+    old_at = datetime(old.year, old.month, 2, tzinfo=UTC)
+    older_at = datetime(older.year, older.month, 2, tzinfo=UTC)
+
+    async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+        user = User(email="auditor@example.com", hashed_password="x", full_name="Auditor")
+        org = Organization(name="Org", slug="org")
+        other = Organization(name="Other", slug="other")
+        session.add_all([user, org, other])
+        await session.flush()
+        await (await session.connection()).run_sync(create_partitions, older, this_month)
+        session.add_all(
+            [
+                _log(org.id, user.id, older_at),
+                *(_log(org.id, user.id, old_at + timedelta(hours=i)) for i in range(3)),
+                _log(other.id, user.id, old_at + timedelta(days=1)),
+                _log(org.id, user.id, now),
+            ]
+        )
+        await session.commit()
+
+    archive = AuditArchive(tmp_path, pg_engine)
+    retention = AuditRetention(pg_engine, archive)
+    assert await retention.run_once()
+
+    # Months older than retention (the empty one in between too) are archived
+    # and dropped; the current month stays.
+    assert archive.archived_months() == [older, add_months(older, 1), old]
+    with gzip.open(archive.path(old), "rt") as file:
+        entries = [json.loads(line) for line in file]
+    assert [entry["created_at"][:13] for entry in entries] == [
+        (old_at + timedelta(hours=i)).isoformat()[:13] for i in (0, 1, 2, 24)
+    ]
+    assert retention.metrics()["entries_archived"] == 5
+    async with pg_engine.connect() as conn:
+        attached = await conn.run_sync(attached_partitions)
+        assert old not in attached and this_month in attached
+        assert await conn.scalar(text("SELECT count(*) FROM audit_logs")) == 1
+        assert await conn.scalar(text(f"SELECT to_regclass('{partition_name(old)}')")) is None
+
+    # Restores do not wait for the maintenance job.
+    async with pg_engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK})
+        assert await archive.restore(old, org.id) is None
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK})
+
+    async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+        service = AuditLogService(AuditLogRepository(session), session, archive=archive)
+        monkeypatch.setattr(settings, "AUDIT_ARCHIVE_RESTORE_MAX_MONTHS", 2)
+        with pytest.raises(BadRequestException):
+            await service.request_restore(org.id, older_at)
+
+        # Listings never restore; the restore runs once the request has committed.
+        page = await service.list_logs(org.id, KeysetParams(), since=old_at, until=now)
+        assert not page.items
+        restores = await service.request_restore(org.id, old_at, now)
+        assert [(restore.month, restore.restored_at) for restore in restores] == [(old, None)]
+        await commit(session)
+    await archive.join()
+    assert archive.restored == 1
+
+    async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+        service = AuditLogService(AuditLogRepository(session), session, archive=archive)
+        page = await service.list_logs(org.id, KeysetParams(), since=old_at, until=now)
+        assert len(page.items) == 3
+        assert (await service.list_restores(org.id))[0].restored_at is not None
+        # Only the requesting organization's entries are restored.
+        other_page = await service.list_logs(other.id, KeysetParams(), since=old_at, until=now)
+        assert not other_page.items
+        assert await service.request_restore(org.id, old_at, now)
+        await service.request_restore(other.id, old_at, now)
+        await commit(session)
+    await archive.join()
+    assert archive.restored == 2
+    async with pg_engine.connect() as conn:
+        counts = await conn.execute(
+            select(AuditLog.organization_id, func.count())
+            .where(AuditLog.created_at < now)
+            .group_by(AuditLog.organization_id)
+        )
+        assert dict(counts.all()) == {org.id: 3, other.id: 1}
+
+    # A restored month is dropped again after its TTL, and not archived again.
+    assert await retention.run_once(now)
+    async with pg_engine.connect() as conn:
+        assert old in await conn.run_sync(attached_partitions)
+    assert await retention.run_once(
+        now + timedelta(seconds=settings.AUDIT_ARCHIVE_RESTORE_TTL_SECONDS + 60)
+    )
+    async with pg_engine.connect() as conn:
+        assert old not in await conn.run_sync(attached_partitions)
+        assert await conn.scalar(select(func.count()).select_from(AuditLog)) == 1
+        assert not await conn.scalar(select(func.count()).select_from(AuditRestore))
+    assert retention.metrics()["months_archived"] == 3
+    assert retention.metrics()["months_dropped"] == 4
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_maintenance_runs_on_one_worker_at_a_time(pg_engine, tmp_path):
+    """Test that a pass is skipped while another worker holds the maintenance lock."""
+    first = AuditRetention(pg_engine, AuditArchive(tmp_path, pg_engine))
+    second = AuditRetention(pg_engine, AuditArchive(tmp_path, pg_engine))
+    async with pg_engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK})
+        assert not await first.run_once()
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK})
+    assert await second.run_once()
@@ -0,0 +1,177 @@
+"""Tests for audit activity rollups and the stats endpoint."""
+
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.modules.audit_logs.models import AuditRollupDaily, AuditRollupHourly
+from app.modules.audit_logs.rollups import add_to_rollups
+from app.modules.audit_logs.writer import AuditWriter
+from app.modules.organizations.models import Organization
+from app.modules.users.models import User
+from tests.conftest import TEST_POSTGRES_URL, requires_postgres, reset_postgres_schema
+
+START = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def _entry(org_id, user_id, created_at: datetime, action: str = "document.updated") -> dict:
+    return {
+        "action": action,
+        "resource_type": "document",
+        "user_id": user_id,
+        "organization_id": org_id,
+        "created_at": created_at,
+    }
+
+
+@pytest.mark.asyncio
+async def test_writer_adds_batches_to_rollups(
+    db_session: AsyncSession, monkeypatch, test_org, test_user
+):
+    """Test that each written batch is counted once per hour and per day."""
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    writer = AuditWriter(session_factory)
+    for _ in range(3):
+        writer.enqueue(
+            action="document.updated",
+            resource_type="document",
+            resource_id=uuid4(),
+            user_id=test_user.id,
+            organization_id=test_org.id,
+        )
+    await writer.flush()
+    writer.enqueue(
+        action="document.updated",
+        resource_type="document",
+        resource_id=uuid4(),
+        user_id=test_user.id,
+        organization_id=test_org.id,
+    )
+    await writer.flush()
+
+    for model in (AuditRollupHourly, AuditRollupDaily):
+        counts = (await db_session.scalars(select(model.count))).all()
+        # Unless the batches straddle midnight or the hour.
+        assert sum(counts) == 4 and len(counts) <= 2
+
+
+@pytest.mark.asyncio
+async def test_stats_read_the_rollups(
+    client: AsyncClient, db_session: AsyncSession, auth_headers, test_org, test_user
+):
+    """Test counts per day per user, per hour for one action, the range limits and naive bounds."""
+    other = User(id=uuid4(), email="other@example.com", hashed_password="x", full_name="O")
+    db_session.add(other)
+    await db_session.flush()
+    await add_to_rollups(
+        db_session,
+        [
+            _entry(test_org.id, test_user.id, START + timedelta(hours=1)),
+            _entry(test_org.id, test_user.id, START + timedelta(hours=1, minutes=30), "x.y"),
+            _entry(test_org.id, other.id, START + timedelta(hours=2)),
+            _entry(test_org.id, test_user.id, START + timedelta(days=1, hours=5)),
+        ],
+    )
+    await add_to_rollups(db_session, [_entry(test_org.id, other.id, START + timedelta(hours=3))])
+    url = f"/api/v1/organizations/{test_org.id}/audit-logs/stats"
+
+    response = await client.get(
+        url,
+        params={
+            "since": START.isoformat(),
+            "until": (START + timedelta(days=7)).isoformat(),
+            "group_by": "user_id",
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert {
+        (item["bucket"][:10], item["user_id"], item["count"]) for item in response.json()["items"]
+    } == {
+        ("2026-03-01", str(test_user.id), 2),
+        ("2026-03-01", str(other.id), 2),
+        ("2026-03-02", str(test_user.id), 1),
+    }
+
+    response = await client.get(
+        url,
+        params={
+            "granularity": "hour",
+            "action": "document.updated",
+            "since": (START + timedelta(minutes=20)).isoformat(),
+            "until": (START + timedelta(hours=3)).isoformat(),
+        },
+        headers=auth_headers,
+    )
+    body = response.json()
+    assert body["since"].startswith("2026-03-01T00:00:00")
+    assert [(item["bucket"][11:16], item["count"], item["action"]) for item in body["items"]] == [
+        ("01:00", 1, None),
+        ("02:00", 1, None),
+    ]
+
+    too_long = await client.get(
+        url,
+        params={"granularity": "hour", "since": START.isoformat()},
+        headers=auth_headers,
+    )
+    assert too_long.status_code == 400
+
+    naive = await client.get(
+        url, params={"until": "2026-03-03T00:00:00", "since": "2026-03-01"}, headers=auth_headers
+    )
+    assert naive.status_code == 200
+    assert naive.json()["until"].startswith("2026-03-03T00:00:00Z")
+    assert sum(item["count"] for item in naive.json()["items"]) == 5
+
+
+@pytest.fixture
+async def pg_engine():
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+    await engine.dispose()
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_rollups_add_up_on_postgres(pg_engine):
+    """Test that batches from separate transactions add to the same rows."""
+    session_factory = async_sessionmaker(pg_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        user = User(email="pg@example.com", hashed_password="x", full_name="PG")
+        org = Organization(name="PG", slug="pg")
+        session.add_all([user, org])
+        await session.commit()
+
+    for batch in range(3):
+        async with session_factory() as session:
+            entries = [
+                _entry(org.id, user.id, START + timedelta(minutes=10 * i + batch))
+                for i in range(batch + 1)
+            ]
+            await add_to_rollups(session, entries)
+            await session.commit()
+
+    async with session_factory() as session:
+        hourly = await session.execute(
+            select(AuditRollupHourly.bucket, AuditRollupHourly.count).order_by("bucket")
+        )
+        assert hourly.all() == [(START, 6)]
+        daily = await session.scalar(select(func.sum(AuditRollupDaily.count)))
+        assert daily == 6
@@ -0,0 +1,180 @@
+"""Tests for the live audit log stream."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import redis as redis_module
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.dependencies import has_role
+from app.modules.audit_logs import writer as writer_module
+from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.repository import AuditLogRepository
+from app.modules.audit_logs.service import AuditLogService
+from app.modules.audit_logs.stream import AuditStream
+from app.modules.audit_logs.writer import AuditWriter
+from app.modules.auth.cache import invalidate_membership
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.users.models import User
+
+START = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_module, "redis_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def stream(redis, monkeypatch) -> AuditStream:
+    stream = AuditStream()
+    monkeypatch.setattr(writer_module, "audit_stream", stream)
+    stream.start()
+    yield stream
+    await stream.stop()
+
+
+def _data(event: str) -> dict:
+    return json.loads(event.split("data: ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_written_entries_reach_the_streams(
+    db_session: AsyncSession, monkeypatch, stream, test_org, test_user
+):
+    """Test that a committed batch is published and handed to the organization's streams."""
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    writer = AuditWriter(session_factory)
+    await asyncio.sleep(0.1)  # let the subscription start
+    async with stream.listen(test_org.id) as listener, stream.listen(uuid4()) as other:
+        log_id = writer.enqueue(
+            action="document.updated",
+            resource_type="document",
+            resource_id=uuid4(),
+            user_id=test_user.id,
+            organization_id=test_org.id,
+            details={"fields": ["title"]},
+        )
+        await writer.flush()
+        assert await listener.wait(2)
+
+        (event,) = listener.entries
+        assert event.startswith(f"id: {log_id}\nevent: audit\n")
+        assert _data(event)["details"] == {"fields": ["title"]}
+        assert not other.entries
+    assert stream.metrics()["streams"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_streams_are_closed(monkeypatch):
+    """Test that a stream whose buffer is full is closed instead of growing."""
+    monkeypatch.setattr(settings, "AUDIT_STREAM_BUFFER_SIZE", 2)
+    stream, org_id = AuditStream(), uuid4()
+    async with stream.listen(org_id) as slow, stream.listen(org_id) as fast:
+        for i in range(3):
+            stream.dispatch(f"audit:{org_id}", f"id: {i}\n\n")
+            fast.entries.clear()
+
+        assert slow.closed and not slow.entries
+        assert not fast.closed
+        assert stream.metrics()["overflows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnecting_replays_missed_entries(
+    db_session: AsyncSession, redis, test_org, test_user, monkeypatch
+):
+    """Test resuming after an event id, skipping it and resetting when too much was missed."""
+    logs = [
+        AuditLog(
+            action="document.updated",
+            resource_type="document",
+            resource_id=uuid4(),
+            user_id=test_user.id,
+            organization_id=test_org.id,
+            created_at=START + timedelta(minutes=i),
+        )
+        for i in range(4)
+    ]
+    db_session.add_all(logs)
+    await db_session.flush()
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    stream = AuditStream()
+    service = AuditLogService(AuditLogRepository(db_session), db_session, stream=stream)
+
+    events = service.stream_logs(test_org.id, logs[1].id)
+    assert await anext(events) == "retry: 3000\n\n"
+    replayed = [_data(await anext(events))["id"] for _ in range(2)]
+    assert replayed == [str(logs[2].id), str(logs[3].id)]
+    await events.aclose()
+
+    monkeypatch.setattr(settings, "AUDIT_STREAM_REPLAY_MAX", 1)
+    events = service.stream_logs(test_org.id, logs[1].id)
+    await anext(events)
+    assert (await anext(events)).startswith("event: reset\n")
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_requires_admin(client: AsyncClient, test_org, db_session: AsyncSession):
+    """Test that members cannot watch the audit log."""
+    member = User(id=uuid4(), email="member@example.com", hashed_password="x", full_name="M")
+    db_session.add(member)
+    await db_session.flush()
+    db_session.add(Membership(user_id=member.id, organization_id=test_org.id, role=RoleEnum.member))
+    await db_session.flush()
+
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/audit-logs/stream",
+        headers={"Authorization": f"Bearer {create_access_token(member.id)}"},
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_once_access_is_lost(
+    db_session: AsyncSession, monkeypatch, test_org, test_user
+):
+    """Test that a stream stops sending entries once its user is demoted."""
+    admin = User(id=uuid4(), email="admin@example.com", hashed_password="x", full_name="A")
+    db_session.add(admin)
+    await db_session.flush()
+    membership = Membership(user_id=admin.id, organization_id=test_org.id, role=RoleEnum.admin)
+    db_session.add(membership)
+    await db_session.flush()
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    monkeypatch.setattr(settings, "AUDIT_STREAM_ACCESS_CHECK_SECONDS", 0)
+    stream = AuditStream()
+    service = AuditLogService(AuditLogRepository(db_session), db_session, stream=stream)
+
+    async def has_access() -> bool:
+        return await has_role(db_session, admin.id, test_org.id, RoleEnum.owner, RoleEnum.admin)
+
+    events = service.stream_logs(test_org.id, has_access=has_access)
+    await anext(events)
+    stream.dispatch(f"audit:{test_org.id}", "id: 1\n\n")
+    assert await anext(events) == "id: 1\n\n"
+
+    membership.role = RoleEnum.member
+    await db_session.flush()
+    await invalidate_membership(admin.id, test_org.id)
+    stream.dispatch(f"audit:{test_org.id}", "id: 2\n\n")
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+    assert stream.metrics()["streams"] == 0
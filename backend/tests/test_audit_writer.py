@@ -0,0 +1,180 @@
+"""Tests for the batched audit log writer."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.repository import AuditLogRepository
+from app.modules.audit_logs.schemas import AuditLogCreate
+from app.modules.audit_logs.service import AuditLogService
+from app.modules.audit_logs.writer import AuditWriter
+
+
+@pytest.fixture
+def writer(db_session: AsyncSession, monkeypatch) -> AuditWriter:
+    # Batches commit; keep them inside the test's transaction.
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    return AuditWriter(session_factory)
+
+
+def _log(test_org, test_user) -> dict:
+    return {
+        "action": "document.updated",
+        "resource_type": "document",
+        "resource_id": uuid4(),
+        "user_id": test_user.id,
+        "organization_id": test_org.id,
+    }
+
+
+async def _count(db_session: AsyncSession) -> int:
+    return await db_session.scalar(select(func.count()).select_from(AuditLog))
+
+
+@pytest.mark.asyncio
+async def test_log_action_is_written_in_batches(
+    db_session: AsyncSession, writer, test_org, test_user, monkeypatch
+):
+    """Test that logged actions are queued and inserted by a later flush."""
+    monkeypatch.setattr(settings, "AUDIT_BATCH_SIZE", 2)
+    service = AuditLogService(AuditLogRepository(db_session), db_session, writer)
+    ids = [
+        service.log_action(
+            test_org.id,
+            test_user.id,
+            AuditLogCreate(
+                action="document.created", resource_type="document", resource_id=uuid4()
+            ),
+        )
+        for _ in range(5)
+    ]
+    assert await _count(db_session) == 0
+    assert writer.metrics()["queue_depth"] == 5
+
+    assert await writer.flush() == 5
+    stored = await db_session.scalars(select(AuditLog.id))
+    assert set(stored) == set(ids)
+    assert writer.metrics() == {
+        "queue_depth": 0,
+        "queue_capacity": settings.AUDIT_QUEUE_MAX_SIZE,
+        "enqueued": 5,
+        "written": 5,
+        "batches": 3,
+        "dropped": 0,
+        "failures": 0,
+        "dead_lettered": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_written_before_the_interval(
+    db_session: AsyncSession, writer, test_org, test_user, monkeypatch
+):
+    """Test that reaching the batch size wakes the writer, and stop drains the rest."""
+    monkeypatch.setattr(settings, "AUDIT_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "AUDIT_FLUSH_INTERVAL_SECONDS", 60)
+    writer.start()
+    for _ in range(4):
+        writer.enqueue(**_log(test_org, test_user))
+    for _ in range(100):
+        if writer.written == 4:
+            break
+        await asyncio.sleep(0.01)
+    assert writer.written == 4  # the wakeup flushes everything queued, well before the interval
+
+    writer.enqueue(**_log(test_org, test_user))
+    await writer.stop()
+    assert await _count(db_session) == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried_and_overflow_dropped(
+    db_session: AsyncSession, writer, test_org, test_user, monkeypatch
+):
+    """Test that a failed batch stays queued and a full queue drops new entries."""
+    monkeypatch.setattr(settings, "AUDIT_QUEUE_MAX_SIZE", 2)
+    assert writer.enqueue(**_log(test_org, test_user))
+    assert writer.enqueue(**_log(test_org, test_user))
+    assert not writer.enqueue(**_log(test_org, test_user))
+
+    async def fail(*_args, **_kwargs):
+        raise ConnectionError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db_session, "execute", fail)
+        assert await writer.flush() == 0
+    assert writer.metrics()["queue_depth"] == 2
+
+    assert await writer.flush() == 2
+    assert await _count(db_session) == 2
+    assert (writer.dropped, writer.failures) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_rows_that_keep_failing_are_dead_lettered(
+    db_session: AsyncSession, writer, test_org, test_user, monkeypatch
+):
+    """Test that a batch failing on one bad row is written row by row after a few attempts."""
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MAX_ATTEMPTS", 2)
+    execute = db_session.execute
+
+    async def reject_bad_rows(statement, params=None, **kwargs):
+        if isinstance(params, list) and any(row["action"] == "bad" for row in params):
+            raise IntegrityError("INSERT", None, Exception("violates foreign key constraint"))
+        return await execute(statement, params, **kwargs)
+
+    monkeypatch.setattr(db_session, "execute", reject_bad_rows)
+    writer.enqueue(**_log(test_org, test_user))
+    writer.enqueue(**(_log(test_org, test_user) | {"action": "bad"}))
+    writer.enqueue(**_log(test_org, test_user))
+
+    assert await writer.flush() == 0
+    assert writer.metrics()["queue_depth"] == 3
+    assert await writer.flush() == 3
+    assert await _count(db_session) == 2
+    assert writer.metrics()["queue_depth"] == 0
+    assert (writer.written, writer.dead_lettered, writer.failures) == (2, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_rows_failing_with_any_error_are_dead_lettered_unless_the_database_is_down(
+    db_session: AsyncSession, writer, test_org, test_user, monkeypatch
+):
+    """Test that a row failing on its own is set aside, and an outage dead-letters nothing."""
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MAX_ATTEMPTS", 1)
+    execute = db_session.execute
+
+    async def fail(*_args, **_kwargs):
+        raise ConnectionError("database unavailable")
+
+    async def reject_bad_rows(statement, params=None, **kwargs):
+        if isinstance(params, list) and any(row["action"] == "bad" for row in params):
+            raise ProgrammingError("INSERT", None, Exception("cannot adapt type"))
+        return await execute(statement, params, **kwargs)
+
+    writer.enqueue(**_log(test_org, test_user))
+    writer.enqueue(**(_log(test_org, test_user) | {"action": "bad"}))
+    with monkeypatch.context() as patch:
+        patch.setattr(db_session, "execute", fail)
+        assert await writer.flush() == 0
+        assert await writer.flush() == 0
+    assert writer.metrics()["queue_depth"] == 2
+    assert writer.dead_lettered == 0
+
+    monkeypatch.setattr(db_session, "execute", reject_bad_rows)
+    assert await writer.flush() == 2
+    assert await _count(db_session) == 1
+    assert writer.metrics()["queue_depth"] == 0
+    assert (writer.written, writer.dead_lettered) == (1, 1)
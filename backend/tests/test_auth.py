@@ -2,8 +2,19 @@
 Authentication endpoint tests.
 """
 
+from uuid import uuid4
+
 import pytest
 from httpx import AsyncClient
+from jose import JWTError
+
+from app.core import security
+from app.core.security import (
+    create_access_token,
+    decode_token_cached,
+    password_hash_pool,
+    verified_token_cache,
+)
 
 
 @pytest.mark.asyncio
@@ -231,3 +242,37 @@ async def test_refresh_empty_token(client: AsyncClient):
         json={"refresh_token": ""},
     )
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_when_hash_pool_saturated(client: AsyncClient, test_user, monkeypatch):
+    """Test that logins get 429 instead of queueing when the hash pool is full."""
+    monkeypatch.setattr(password_hash_pool, "in_flight", password_hash_pool.capacity)
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword123"},
+    )
+    assert response.status_code == 429
+
+
+def test_verified_token_cache_expires_with_token(monkeypatch):
+    """Test that cached claims are served until, and only until, the token's exp."""
+    token = create_access_token(uuid4())
+    claims = decode_token_cached(token)
+
+    assert verified_token_cache.get(token) == claims
+
+    real_time = security.time.time
+    monkeypatch.setattr(security.time, "time", lambda: claims["exp"])
+    assert verified_token_cache.get(token) is None
+    monkeypatch.setattr(security.time, "time", real_time)
+    assert verified_token_cache.get(token) is None
+
+
+def test_tampered_token_is_not_served_from_cache():
+    """Test that only the exact verified token string hits the cache."""
+    token = create_access_token(uuid4())
+    decode_token_cached(token)
+
+    with pytest.raises(JWTError):
+        decode_token_cached(token[:-2] + ("AA" if token[-2:] != "AA" else "BB"))
@@ -0,0 +1,95 @@
+"""
+Auth cache tests.
+"""
+
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core import redis as redis_module
+from app.core.cache import TwoTierCache
+from app.core.database import commit
+from app.core.security import create_access_token
+from app.modules.auth.cache import cache_membership, get_cached_membership, invalidate_membership
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.users.models import User
+from app.modules.workspaces.models import Workspace
+
+
+class _DownRedis:
+    """Redis stand-in whose every command fails like an unreachable server."""
+
+    calls = 0
+
+    async def get(self, *_args, **_kwargs):
+        self.calls += 1
+        raise RedisConnectionError("connection refused")
+
+    set = delete = get
+
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_degrades_when_redis_is_down(monkeypatch):
+    """Test that Redis errors become misses and Redis is bypassed afterwards."""
+    down = _DownRedis()
+    monkeypatch.setattr(redis_module, "redis_client", down)
+    cache = TwoTierCache("test", maxsize=10, local_ttl=60, remote_ttl=60)
+
+    assert await cache.get("a") is None
+    await cache.set("a", {"x": 1})
+    assert await cache.get("a") == {"x": 1}
+    assert await cache.get("b") is None
+
+    assert down.calls == 1
+    assert cache.stats.remote_errors == 1
+    assert cache.stats.local_hits == 1
+    assert cache.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_cached_membership(
+    client: AsyncClient, test_org, auth_headers, db_session
+):
+    """Test that demoting a member takes effect on their next request."""
+    member = User(id=uuid4(), email="member@example.com", hashed_password="x", full_name="M")
+    db_session.add(member)
+    await db_session.flush()
+    membership = Membership(user_id=member.id, organization_id=test_org.id, role=RoleEnum.member)
+    workspace = Workspace(name="Docs", slug="docs", organization_id=test_org.id)
+    db_session.add_all([membership, workspace])
+    await db_session.flush()
+
+    member_headers = {"Authorization": f"Bearer {create_access_token(member.id)}"}
+    documents_url = f"/api/v1/organizations/{test_org.id}/documents"
+    payload = {"title": "Runbook", "workspace_id": str(workspace.id)}
+
+    assert (
+        await client.post(documents_url, json=payload, headers=member_headers)
+    ).status_code == 201
+
+    demoted = await client.patch(
+        f"/api/v1/organizations/{test_org.id}/members/{membership.id}",
+        json={"role": "viewer"},
+        headers=auth_headers,
+    )
+    assert demoted.status_code == 200
+
+    assert (
+        await client.post(documents_url, json=payload, headers=member_headers)
+    ).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_membership_invalidated_again_on_commit(db_session, monkeypatch, test_org):
+    """Test that a membership cached by a request racing its removal is dropped on commit."""
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    membership = Membership(user_id=uuid4(), organization_id=test_org.id, role=RoleEnum.admin)
+
+    await invalidate_membership(membership.user_id, test_org.id, db_session)
+    await cache_membership(membership)  # read before the commit
+    assert await get_cached_membership(membership.user_id, test_org.id) is not None
+
+    await commit(db_session)
+    assert await get_cached_membership(membership.user_id, test_org.id) is None
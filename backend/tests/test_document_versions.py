@@ -0,0 +1,539 @@
+"""Tests for content-addressed, delta-compressed document version storage and numbering."""
+
+import asyncio
+import hashlib
+import random
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.modules.document_versions.compaction import train_dictionary
+from app.modules.document_versions.models import ContentBlob, DocumentVersion
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.document_versions.schemas import DocumentVersionCreate
+from app.modules.document_versions.service import DocumentVersionService
+from app.modules.document_versions.storage import (
+    VersionStorage,
+    apply_delta,
+    dictionary_cache,
+    encode_delta,
+    keyframe_cache,
+)
+from app.modules.documents.models import Document
+from app.modules.documents.repository import DocumentRepository
+from app.modules.organizations.models import Organization
+from app.modules.search.backends import PostgresSearchBackend
+from app.modules.search.repository import SearchRepository
+from app.modules.users.models import User
+from app.modules.workspaces.models import Workspace
+from tests.conftest import (
+    TEST_POSTGRES_URL,
+    requires_postgres,
+    reset_postgres_schema,
+    test_search_backend,
+)
+
+EDITS = [
+    "# Runbook\n\nRestart the worker.\n",
+    "# Runbook\n\nDrain the queue.\nRestart the worker.\n",
+    "# Runbook\n\nDrain the queue.\nRestart the worker.\nCheck the dashboard.",
+    "# Runbook v2\n\nDrain the queue.\nRestart the worker.\nCheck the dashboard.\n",
+    "",
+    "Rewritten from scratch.\r\nWindows line endings.\r\n",
+    "Rewritten from scratch.\r\nWindows line endings, ünïcode.\r\n",
+]
+
+
+WORDS = "deploy restart drain queue worker rollback verify dashboard alert replica".split()  # noqa: SIM905
+
+
+@pytest.fixture(autouse=True)
+def _version_storage(monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_KEYFRAME_INTERVAL", 3)
+    monkeypatch.setattr(settings, "VERSION_COMPRESSION_ENABLED", False)
+    keyframe_cache.clear()
+    dictionary_cache.clear()
+    yield
+    keyframe_cache.clear()
+    dictionary_cache.clear()
+
+
+@pytest.fixture
+def compression(monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(settings, "VERSION_COMPRESSION_MIN_BYTES", 200)
+
+
+def _service(db_session: AsyncSession) -> DocumentVersionService:
+    return DocumentVersionService(
+        DocumentVersionRepository(db_session),
+        DocumentRepository(db_session),
+        SearchRepository(db_session, test_search_backend),
+        db_session,
+    )
+
+
+def _markdown(rng: random.Random, lines: int) -> str:
+    return "# Runbook\n\n" + "".join(
+        f"- {' '.join(rng.choices(WORDS, k=8))}\n" for _ in range(lines)
+    )
+
+
+@pytest.fixture
+async def document(db_session: AsyncSession, test_org, test_user) -> Document:
+    workspace = Workspace(name="Docs", slug=f"docs-{uuid4().hex[:8]}", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    document = Document(
+        title="Runbook",
+        workspace_id=workspace.id,
+        organization_id=test_org.id,
+        created_by=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.flush()
+    return document
+
+
+def _versions_url(document: Document) -> str:
+    return f"/api/v1/organizations/{document.organization_id}/documents/{document.id}/versions"
+
+
+async def _stored(db_session: AsyncSession, document: Document) -> list[DocumentVersion]:
+    result = await db_session.execute(
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == document.id)
+        .order_by(DocumentVersion.version_number)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+async def _blobs(db_session: AsyncSession, document: Document) -> list[ContentBlob]:
+    """Return the blob of each version of a document, in version order."""
+    result = await db_session.execute(
+        select(ContentBlob)
+        .join(DocumentVersion, DocumentVersion.blob_id == ContentBlob.id)
+        .where(DocumentVersion.document_id == document.id)
+        .order_by(DocumentVersion.version_number)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+async def _save(client: AsyncClient, auth_headers, document: Document, content: str, **extra):
+    return await client.post(
+        _versions_url(document),
+        json={"title": document.title, "content": content, **extra},
+        headers=auth_headers,
+    )
+
+
+async def _contents(client: AsyncClient, auth_headers, document: Document) -> list[str]:
+    """Return the content of every version of a document, newest first."""
+    response = await client.get(_versions_url(document), headers=auth_headers)
+    contents = []
+    for item in response.json()["items"]:
+        version = await client.get(f"{_versions_url(document)}/{item['id']}", headers=auth_headers)
+        contents.append(version.json()["content"])
+    return contents
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [(EDITS[i], EDITS[i + 1]) for i in range(len(EDITS) - 1)]
+    + [("", "a\nb"), ("a\nb", "a\nb\n"), ("x\n" * 5, "y\n" + "x\n" * 5 + "z")],
+)
+def test_delta_round_trip(old, new):
+    """Test that applying a delta to the old lines reproduces the new content."""
+    delta = encode_delta(old, new)
+    assert "".join(apply_delta(old.splitlines(keepends=True), delta)) == new
+
+
+def test_delta_copies_unchanged_lines():
+    """Test that a one-line edit of a long document produces a small delta."""
+    old = "".join(f"line {i}\n" for i in range(1000))
+    new = old.replace("line 500\n", "line five hundred\n")
+    assert encode_delta(old, new) == '[[0,500],"line five hundred\\n",[501,1000]]'
+
+
+@pytest.mark.asyncio
+async def test_versions_are_stored_as_blob_chains(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document
+):
+    """Test the storage layout: keyframes every N blobs, content copy only on the latest."""
+    for content in EDITS:
+        response = await _save(client, auth_headers, document, content)
+        assert response.status_code == 201
+        assert response.json()["content"] == content
+
+    blobs = await _blobs(db_session, document)
+    assert [(b.storage, b.depth) for b in blobs] == [
+        (VersionStorage.keyframe, 0),
+        (VersionStorage.delta, 1),
+        (VersionStorage.delta, 2),
+        (VersionStorage.keyframe, 0),
+        (VersionStorage.delta, 1),
+        (VersionStorage.delta, 2),
+        (VersionStorage.keyframe, 0),
+    ]
+    assert [b.base_blob_id for b in blobs[1:3]] == [blobs[0].id, blobs[1].id]
+    stored = await _stored(db_session, document)
+    assert [v.content is not None for v in stored] == [False] * 6 + [True]
+
+
+@pytest.mark.asyncio
+async def test_reverts_share_blobs(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document
+):
+    """Test that saving earlier content again references the existing blob."""
+    contents = ["first draft\n", "second draft\n", "first draft\n", "second draft\n"]
+    for content in contents:
+        await _save(client, auth_headers, document, content)
+
+    blobs = await _blobs(db_session, document)
+    assert [b.id for b in blobs] == [blobs[0].id, blobs[1].id] * 2
+    # Two versions each, plus the delta of the second blob for the first.
+    assert [b.ref_count for b in blobs[:2]] == [3, 2]
+
+    assert await _contents(client, auth_headers, document) == contents[::-1]
+
+
+@pytest.mark.asyncio
+async def test_skip_unchanged_saves(client: AsyncClient, auth_headers, document):
+    """Test that an unchanged save returns the current version when asked to."""
+    first = await _save(client, auth_headers, document, "notes\n")
+    assert first.status_code == 201
+
+    skipped = await _save(client, auth_headers, document, "notes\n", skip_unchanged=True)
+    assert skipped.status_code == 200
+    assert skipped.json()["id"] == first.json()["id"]
+
+    renamed = await client.post(
+        _versions_url(document),
+        json={"title": "Renamed", "content": "notes\n", "skip_unchanged": True},
+        headers=auth_headers,
+    )
+    assert renamed.status_code == 201
+    assert renamed.json()["version_number"] == 2
+
+    again = await _save(client, auth_headers, document, "notes\n")
+    assert again.status_code == 201
+    assert again.json()["version_number"] == 3
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_document_releases_its_blobs(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user
+):
+    """Test that blobs are deleted once no version references them."""
+    other = Document(
+        title="Copy",
+        workspace_id=document.workspace_id,
+        organization_id=document.organization_id,
+        created_by=test_user.id,
+    )
+    db_session.add(other)
+    await db_session.flush()
+    for content in ("shared intro\n", "shared intro\nwith a unique ending\n"):
+        await _save(client, auth_headers, document, content)
+    await _save(client, auth_headers, other, "shared intro\n")
+    shared, unique = await _blobs(db_session, document)
+
+    response = await client.delete(
+        f"/api/v1/organizations/{document.organization_id}/documents/{document.id}",
+        headers=auth_headers,
+    )
+    assert response.status_code == 204
+
+    remaining = (await db_session.execute(select(ContentBlob.id, ContentBlob.ref_count))).all()
+    assert remaining == [(shared.id, 1)]
+    assert unique.id not in {row.id for row in remaining}
+    search = f"/api/v1/organizations/{document.organization_id}/search"
+    response = await client.get(search, params={"q": "unique"}, headers=auth_headers)
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_every_version_reads_back(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document
+):
+    """Test that every version reads back exactly as written."""
+    ids = []
+    for content in EDITS[:6]:
+        response = await _save(client, auth_headers, document, content)
+        ids.append(response.json()["id"])
+
+    for version_id, content in zip(ids, EDITS, strict=False):
+        response = await client.get(f"{_versions_url(document)}/{version_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["content"] == content
+
+    keyframe_cache.clear()
+    assert await _contents(client, auth_headers, document) == EDITS[:6][::-1]
+
+
+@pytest.mark.asyncio
+async def test_listing_returns_summaries_without_content(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user
+):
+    """Test that version listings carry the content's length and hash, not the content."""
+    db_session.add(
+        DocumentVersion(
+            document_id=document.id,
+            version_number=1,
+            title=document.title,
+            content="written before blobs\n",
+            created_by=test_user.id,
+            organization_id=document.organization_id,
+        )
+    )
+    document.version_count = 1
+    await db_session.flush()
+    for content in EDITS[:3]:
+        await _save(client, auth_headers, document, content)
+
+    response = await client.get(_versions_url(document), headers=auth_headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert all("content" not in item for item in items)
+    assert [(item["version_number"], item["content_length"]) for item in items] == [
+        (4, len(EDITS[2])),
+        (3, len(EDITS[1])),
+        (2, len(EDITS[0])),
+        (1, len("written before blobs\n")),
+    ]
+    assert [item["content_hash"] for item in items] == [
+        *(hashlib.sha256(content.encode()).hexdigest() for content in EDITS[2::-1]),
+        None,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compaction_converts_legacy_keyframes(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user
+):
+    """Test that compaction moves full-content history into blob chains losslessly."""
+    for number, content in enumerate(EDITS, start=1):
+        db_session.add(
+            DocumentVersion(
+                document_id=document.id,
+                version_number=number,
+                title=document.title,
+                content=content,
+                created_by=test_user.id,
+                organization_id=document.organization_id,
+            )
+        )
+    document.version_count = len(EDITS)
+    await db_session.flush()
+
+    service = _service(db_session)
+    assert await service.compact_document(document.id, document.organization_id, batch_size=2) == 7
+    assert await service.compact_document(document.id, document.organization_id) == 0
+
+    stored = await _stored(db_session, document)
+    assert [v.content is not None for v in stored] == [False] * 6 + [True]
+    blobs = await _blobs(db_session, document)
+    assert [b.depth for b in blobs] == [0, 1, 2, 0, 1, 2, 0]
+    assert await _contents(client, auth_headers, document) == EDITS[::-1]
+
+
+@pytest.mark.asyncio
+async def test_search_follows_delta_versions(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document
+):
+    """Test that the search index moves correctly when older content is dropped."""
+    for content in ("alpha release notes", "beta release notes", "gamma release notes"):
+        await _save(client, auth_headers, document, content)
+
+    search = f"/api/v1/organizations/{document.organization_id}/search"
+    for term, hits in (("alpha", 0), ("beta", 0), ("gamma", 1)):
+        response = await client.get(search, params={"q": term}, headers=auth_headers)
+        assert len(response.json()["items"]) == hits
+
+
+@pytest.mark.asyncio
+async def test_large_history_bodies_are_compressed(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, compression
+):
+    """Test that large keyframes and deltas are stored compressed."""
+    rng = random.Random(1)
+    contents = [_markdown(rng, 40)]
+    contents.append(contents[-1] + "- one more line\n")
+    contents.append(_markdown(rng, 40))  # rewrite: a large delta
+    contents.append(contents[-1].replace("deploy", "ship", 1))
+    contents.append(contents[-1] + "- tail\n")
+    for content in contents:
+        await _save(client, auth_headers, document, content)
+
+    blobs = await _blobs(db_session, document)
+    assert [(b.storage, b.body is not None, b.compressed is not None) for b in blobs] == [
+        (VersionStorage.keyframe, False, True),
+        (VersionStorage.delta, True, False),  # small delta stays plain
+        (VersionStorage.delta, False, True),  # large delta
+        (VersionStorage.keyframe, False, True),
+        (VersionStorage.delta, True, False),
+    ]
+
+    assert await _contents(client, auth_headers, document) == contents[::-1]
+
+
+@pytest.mark.asyncio
+async def test_dictionary_compression(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user, compression
+):
+    """Test that a trained dictionary is used for new writes and by compaction."""
+    rng = random.Random(2)
+    for i in range(60):
+        other = Document(
+            title=f"Doc {i}",
+            workspace_id=document.workspace_id,
+            organization_id=document.organization_id,
+            created_by=test_user.id,
+        )
+        db_session.add(other)
+        await db_session.flush()
+        version = DocumentVersion(
+            document_id=other.id,
+            version_number=1,
+            title=other.title,
+            content=_markdown(rng, 20),
+            created_by=test_user.id,
+            organization_id=document.organization_id,
+        )
+        db_session.add(version)
+        await db_session.flush()
+        other.current_version_id = version.id
+    await db_session.flush()
+
+    contents = [_markdown(rng, 30) for _ in range(4)]
+    for content in contents[:2]:
+        await _save(client, auth_headers, document, content)
+    dictionary = await train_dictionary(
+        db_session, document.organization_id, size=4096, samples=100
+    )
+    for content in contents[2:]:
+        await _save(client, auth_headers, document, content)
+
+    blobs = await _blobs(db_session, document)
+    assert [b.compression_dictionary_id for b in blobs] == [
+        None,
+        None,
+        dictionary.id,
+        dictionary.id,
+    ]
+
+    service = _service(db_session)
+    assert await service.compact_document(document.id, document.organization_id) == 2
+    blobs = await _blobs(db_session, document)
+    assert [b.compression_dictionary_id for b in blobs] == [dictionary.id] * 4
+
+    dictionary_cache.clear()
+    keyframe_cache.clear()
+    assert await _contents(client, auth_headers, document) == contents[::-1]
+
+
+@pytest.mark.asyncio
+async def test_version_numbers_come_from_the_document_counter(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user
+):
+    """Test that versions are numbered by the document's counter and never reuse a number."""
+    for content in EDITS[:3]:
+        await _save(client, auth_headers, document, content)
+    await db_session.refresh(document)
+    assert document.version_count == 3
+    assert [v.version_number for v in await _stored(db_session, document)] == [1, 2, 3]
+
+    with pytest.raises(IntegrityError):
+        async with db_session.begin_nested():
+            db_session.add(
+                DocumentVersion(
+                    document_id=document.id,
+                    version_number=3,
+                    title=document.title,
+                    content="duplicate\n",
+                    created_by=test_user.id,
+                    organization_id=document.organization_id,
+                )
+            )
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_concurrent_saves_get_distinct_numbers():
+    """Test that parallel saves to one document are numbered 1..n without gaps or duplicates."""
+    saves = 200
+    engine = create_async_engine(TEST_POSTGRES_URL, pool_size=20, max_overflow=0)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        async with session_factory() as session:
+            user = User(email="writer@example.com", hashed_password="x", full_name="Writer")
+            org = Organization(name="Org", slug="org")
+            session.add_all([user, org])
+            await session.flush()
+            workspace = Workspace(name="Docs", slug="docs", organization_id=org.id)
+            session.add(workspace)
+            await session.flush()
+            document = Document(
+                title="Runbook",
+                workspace_id=workspace.id,
+                organization_id=org.id,
+                created_by=user.id,
+            )
+            session.add(document)
+            await session.commit()
+
+        async def save(i: int) -> None:
+            async with session_factory() as session:
+                service = DocumentVersionService(
+                    DocumentVersionRepository(session),
+                    DocumentRepository(session),
+                    SearchRepository(session, PostgresSearchBackend()),
+                    session,
+                )
+                await service.create_version(
+                    document.id,
+                    org.id,
+                    user.id,
+                    DocumentVersionCreate(title="Runbook", content=f"{EDITS[1]}save {i}\n"),
+                )
+                await session.commit()
+
+        await asyncio.gather(*(save(i) for i in range(saves)))
+
+        async with session_factory() as session:
+            numbers = (
+                await session.scalars(
+                    select(DocumentVersion.version_number)
+                    .where(DocumentVersion.document_id == document.id)
+                    .order_by(DocumentVersion.version_number)
+                )
+            ).all()
+            assert numbers == list(range(1, saves + 1))
+            stored = await session.get(Document, document.id)
+            assert stored.version_count == saves
+            current = await session.get(DocumentVersion, stored.current_version_id)
+            assert current.version_number == saves
+            indexed = (
+                await session.scalars(
+                    select(DocumentVersion.id).where(
+                        DocumentVersion.document_id == document.id,
+                        DocumentVersion.__table__.c.search_vector.is_not(None),
+                    )
+                )
+            ).all()
+            assert indexed == [current.id]
+    finally:
+        async with engine.begin() as conn:
+            await reset_postgres_schema(conn)
+        await engine.dispose()
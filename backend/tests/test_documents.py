@@ -0,0 +1,96 @@
+"""Tests for document reads."""
+
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.documents.models import Document
+from app.modules.workspaces.models import Workspace
+
+
+@pytest.fixture
+async def document(db_session: AsyncSession, test_org, test_user) -> Document:
+    workspace = Workspace(name="Docs", slug=f"docs-{uuid4().hex[:8]}", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    document = Document(
+        title="Runbook",
+        workspace_id=workspace.id,
+        organization_id=test_org.id,
+        created_by=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.flush()
+    return document
+
+
+def _document_url(document: Document) -> str:
+    return f"/api/v1/organizations/{document.organization_id}/documents/{document.id}"
+
+
+@pytest.mark.asyncio
+async def test_get_document_includes_current_content_in_one_query(
+    client: AsyncClient, auth_headers, test_engine, document
+):
+    """Test that include=content joins the current version instead of a second request."""
+    url = _document_url(document)
+    response = await client.get(url, params={"include": "content"}, headers=auth_headers)
+    assert response.json()["content"] is None
+    assert response.json()["version_number"] is None
+
+    for content in ("v1\n", "v2\n"):
+        await client.post(
+            f"{url}/versions", json={"title": "Runbook", "content": content}, headers=auth_headers
+        )
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = await client.get(url, params={"include": "content"}, headers=auth_headers)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["version_number"], body["content"]) == (2, "v2\n")
+    document_queries = [s for s in statements if "FROM documents" in s]
+    assert len(document_queries) == 1
+    assert "JOIN document_versions" in document_queries[0]
+
+    plain = await client.get(url, headers=auth_headers)
+    assert "content" not in plain.json()
+    assert "version_number" not in plain.json()
+    assert plain.json()["current_version_id"] == body["current_version_id"]
+
+
+@pytest.mark.asyncio
+async def test_get_document_etag(client: AsyncClient, auth_headers, document):
+    """Test that a matching If-None-Match gets a 304 until a new version is saved."""
+    url = _document_url(document)
+    first = await client.get(url, params={"include": "content"}, headers=auth_headers)
+    etag = first.headers["etag"]
+    assert etag != (await client.get(url, headers=auth_headers)).headers["etag"]
+
+    cached = await client.get(
+        url, params={"include": "content"}, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    await client.post(
+        f"{url}/versions", json={"title": "Runbook", "content": "new\n"}, headers=auth_headers
+    )
+    changed = await client.get(
+        url, params={"include": "content"}, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.json()["content"] == "new\n"
+    assert changed.headers["etag"] != etag
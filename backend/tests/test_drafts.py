@@ -0,0 +1,231 @@
+"""Tests for autosave drafts and their flusher."""
+
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import redis as redis_module
+from app.modules.auth.cache import invalidate_membership
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.documents.models import Document
+from app.modules.drafts.flusher import DraftFlusher
+from app.modules.drafts.repository import PENDING_KEY
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.workspaces.models import Workspace
+from tests.conftest import test_search_backend
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_module, "redis_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def flusher(db_session: AsyncSession, monkeypatch) -> DraftFlusher:
+    # Flushes commit; keep them inside the test's transaction.
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    return DraftFlusher(session_factory, test_search_backend)
+
+
+@pytest.fixture
+async def document(db_session: AsyncSession, test_org, test_user) -> Document:
+    workspace = Workspace(name="Docs", slug=f"docs-{uuid4().hex[:8]}", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    document = Document(
+        title="Runbook",
+        workspace_id=workspace.id,
+        organization_id=test_org.id,
+        created_by=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.flush()
+    return document
+
+
+def _draft_url(document: Document) -> str:
+    return f"/api/v1/organizations/{document.organization_id}/documents/{document.id}/draft"
+
+
+async def _versions(db_session: AsyncSession, document: Document) -> list[DocumentVersion]:
+    result = await db_session.execute(
+        select(DocumentVersion)
+        .where(DocumentVersion.document_id == document.id)
+        .order_by(DocumentVersion.version_number)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_autosaves_coalesce_into_one_version(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, redis, flusher, document
+):
+    """Test that a burst of autosaves is written as a single version once idle."""
+    for i in range(5):
+        response = await client.put(
+            _draft_url(document),
+            json={"title": "Runbook", "content": f"Step {i}\n"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+    assert response.json()["saves"] == 5
+    assert await _versions(db_session, document) == []
+
+    # Not idle long enough yet.
+    assert await flusher.flush_idle(idle_seconds=60) == 0
+    assert await flusher.flush_idle(idle_seconds=0) == 1
+
+    (version,) = await _versions(db_session, document)
+    assert version.content == "Step 4\n"
+    assert version.created_by == document.created_by
+    await db_session.refresh(document)
+    assert document.current_version_id == version.id
+    assert (await client.get(_draft_url(document), headers=auth_headers)).status_code == 404
+    assert await redis.zcard(PENDING_KEY) == 0
+    assert flusher.metrics() == {
+        "flushed": 1,
+        "versions_created": 1,
+        "failures": 0,
+        "dropped": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_commit_writes_the_draft_immediately(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, redis, document
+):
+    """Test committing a draft, and that an unchanged draft creates no version."""
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "v1\n"}, headers=auth_headers
+    )
+    response = await client.post(f"{_draft_url(document)}/commit", headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["content"] == "v1\n"
+    assert await redis.zcard(PENDING_KEY) == 0
+
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "v1\n"}, headers=auth_headers
+    )
+    again = await client.post(f"{_draft_url(document)}/commit", headers=auth_headers)
+    assert again.status_code == 200
+    assert again.json()["id"] == response.json()["id"]
+    assert len(await _versions(db_session, document)) == 1
+
+    missing = await client.post(f"{_draft_url(document)}/commit", headers=auth_headers)
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_save_during_flush_keeps_the_newer_draft(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, redis, flusher, document
+):
+    """Test that a draft saved again while it is being written is not lost."""
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "old\n"}, headers=auth_headers
+    )
+    session_factory = flusher.session_factory
+
+    @asynccontextmanager
+    async def save_while_flushing():
+        # Runs after the flusher has read the draft and before it deletes it.
+        await client.put(
+            _draft_url(document),
+            json={"title": "Runbook", "content": "new\n"},
+            headers=auth_headers,
+        )
+        async with session_factory() as session:
+            yield session
+
+    flusher.session_factory = save_while_flushing
+    assert await flusher.flush_idle(idle_seconds=0) == 1
+    flusher.session_factory = session_factory
+
+    draft = await client.get(_draft_url(document), headers=auth_headers)
+    assert draft.json()["content"] == "new\n"
+    assert await flusher.flush_idle(idle_seconds=0) == 1
+    first, second = await _versions(db_session, document)
+    assert second.content == "new\n"  # the first version ("old") was written by the first flush
+
+
+@pytest.mark.asyncio
+async def test_drafts_are_per_user_and_discardable(
+    client: AsyncClient, auth_headers, redis, document
+):
+    """Test reading and discarding a draft, and that drafts need an existing document."""
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "x\n"}, headers=auth_headers
+    )
+    draft = await client.get(_draft_url(document), headers=auth_headers)
+    assert draft.json()["content"] == "x\n"
+    assert (await client.delete(_draft_url(document), headers=auth_headers)).status_code == 204
+    assert (await client.delete(_draft_url(document), headers=auth_headers)).status_code == 404
+    assert await redis.zcard(PENDING_KEY) == 0
+
+    url = f"/api/v1/organizations/{document.organization_id}/documents/{uuid4()}/draft"
+    response = await client.put(url, json={"title": "T", "content": "x"}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_flusher_drops_drafts_of_deleted_documents(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, redis, flusher, document
+):
+    """Test that a draft whose document is gone is dropped rather than retried."""
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "x\n"}, headers=auth_headers
+    )
+    await db_session.delete(document)
+    await db_session.flush()
+
+    assert await flusher.flush_idle(idle_seconds=0) == 0
+    assert await redis.zcard(PENDING_KEY) == 0
+    assert await redis.keys("draft:*") == []
+    assert await db_session.scalar(select(func.count()).select_from(DocumentVersion)) == 0
+
+
+@pytest.mark.asyncio
+async def test_flusher_drops_drafts_of_authors_who_cannot_edit(
+    client: AsyncClient,
+    auth_headers,
+    db_session: AsyncSession,
+    redis,
+    flusher,
+    document,
+    test_user,
+):
+    """Test that a draft is dropped, not written, once its author was made a viewer."""
+    await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "x\n"}, headers=auth_headers
+    )
+    membership = await db_session.scalar(
+        select(Membership).where(
+            Membership.user_id == test_user.id,
+            Membership.organization_id == document.organization_id,
+        )
+    )
+    membership.role = RoleEnum.viewer
+    await db_session.flush()
+    await invalidate_membership(test_user.id, document.organization_id)
+
+    assert await flusher.flush_idle(idle_seconds=0) == 0
+    assert flusher.metrics()["dropped"] == 1
+    assert await redis.keys("draft:*") == []
+    assert await _versions(db_session, document) == []
+
+    response = await client.put(
+        _draft_url(document), json={"title": "Runbook", "content": "y\n"}, headers=auth_headers
+    )
+    assert response.status_code == 403
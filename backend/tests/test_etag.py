@@ -0,0 +1,127 @@
+"""Tests for conditional GETs."""
+
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import commit
+from app.core.etag import forget_etags, remember_etag, validator_cache
+from app.modules.documents.models import Document
+from app.modules.workspaces.models import Workspace
+
+
+@pytest.fixture
+async def document(db_session: AsyncSession, test_org, test_user) -> Document:
+    workspace = Workspace(name="Docs", slug=f"docs-{uuid4().hex[:8]}", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    document = Document(
+        title="Runbook",
+        workspace_id=workspace.id,
+        organization_id=test_org.id,
+        created_by=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.flush()
+    return document
+
+
+@pytest.fixture
+def statements(test_engine):
+    """Record the SQL statements executed while the test runs."""
+    executed: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        executed.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    yield executed
+    event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+
+def _org_url(document: Document) -> str:
+    return f"/api/v1/organizations/{document.organization_id}"
+
+
+@pytest.mark.asyncio
+async def test_document_304_from_cached_validator(
+    client: AsyncClient, auth_headers, document, statements
+):
+    """Test that a repeat GET is answered from the cached ETag until the document changes."""
+    url = f"{_org_url(document)}/documents/{document.id}"
+    etag = (await client.get(url, headers=auth_headers)).headers["etag"]
+
+    statements.clear()
+    cached = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert not [s for s in statements if "FROM documents" in s]
+
+    await client.patch(url, json={"title": "Renamed"}, headers=auth_headers)
+    changed = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Renamed"
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_version_is_immutable(client: AsyncClient, auth_headers, document, statements):
+    """Test that a version's 304 never loads its content, and stops once it is deleted."""
+    url = f"{_org_url(document)}/documents/{document.id}"
+    created = await client.post(
+        f"{url}/versions", json={"title": "Runbook", "content": "v1\n"}, headers=auth_headers
+    )
+    version_url = f"{url}/versions/{created.json()['id']}"
+
+    response = await client.get(version_url, headers=auth_headers)
+    assert response.json()["content"] == "v1\n"
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    # Without a cached validator, the ETag is checked against the URL and
+    # only the version's existence is looked up.
+    validator_cache.clear_local()
+    statements.clear()
+    cached = await client.get(version_url, headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert "immutable" in cached.headers["cache-control"]
+    version_queries = [s for s in statements if "FROM document_versions" in s]
+    assert len(version_queries) == 1
+    assert "content" not in version_queries[0].split("FROM")[0]
+
+    await client.delete(url, headers=auth_headers)
+    gone = await client.get(version_url, headers={**auth_headers, "If-None-Match": etag})
+    assert gone.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_workspace_etag(client: AsyncClient, auth_headers, document):
+    """Test conditional GETs of a workspace across an update."""
+    url = f"{_org_url(document)}/workspaces/{document.workspace_id}"
+    etag = (await client.get(url, headers=auth_headers)).headers["etag"]
+
+    cached = await client.get(url, headers={**auth_headers, "If-None-Match": f'W/{etag}, "x"'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    await client.patch(url, json={"description": "Runbooks"}, headers=auth_headers)
+    changed = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["description"] == "Runbooks"
+
+
+@pytest.mark.asyncio
+async def test_etags_forgotten_again_on_commit(db_session: AsyncSession, monkeypatch):
+    """Test that an ETag stored by a read racing the write is dropped once the write commits."""
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    await remember_etag("workspace:1", '"old"')
+
+    await forget_etags("workspace:1", db=db_session)
+    await remember_etag("workspace:1", '"old"')  # read before the commit
+    assert await validator_cache.get("workspace:1") == '"old"'
+
+    await commit(db_session)
+    assert await validator_cache.get("workspace:1") is None
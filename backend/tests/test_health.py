@@ -5,6 +5,8 @@ Health check endpoint tests.
 import pytest
 from httpx import AsyncClient
 
+from app.core.config import settings
+
 
 @pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
@@ -14,3 +16,21 @@ async def test_health_check(client: AsyncClient):
     data = response.json()
     assert data["status"] == "healthy"
     assert data["app"] == "KnowBase"
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_internal(client: AsyncClient, monkeypatch):
+    """Test that metrics need the metrics token, or debug mode when none is set."""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert (await client.get("/metrics")).status_code == 404
+    monkeypatch.setattr(settings, "DEBUG", True)
+    assert (await client.get("/metrics")).status_code == 200
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert (await client.get("/metrics")).status_code == 401
+    wrong = {"Authorization": "Bearer guess"}
+    assert (await client.get("/metrics", headers=wrong)).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "audit_writer" in response.json()
@@ -0,0 +1,146 @@
+"""Tests for the indexes behind cursor-paginated listings."""
+
+import json
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from app.modules.audit_logs.repository import AuditLogRepository
+from app.modules.document_versions.repository import DocumentVersionRepository
+from app.modules.documents.repository import DocumentRepository
+from app.modules.invites.repository import InviteRepository
+from app.modules.memberships.repository import MembershipRepository
+from app.modules.workspaces.repository import WorkspaceRepository
+from tests.conftest import TEST_POSTGRES_URL, requires_postgres, reset_postgres_schema
+
+org_id, workspace_id, document_id = uuid4(), uuid4(), uuid4()
+
+LISTINGS = [
+    (
+        "documents",
+        DocumentRepository(None).get_org_documents_query(org_id),
+        "ix_documents_organization_id_created_at_id",
+    ),
+    (
+        "workspace documents",
+        DocumentRepository(None).get_org_documents_query(org_id, workspace_id),
+        "ix_documents_organization_id_workspace_id_created_at_id",
+    ),
+    (
+        "workspaces",
+        WorkspaceRepository(None).get_org_workspaces_query(org_id),
+        "ix_workspaces_organization_id_created_at_id",
+    ),
+    (
+        "invites",
+        InviteRepository(None).get_org_invites_query(org_id),
+        "ix_invites_organization_id_created_at_id",
+    ),
+    (
+        "members",
+        MembershipRepository(None).get_org_members_query(org_id),
+        "ix_memberships_organization_id_created_at_id",
+    ),
+    (
+        "audit logs",
+        AuditLogRepository(None).get_org_logs_query(org_id),
+        "ix_audit_logs_organization_id_created_at_id",
+    ),
+    (
+        "audit logs by action",
+        AuditLogRepository(None).get_org_logs_query(org_id, action="document.update"),
+        "ix_audit_logs_organization_id_action_created_at_id",
+    ),
+    (
+        "audit logs by resource",
+        AuditLogRepository(None).get_org_logs_query(org_id, resource_type="document"),
+        "ix_audit_logs_organization_id_resource_type_created_at_id",
+    ),
+    (
+        "resource history",
+        AuditLogRepository(None).get_resource_logs_query(org_id, "document", document_id),
+        "ix_audit_logs_resource_created_at_id",
+    ),
+]
+
+
+PARTITION_INDEXES = text(
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = to_regclass(:index)"
+)
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _after_cursor(query):
+    """Add the keyset predicate of a page after the first one."""
+    entity = query.column_descriptions[0]["entity"]
+    return query.where(tuple_(entity.created_at, entity.id) < (datetime.now(UTC), uuid4()))
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_listings_are_read_in_index_order():
+    """Test that every listing's filter and order are served by one index, without a sort."""
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        async with engine.connect() as conn:
+            # Tables are empty; make the planner show what it could do with many rows.
+            for setting in ("enable_seqscan", "enable_sort", "enable_incremental_sort"):
+                await conn.execute(text(f"SET {setting} = off"))
+
+            queries = [(name, query, index) for name, query, index in LISTINGS]
+            queries += [(f"{name} (next page)", _after_cursor(q), i) for name, q, i in LISTINGS]
+            queries.append(
+                (
+                    "versions",
+                    DocumentVersionRepository(None).get_document_versions_query(
+                        document_id, org_id
+                    ),
+                    "document_versions_document_id_version_number_key",
+                )
+            )
+            for name, query, index in queries:
+                sql = query.limit(51).compile(
+                    dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+                )
+                # On empty tables any index on the filter columns looks as cheap
+                # as the next, so hide the table's other indexes from the planner.
+                savepoint = await conn.begin_nested()
+                others = await conn.scalars(
+                    text(
+                        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() "
+                        "AND tablename = :table "
+                        "AND indexname != :index AND indexname NOT LIKE '%\\_key' "
+                        "AND indexname NOT LIKE '%\\_pkey'"
+                    ),
+                    {"table": query.column_descriptions[0]["entity"].__tablename__, "index": index},
+                )
+                for other in others.all():
+                    await conn.execute(text(f"DROP INDEX {other}"))
+                raw = await conn.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                # On a partitioned table (audit_logs) each partition has its own
+                # copy of the index.
+                expected = {index, *await conn.scalars(PARTITION_INDEXES, {"index": index})}
+                await savepoint.rollback()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                nodes = list(_nodes(plan))
+                assert not [n for n in nodes if "Sort" in n["Node Type"]], name
+                scans = [n.get("Index Name") for n in nodes if "Index" in n["Node Type"]]
+                assert expected & set(scans), (name, scans)
+    finally:
+        async with engine.begin() as conn:
+            await reset_postgres_schema(conn)
+        await engine.dispose()
@@ -0,0 +1,129 @@
+"""Tests for keyset pagination."""
+
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import KeysetParams, paginate
+from app.modules.audit_logs.models import AuditLog
+from app.modules.audit_logs.repository import AUDIT_LOG_ORDER, AuditLogRepository
+from app.modules.audit_logs.schemas import AuditLogRead
+
+
+@pytest.fixture
+async def logs(db_session: AsyncSession, test_org, test_user) -> list[AuditLog]:
+    """23 audit logs, newest first; pairs share a timestamp so the id breaks ties."""
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    rows = [
+        AuditLog(
+            action="document.update" if i % 3 else "document.create",
+            resource_type="document",
+            resource_id=uuid4(),
+            user_id=test_user.id,
+            organization_id=test_org.id,
+            created_at=start + timedelta(minutes=i // 2),
+        )
+        for i in range(23)
+    ]
+    db_session.add_all(rows)
+    await db_session.flush()
+    return sorted(rows, key=lambda log: (log.created_at, log.id), reverse=True)
+
+
+async def _walk(client, url, headers, params, direction, cursor=None) -> tuple[list, str | None]:
+    pages, last = [], None
+    while True:
+        page_params = {**params, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(url, params=page_params, headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append([item["id"] for item in body["items"]])
+        last = body
+        cursor = body[direction]
+        if not cursor:
+            return pages, last
+
+
+@pytest.mark.asyncio
+async def test_pages_forward_and_back(client: AsyncClient, auth_headers, test_org, logs):
+    """Test walking every page forward, then back from the last page, with filters."""
+    url = f"/api/v1/organizations/{test_org.id}/audit-logs"
+    expected = [str(log.id) for log in logs]
+
+    forward, last = await _walk(client, url, auth_headers, {"size": 5}, "next_page")
+    assert [len(page) for page in forward] == [5, 5, 5, 5, 3]
+    assert sum(forward, []) == expected
+
+    backward, first = await _walk(
+        client, url, auth_headers, {"size": 5}, "previous_page", last["previous_page"]
+    )
+    assert backward == forward[-2::-1]
+    assert first["previous_page"] is None
+    assert first["next_page"]
+
+    updates, _ = await _walk(
+        client, url, auth_headers, {"size": 4, "action": "document.update"}, "next_page"
+    )
+    assert sum(updates, []) == [str(log.id) for log in logs if log.action == "document.update"]
+
+
+@pytest.mark.asyncio
+async def test_rejects_forged_cursors(client: AsyncClient, auth_headers, test_org, logs):
+    """Test that edited cursors and cursors of other listings are refused."""
+    org = f"/api/v1/organizations/{test_org.id}"
+    cursor = (
+        await client.get(f"{org}/audit-logs", params={"size": 5}, headers=auth_headers)
+    ).json()["next_page"]
+    payload, signature = cursor.split(".")
+    for forged in (f"{payload[:-2]}AA.{signature}", "not-a-cursor", f"{payload}.{payload}"):
+        response = await client.get(
+            f"{org}/audit-logs", params={"cursor": forged}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    # Same key columns, other table.
+    response = await client.get(f"{org}/documents", params={"cursor": cursor}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_rows_bypass_the_identity_map(db_session: AsyncSession, test_org, logs):
+    """Test that paging builds schema objects from rows, not ORM instances."""
+    db_session.expunge_all()
+    query = AuditLogRepository(db_session).get_org_logs_query(test_org.id)
+    page = await paginate(db_session, query, AUDIT_LOG_ORDER, KeysetParams(size=10), AuditLogRead)
+    assert [item.id for item in page.items] == [log.id for log in logs[:10]]
+    assert len(db_session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_resource_history_pages(
+    client: AsyncClient, db_session: AsyncSession, auth_headers, test_org, test_user, logs
+):
+    """Test paging through the history of one resource, and only that resource."""
+    resource_id = uuid4()
+    history = [
+        AuditLog(
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            user_id=test_user.id,
+            organization_id=test_org.id,
+            created_at=datetime(2026, 2, 1, tzinfo=UTC) + timedelta(minutes=i),
+        )
+        for i, (action, resource_type) in enumerate(
+            [("document.created", "document")]
+            + [("document.updated", "document")] * 5
+            + [("workspace.updated", "workspace")]
+        )
+    ]
+    db_session.add_all(history)
+    await db_session.flush()
+
+    url = f"/api/v1/organizations/{test_org.id}/audit-logs/resources/document/{resource_id}"
+    pages, _ = await _walk(client, url, auth_headers, {"size": 4}, "next_page")
+    expected = [str(log.id) for log in reversed(history[:6])]
+    assert pages == [expected[:4], expected[4:]]
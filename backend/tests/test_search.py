@@ -0,0 +1,377 @@
+"""
+Document search tests.
+
+Every test runs against the SQLite FTS5 backend; the PostgreSQL backend
+is exercised too when ``TEST_POSTGRES_URL`` points at a scratch database
+(its schema is dropped and recreated).
+"""
+
+import base64
+import json
+from collections.abc import AsyncGenerator
+from uuid import NAMESPACE_URL, uuid4, uuid5
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+from app.core.database import get_db
+from app.core.pagination import encode_cursor
+from app.core.security import create_access_token
+from app.main import create_app
+from app.modules.document_versions.models import DocumentVersion
+from app.modules.documents.models import Document, DocumentStatus
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.organizations.models import Organization
+from app.modules.search.backends import PostgresSearchBackend, SearchBackend, SQLiteSearchBackend
+from app.modules.search.backends.sqlite import to_fts5_query
+from app.modules.search.dependencies import get_search_backend
+from app.modules.search.repository import SearchRepository
+from app.modules.search.service import SEARCH_ORDER, SearchService
+from app.modules.users.models import User
+from app.modules.workspaces.models import Workspace
+from tests.conftest import TEST_POSTGRES_URL, requires_postgres, reset_postgres_schema
+
+# Shared corpus: (title, content, workspace, status). Both backends must
+# return identical hits for it, see test_backends_return_identical_results.
+CORPUS = [
+    ("Ingestion overview", "How events flow from producers into the warehouse.", "eng", "published"),
+    ("Worker runbook", "Restart the ingestion worker when the queue backs up.", "eng", "draft"),
+    ("Billing FAQ", "Refunds are issued within five business days.", "support", "published"),
+    ("Billing service", "The refund endpoint validates invoices before payment.", "eng", "draft"),
+    ("Release notes", "Added a parquet exporter and removed the legacy CSV exporter.", "eng", "published"),
+    ("Cache design", "Read-through cache with a short local tier and a Redis tier.", "eng", "draft"),
+    ("Cache invalidation", "Drop cache entries when memberships change; keys include the org.", "eng", "archived"),
+    ("Onboarding checklist", "Laptop setup, VPN access and a first pairing session.", "support", "draft"),
+    ("Incident postmortem", "Ingestion stalled after a schema migration; ingestion resumed at noon.", "eng", "published"),
+    ("Schema migrations", "Run every migration before deploying the service.", "eng", "draft"),
+    ("Security policy", "Rotate credentials quarterly and after every incident.", "support", "published"),
+    ("Search tuning", "Title matches should rank above content matches.", "eng", "draft"),
+]  # fmt: skip
+
+QUERIES = [
+    {"q": "ingestion"},
+    {"q": "cache"},
+    {"q": "refund"},
+    {"q": "migration"},
+    {"q": "migration -deploying"},
+    {"q": "parquet or refund"},
+    {"q": '"ingestion worker"'},
+    {"q": "incident", "workspace": "support"},
+    {"q": "cache", "status": "draft"},
+    {"q": "ingestion", "size": 1},
+]
+
+
+async def _postgres_session() -> AsyncGenerator[AsyncSession, None]:
+    engine = create_async_engine(TEST_POSTGRES_URL, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+        await session.rollback()
+
+    async with engine.begin() as conn:
+        await reset_postgres_schema(conn)
+    await engine.dispose()
+
+
+@pytest.fixture(params=["sqlite", pytest.param("postgres", marks=requires_postgres)])
+async def search_env(request, db_session) -> AsyncGenerator[tuple[AsyncSession, SearchBackend]]:
+    """Provide a session and the matching search backend for each database."""
+    if request.param == "sqlite":
+        yield db_session, SQLiteSearchBackend()
+        return
+    async for session in _postgres_session():
+        yield session, PostgresSearchBackend()
+
+
+@pytest.fixture
+async def search_client(search_env) -> AsyncGenerator[AsyncClient, None]:
+    session, backend = search_env
+    app = create_app()
+
+    async def _override_get_db():
+        yield session
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_search_backend] = lambda: backend
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+async def _seed_tenant(session: AsyncSession) -> dict:
+    """Seed a user who owns an organization with two workspaces (fixed ids)."""
+    user = User(
+        id=uuid5(NAMESPACE_URL, "user"),
+        email="search@example.com",
+        hashed_password="x",
+        full_name="Search User",
+    )
+    org = Organization(id=uuid5(NAMESPACE_URL, "org"), name="Search Org", slug="search-org")
+    session.add_all([user, org])
+    await session.flush()
+
+    workspaces = {
+        name: Workspace(
+            id=uuid5(NAMESPACE_URL, f"workspace/{name}"),
+            name=name,
+            slug=name,
+            organization_id=org.id,
+        )
+        for name in ("eng", "support")
+    }
+    session.add(Membership(user_id=user.id, organization_id=org.id, role=RoleEnum.owner))
+    session.add_all(workspaces.values())
+    await session.flush()
+    return {
+        "user_id": user.id,
+        "org_id": org.id,
+        "workspaces": {name: ws.id for name, ws in workspaces.items()},
+        "headers": {"Authorization": f"Bearer {create_access_token(user.id)}"},
+    }
+
+
+async def _seed_corpus(session: AsyncSession, backend: SearchBackend, tenant: dict) -> None:
+    """Insert CORPUS with deterministic ids and index it through the backend."""
+    repo = SearchRepository(session, backend)
+    for i, (title, content, workspace, status) in enumerate(CORPUS):
+        document = Document(
+            id=uuid5(NAMESPACE_URL, f"document/{i}"),
+            title=title,
+            status=DocumentStatus(status),
+            workspace_id=tenant["workspaces"][workspace],
+            organization_id=tenant["org_id"],
+            created_by=tenant["user_id"],
+        )
+        session.add(document)
+        await session.flush()
+        version = DocumentVersion(
+            id=uuid5(NAMESPACE_URL, f"version/{i}"),
+            document_id=document.id,
+            version_number=1,
+            title=title,
+            content=content,
+            created_by=tenant["user_id"],
+            organization_id=tenant["org_id"],
+        )
+        session.add(version)
+        await session.flush()
+        document.current_version_id = version.id
+        await session.flush()
+        await repo.index_current_version(version.id, None, title)
+
+
+@pytest.fixture
+async def tenant(search_env) -> dict:
+    session, _backend = search_env
+    return await _seed_tenant(session)
+
+
+async def _create_document(
+    client: AsyncClient, tenant: dict, title: str, content: str, *, workspace="eng", status="draft"
+) -> str:
+    docs = f"/api/v1/organizations/{tenant['org_id']}/documents"
+    workspace_id = str(tenant["workspaces"][workspace])
+    response = await client.post(
+        docs,
+        json={"title": title, "workspace_id": workspace_id, "status": status},
+        headers=tenant["headers"],
+    )
+    assert response.status_code == 201
+    document_id = response.json()["id"]
+    response = await client.post(
+        f"{docs}/{document_id}/versions",
+        json={"title": title, "content": content},
+        headers=tenant["headers"],
+    )
+    assert response.status_code == 201
+    return document_id
+
+
+async def _search(client: AsyncClient, tenant: dict, **params) -> dict:
+    response = await client.get(
+        f"/api/v1/organizations/{tenant['org_id']}/search",
+        params=params,
+        headers=tenant["headers"],
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_title_match_ranks_above_content_match(search_client: AsyncClient, tenant):
+    """Test that a term in the title outranks the same term in the content."""
+    in_content = await _create_document(
+        search_client, tenant, "Runbook", "Restart the ingestion worker."
+    )
+    in_title = await _create_document(
+        search_client, tenant, "Ingestion overview", "How data flows in."
+    )
+    for i in range(3):
+        await _create_document(search_client, tenant, f"Filler {i}", "Unrelated text.")
+
+    page = await _search(search_client, tenant, q="ingestion")
+
+    assert [hit["document_id"] for hit in page["items"]] == [in_title, in_content]
+    assert page["items"][1]["snippet"] == "Restart the <mark>ingestion</mark> worker."
+
+
+@pytest.mark.asyncio
+async def test_snippets_escape_the_document_text(search_client: AsyncClient, tenant):
+    """Test that markup in the content is escaped and only the highlights are HTML."""
+    await _create_document(
+        search_client, tenant, "Payload", "Run <script>alert(1)</script> & ingestion now."
+    )
+
+    page = await _search(search_client, tenant, q="ingestion")
+
+    # ts_headline leaves tags out; FTS5 keeps them, escaped.
+    snippet = page["items"][0]["snippet"]
+    assert "<script>" not in snippet
+    assert snippet.endswith(" &amp; <mark>ingestion</mark> now.")
+
+
+@pytest.mark.asyncio
+async def test_only_current_version_is_indexed(search_client: AsyncClient, tenant):
+    """Test that content from superseded versions is no longer found."""
+    document_id = await _create_document(
+        search_client, tenant, "Release notes", "Deprecated the legacy exporter."
+    )
+    response = await search_client.post(
+        f"/api/v1/organizations/{tenant['org_id']}/documents/{document_id}/versions",
+        json={"title": "Release notes", "content": "Added a parquet exporter."},
+        headers=tenant["headers"],
+    )
+    assert response.status_code == 201
+
+    assert (await _search(search_client, tenant, q="legacy"))["items"] == []
+    hits = (await _search(search_client, tenant, q="parquet"))["items"]
+    assert [hit["version_id"] for hit in hits] == [response.json()["id"]]
+
+
+@pytest.mark.asyncio
+async def test_rename_reindexes_title(search_client: AsyncClient, tenant):
+    """Test that renaming a document updates its title terms but keeps its content."""
+    document_id = await _create_document(
+        search_client, tenant, "Onboarding", "Laptop setup checklist."
+    )
+    response = await search_client.patch(
+        f"/api/v1/organizations/{tenant['org_id']}/documents/{document_id}",
+        json={"title": "Hiring handbook"},
+        headers=tenant["headers"],
+    )
+    assert response.status_code == 200
+
+    assert (await _search(search_client, tenant, q="onboarding"))["items"] == []
+    assert len((await _search(search_client, tenant, q="handbook"))["items"]) == 1
+    assert len((await _search(search_client, tenant, q="laptop"))["items"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_filters_by_workspace_and_status(search_client: AsyncClient, tenant):
+    """Test the workspace and status filters."""
+    draft = await _create_document(
+        search_client, tenant, "Billing FAQ", "Refund policy.", workspace="support"
+    )
+    published = await _create_document(
+        search_client, tenant, "Billing service", "Refund endpoint.", status="published"
+    )
+
+    by_workspace = await _search(
+        search_client, tenant, q="refund", workspace_id=str(tenant["workspaces"]["support"])
+    )
+    by_status = await _search(search_client, tenant, q="refund", status="published")
+
+    assert [hit["document_id"] for hit in by_workspace["items"]] == [draft]
+    assert [hit["document_id"] for hit in by_status["items"]] == [published]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_visits_every_hit_once(search_client: AsyncClient, tenant):
+    """Test that following next_page returns each match exactly once, in rank order."""
+    created = set()
+    for i in range(7):
+        body = "cache " * (i % 3 + 1) + f"note {i}"
+        created.add(await _create_document(search_client, tenant, f"Note {i}", body))
+
+    seen: list[str] = []
+    ranks: list[float] = []
+    cursor = None
+    while True:
+        params = {"q": "cache", "size": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = await _search(search_client, tenant, **params)
+        seen += [hit["document_id"] for hit in page["items"]]
+        ranks += [hit["rank"] for hit in page["items"]]
+        cursor = page["next_page"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(created) and set(seen) == created
+    assert ranks == sorted(ranks, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(search_client: AsyncClient, tenant):
+    """Test that a malformed, unsigned or edited cursor returns 400."""
+    unsigned = base64.urlsafe_b64encode(json.dumps([1.0, str(uuid4())]).encode()).decode()
+    signed = encode_cursor(SEARCH_ORDER, (1.0, uuid4()), backwards=False)
+    edited = encode_cursor(SEARCH_ORDER, (9.0, uuid4()), backwards=False).split(".")[0]
+    for cursor in ("not-a-cursor", unsigned, f"{edited}.{signed.split('.')[1]}"):
+        response = await search_client.get(
+            f"/api/v1/organizations/{tenant['org_id']}/search",
+            params={"q": "anything", "cursor": cursor},
+            headers=tenant["headers"],
+        )
+        assert response.status_code == 400
+
+
+def test_fts5_query_translation():
+    """Test that web-search syntax is translated into quoted FTS5 terms."""
+    assert to_fts5_query("cache design") == '"cache" AND "design"'
+    assert to_fts5_query('"ingestion worker" queue') == '"ingestion worker" AND "queue"'
+    assert to_fts5_query("parquet or csv") == '("parquet" OR "csv")'
+    assert to_fts5_query("exporter -legacy") == '("exporter") NOT "legacy"'
+    assert to_fts5_query('NEAR(a b) "c*') == '"NEAR a" AND "b" AND "c"'
+    assert to_fts5_query("-only --- or") is None
+
+
+async def _run_corpus_queries(session: AsyncSession, backend: SearchBackend) -> list:
+    tenant = await _seed_tenant(session)
+    await _seed_corpus(session, backend, tenant)
+    service = SearchService(SearchRepository(session, backend))
+
+    results = []
+    for query in QUERIES:
+        workspace = query.get("workspace")
+        page = await service.search(
+            tenant["org_id"],
+            query["q"],
+            workspace_id=tenant["workspaces"][workspace] if workspace else None,
+            status=query.get("status"),
+            size=query.get("size", 20),
+        )
+        # Rank scales differ between backends; only the order has to match.
+        hits = [hit.model_dump(exclude={"rank", "updated_at"}) for hit in page.items]
+        results.append((query, hits, page.next_page is not None))
+    return results
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_backends_return_identical_results(db_session: AsyncSession):
+    """Test that SQLite FTS5 and PostgreSQL return the same hits for the shared corpus."""
+    sqlite_results = await _run_corpus_queries(db_session, SQLiteSearchBackend())
+    async for pg_session in _postgres_session():
+        postgres_results = await _run_corpus_queries(pg_session, PostgresSearchBackend())
+
+    assert all(hits for _query, hits, _more in sqlite_results)
+    for sqlite_result, postgres_result in zip(sqlite_results, postgres_results, strict=True):
+        assert sqlite_result == postgres_result, sqlite_result[0]
@@ -0,0 +1,75 @@
+"""
+Tenant context and RBAC dependency tests.
+"""
+
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.modules.memberships.models import Membership, RoleEnum
+from app.modules.users.models import User
+from app.modules.workspaces.models import Workspace
+
+
+@pytest.mark.asyncio
+async def test_tenant_context_resolves_auth_in_one_query(
+    client: AsyncClient, test_engine, test_org, auth_headers
+):
+    """Test that membership and role checks share a single auth query."""
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = await client.get(
+            f"/api/v1/organizations/{test_org.id}/members", headers=auth_headers
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+    assert response.status_code == 200
+    auth_queries = [s for s in statements if "FROM users" in s]
+    assert len(auth_queries) == 1
+    assert "JOIN memberships" in auth_queries[0]
+
+
+@pytest.mark.asyncio
+async def test_non_member_is_forbidden(client: AsyncClient, test_org, db_session):
+    """Test that users outside the organization get 403."""
+    outsider = User(id=uuid4(), email="outsider@example.com", hashed_password="x", full_name="O")
+    db_session.add(outsider)
+    await db_session.flush()
+
+    response = await client.get(
+        f"/api/v1/organizations/{test_org.id}/documents",
+        headers={"Authorization": f"Bearer {create_access_token(outsider.id)}"},
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_require_role_uses_membership_role(client: AsyncClient, test_org, db_session):
+    """Test that a viewer cannot create documents but can read them."""
+    viewer = User(id=uuid4(), email="viewer@example.com", hashed_password="x", full_name="V")
+    db_session.add(viewer)
+    await db_session.flush()
+    db_session.add(Membership(user_id=viewer.id, organization_id=test_org.id, role=RoleEnum.viewer))
+    workspace = Workspace(name="Docs", slug="docs", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    headers = {"Authorization": f"Bearer {create_access_token(viewer.id)}"}
+
+    created = await client.post(
+        f"/api/v1/organizations/{test_org.id}/documents",
+        json={"title": "Runbook", "workspace_id": str(workspace.id)},
+        headers=headers,
+    )
+    listed = await client.get(f"/api/v1/organizations/{test_org.id}/documents", headers=headers)
+
+    assert created.status_code == 403
+    assert listed.status_code == 200
@@ -0,0 +1,191 @@
+"""Tests for version diffs."""
+
+import random
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.document_versions.diff import WORD_DIFF_MAX_LINES, diff, diff_cache, myers
+from app.modules.documents.models import Document
+from app.modules.workspaces.models import Workspace
+
+
+@pytest.fixture(autouse=True)
+def _clear_diff_cache():
+    diff_cache.clear_local()
+    yield
+    diff_cache.clear_local()
+
+
+def _edit_distance(a: list[int], b: list[int]) -> int:
+    lcs = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) - 1, -1, -1):
+        for j in range(len(b) - 1, -1, -1):
+            lcs[i][j] = lcs[i + 1][j + 1] + 1 if a[i] == b[j] else max(lcs[i + 1][j], lcs[i][j + 1])
+    return len(a) + len(b) - 2 * lcs[0][0]
+
+
+def test_myers_finds_a_shortest_edit_script():
+    """Test that the edit script is valid and minimal on random sequences."""
+    rng = random.Random(0)
+    for _ in range(500):
+        a = [rng.randint(0, 5) for _ in range(rng.randint(0, 15))]
+        b = [rng.randint(0, 5) for _ in range(rng.randint(0, 15))]
+        i = j = cost = 0
+        for tag, count in myers(a, b):
+            if tag == "=":
+                assert a[i : i + count] == b[j : j + count]
+                i, j = i + count, j + count
+            elif tag == "-":
+                i, cost = i + count, cost + count
+            else:
+                j, cost = j + count, cost + count
+        assert (i, j) == (len(a), len(b))
+        assert cost == _edit_distance(a, b)
+
+
+def test_diff_hunks():
+    """Test the hunk format for a one-line change in a long text."""
+    old = "".join(f"line {i}\n" for i in range(1, 21))
+    new = old.replace("line 10\n", "line ten\n")
+    assert diff(old, new, context=2) == {
+        "additions": 1,
+        "deletions": 1,
+        "hunks": [
+            {
+                "old_start": 8,
+                "old_lines": 5,
+                "new_start": 8,
+                "new_lines": 5,
+                "ops": [
+                    [" ", "line 8\nline 9\n"],
+                    ["-", "line 10\n"],
+                    ["+", "line ten\n"],
+                    [" ", "line 11\nline 12\n"],
+                ],
+            }
+        ],
+    }
+    assert diff(old, old) == {"additions": 0, "deletions": 0, "hunks": []}
+
+
+def test_word_diff():
+    """Test that changed lines are diffed word by word."""
+    result = diff("Restart the worker.\n", "Restart every worker.\n", words=True)
+    assert result["hunks"][0]["ops"] == [
+        [" ", "Restart "],
+        ["-", "the"],
+        ["+", "every"],
+        [" ", " worker.\n"],
+    ]
+
+
+def test_word_diff_leaves_rewrites_as_lines():
+    """Test that changes longer than WORD_DIFF_MAX_LINES are not diffed by word."""
+    old = "".join(f"old line {i}\n" for i in range(WORD_DIFF_MAX_LINES + 1))
+    new = old.replace("old", "new")
+    (hunk,) = diff(old, new, words=True)["hunks"]
+    assert hunk["ops"] == [["-", old], ["+", new]]
+
+
+@pytest.mark.parametrize("words", [False, True])
+def test_hunks_reproduce_both_texts(words):
+    """Test that each hunk's ops join back into the lines it covers."""
+    rng = random.Random(1)
+    choices = ["a\n", "b b\n", "c d e\n", "f\n", "g"]
+    for _ in range(200):
+        old = "".join(rng.choices(choices, k=rng.randint(0, 30)))
+        new = "".join(rng.choices(choices, k=rng.randint(0, 30)))
+        old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+        for hunk in diff(old, new, context=1, words=words)["hunks"]:
+            old_start, new_start = hunk["old_start"] - 1, hunk["new_start"] - 1
+            assert "".join(text for tag, text in hunk["ops"] if tag != "+") == "".join(
+                old_lines[old_start : old_start + hunk["old_lines"]]
+            )
+            assert "".join(text for tag, text in hunk["ops"] if tag != "-") == "".join(
+                new_lines[new_start : new_start + hunk["new_lines"]]
+            )
+
+
+def test_unrelated_texts_beyond_max_cost_are_replaced():
+    """Test that the search cutoff still yields a valid diff."""
+    lines = [f"line {i}\n" for i in range(200)]
+    old, new = "".join(lines), "".join(reversed(lines))
+    result = diff(old, new, context=0, max_cost=4)
+    (hunk,) = result["hunks"]
+    assert "".join(text for tag, text in hunk["ops"] if tag != "+") == old
+    assert "".join(text for tag, text in hunk["ops"] if tag != "-") == new
+
+
+@pytest.fixture
+async def document(db_session: AsyncSession, test_org, test_user) -> Document:
+    workspace = Workspace(name="Docs", slug=f"docs-{uuid4().hex[:8]}", organization_id=test_org.id)
+    db_session.add(workspace)
+    await db_session.flush()
+    document = Document(
+        title="Runbook",
+        workspace_id=workspace.id,
+        organization_id=test_org.id,
+        created_by=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.flush()
+    return document
+
+
+def _versions_url(document: Document) -> str:
+    return f"/api/v1/organizations/{document.organization_id}/documents/{document.id}/versions"
+
+
+@pytest.mark.asyncio
+async def test_diff_endpoint(client: AsyncClient, auth_headers, document):
+    """Test diffing two versions over HTTP, served from the cache the second time."""
+    ids = []
+    for content in ("# Runbook\n\nRestart the worker.\n", "# Runbook\n\nRestart every worker.\n"):
+        response = await client.post(
+            _versions_url(document),
+            json={"title": document.title, "content": content},
+            headers=auth_headers,
+        )
+        ids.append(response.json()["id"])
+
+    url = f"{_versions_url(document)}/{ids[0]}/diff/{ids[1]}"
+    response = await client.get(url, params={"granularity": "word"}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["from_version_id"], body["to_version_id"]) == tuple(ids)
+    assert (body["additions"], body["deletions"]) == (1, 1)
+    assert ["-", "the"] in body["hunks"][0]["ops"]
+
+    hits = diff_cache.stats.local_hits
+    again = await client.get(url, params={"granularity": "word"}, headers=auth_headers)
+    assert again.json() == body
+    assert diff_cache.stats.local_hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_diff_rejects_versions_of_other_documents(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, document, test_user
+):
+    """Test that both versions must belong to the document in the URL."""
+    other = Document(
+        title="Other",
+        workspace_id=document.workspace_id,
+        organization_id=document.organization_id,
+        created_by=test_user.id,
+    )
+    db_session.add(other)
+    await db_session.flush()
+    ids = []
+    for doc in (document, other):
+        response = await client.post(
+            _versions_url(doc), json={"title": doc.title, "content": "x\n"}, headers=auth_headers
+        )
+        ids.append(response.json()["id"])
+
+    response = await client.get(
+        f"{_versions_url(document)}/{ids[0]}/diff/{ids[1]}", headers=auth_headers
+    )
+    assert response.status_code == 404